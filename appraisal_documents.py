@@ -0,0 +1,218 @@
+import html
+import os
+import re
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from payroll_engine import DEFAULT_FUEL_PRICE, SALARY_INPUT_COLUMNS, compute_salary_columns, to_number
+from scoring import SOFT_SKILLS
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+# Columns a document needs; only these are streamed out of the workbook
+APPRAISAL_COLUMNS = (
+    ["Employee ID", "Employee Name", "Division", "Department", "Designation", "Line Manager",
+     "Date of Joining", "Contract Expiry Date"] +
+    [f"KPI_{i}_{field}" for i in range(1, 7) for field in ("Title", "Rating", "Weightage", "Weighted_Score")] +
+    ["Part_A_Total_Score"] +
+    [f"{skill}_{field}" for skill in SOFT_SKILLS for field in ("Rating", "Weighted_Score")] +
+    ["Part_B_Total_Score", "Overall_Percentage", "Overall_Rating",
+     "Promotion_Recommendation", "Retention_Recommendation", "Training_Recommendations",
+     "Last_Year_Rating", "Last_Year_Increment", "Salary_Adj_Impact"] +
+    SALARY_INPUT_COLUMNS
+)
+DOCUMENT_FORMATS = ("html", "pdf")
+
+STYLE = """
+body { font-family: Arial, sans-serif; font-size: 10pt; color: #212529; }
+h1 { font-size: 16pt; text-align: center; margin-bottom: 2px; }
+h2 { font-size: 12pt; background-color: #e9ecef; padding: 4px; margin-top: 14px; }
+table { border-collapse: collapse; width: 100%; }
+th { background-color: #e9ecef; text-align: left; }
+th, td { border: 1px solid #dee2e6; padding: 4px; }
+.subtitle { text-align: center; color: #6c757d; }
+"""
+
+
+def matches_filter(employee, filters):
+    """filters maps a column to the set of accepted values; an empty filter accepts everyone."""
+    return all(str(employee.get(column, "")).strip() in values for column, values in filters.items())
+
+
+def document_filename(employee, fmt):
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", str(employee.get("Employee ID", "")).strip()) or "unknown"
+    return f"appraisal_{safe_id}.{fmt}"
+
+
+def salary_summary(employee):
+    """Salary totals and adjustments for one employee, as the salary tab computes them."""
+    defaults = {"Fuel_Price": DEFAULT_FUEL_PRICE, "Fuel_Price_Adj": DEFAULT_FUEL_PRICE}
+    columns = {name: [to_number(employee.get(name), defaults.get(name, 0.0))] for name in SALARY_INPUT_COLUMNS}
+    derived = {name: values[0] for name, values in compute_salary_columns(columns).items()}
+    derived["Salary_Increment_2425"] = columns["Salary_Increment_2425"][0]
+    return derived
+
+
+def render_html(employee):
+    """One self-contained appraisal page with the same sections as EmployeeViewWindow."""
+    def value(column):
+        return html.escape(str(employee.get(column, "") or ""))
+
+    def money(amount):
+        return f"Rs. {amount:,.2f}"
+
+    def rows(pairs):
+        cells = []
+        for i in range(0, len(pairs), 2):
+            cells.append("<tr>" + "".join(
+                f"<th>{html.escape(label)}</th><td>{text}</td>" for label, text in pairs[i:i + 2]
+            ) + "</tr>")
+        return "<table>" + "".join(cells) + "</table>"
+
+    parts = [
+        "<html><head><meta charset='utf-8'>",
+        f"<title>Appraisal - {value('Employee Name')}</title><style>{STYLE}</style></head><body>",
+        "<h1>Annual Performance Review 2024/2025</h1>",
+        f"<p class='subtitle'>{value('Employee Name')} ({value('Employee ID')})</p>",
+        "<h2>Employee Information</h2>",
+        rows([
+            ("Employee ID", value("Employee ID")), ("Name", value("Employee Name")),
+            ("Department", value("Department")), ("Designation", value("Designation")),
+            ("Date of Joining", value("Date of Joining")), ("Contract Expiry Date", value("Contract Expiry Date")),
+            ("Division", value("Division")), ("Line Manager", value("Line Manager")),
+        ]),
+        "<h2>Performance KPIs</h2>",
+        "<table><tr><th>KPI</th><th>Title</th><th>Rating</th><th>Weightage</th><th>Score</th></tr>",
+    ]
+    for i in range(1, 7):
+        if not employee.get(f"KPI_{i}_Title") and not employee.get(f"KPI_{i}_Rating"):
+            continue
+        parts.append(
+            f"<tr><td>KPI {i}</td><td>{value(f'KPI_{i}_Title')}</td><td>{value(f'KPI_{i}_Rating')}</td>"
+            f"<td>{value(f'KPI_{i}_Weightage')}</td><td>{value(f'KPI_{i}_Weighted_Score')}</td></tr>"
+        )
+    parts.append(f"<tr><th colspan='4'>Part A Total</th><th>{value('Part_A_Total_Score')}</th></tr></table>")
+
+    parts.append("<h2>Soft Skills</h2><table><tr><th>Skill</th><th>Rating</th><th>Weighted Score</th></tr>")
+    for skill in SOFT_SKILLS:
+        parts.append(
+            f"<tr><td>{html.escape(skill.replace('_', ' '))}</td>"
+            f"<td>{value(f'{skill}_Rating')}</td><td>{value(f'{skill}_Weighted_Score')}</td></tr>"
+        )
+    parts.append(f"<tr><th colspan='2'>Part B Total</th><th>{value('Part_B_Total_Score')}</th></tr></table>")
+
+    parts += [
+        "<h2>Performance Summary</h2>",
+        rows([
+            ("Overall Rating", value("Overall_Rating")), ("Overall Percentage", value("Overall_Percentage")),
+            ("Promotion Rec", value("Promotion_Recommendation")), ("Retention Rec", value("Retention_Recommendation")),
+        ]),
+    ]
+    if employee.get("Training_Recommendations"):
+        parts.append(f"<h2>Training Recommendations</h2><p>{value('Training_Recommendations')}</p>")
+
+    salary = salary_summary(employee)
+    parts += [
+        "<h2>Salary Adjustments</h2>",
+        rows([
+            ("Last Year Rating", value("Last_Year_Rating")), ("Last Year Increment", value("Last_Year_Increment")),
+            ("Total Salary", money(salary["Total_Salary"])), ("Increment Percentage", f"{salary['Salary_Increment_2425']:g}%"),
+            ("Salary Adjustment", money(salary["Total_Salary_Adj"])), ("Allowance Adjustment", money(salary["Allowance_Adj"])),
+            ("Amount Diff in Fuel", money(salary["Amount_Diff_Fuel"])), ("Salary Adj Impact", value("Salary_Adj_Impact")),
+        ]),
+        "</body></html>",
+    ]
+    return "".join(parts)
+
+
+_pdf_app = None
+
+
+def write_pdf(document_html, path):
+    """Print the HTML through Qt's rich text engine; Qt is only loaded in processes that write PDFs."""
+    global _pdf_app
+    from PyQt5.QtGui import QGuiApplication, QPageSize, QPdfWriter, QTextDocument
+    from PyQt5.QtCore import QMarginsF, QSizeF
+    if QGuiApplication.instance() is None:
+        # Workers have no display; text layout only needs the offscreen platform
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _pdf_app = QGuiApplication([])
+    writer = QPdfWriter(path)
+    writer.setPageSize(QPageSize(QPageSize.A4))
+    writer.setPageMargins(QMarginsF(15, 15, 15, 15))
+    document = QTextDocument()
+    document.setHtml(document_html)
+    document.setPageSize(QSizeF(writer.pageLayout().paintRectPixels(writer.resolution()).size()))
+    document.print_(writer)
+
+
+def render_batch(employees, output_dir, fmt):
+    """Worker entry point: write one document per employee and return how many were written."""
+    for employee in employees:
+        document_html = render_html(employee)
+        path = os.path.join(output_dir, document_filename(employee, fmt))
+        if fmt == "pdf":
+            write_pdf(document_html, path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(document_html)
+    return len(employees)
+
+
+def generate_appraisals(excel_handler, output_dir, fmt="html", filters=None, workers=None,
+                        batch_size=25, progress_callback=None):
+    """Render appraisal documents for every employee matching filters, in parallel.
+
+    Rows are streamed from the workbook in the parent process and handed to a
+    process pool in batches; at most two batches per worker are in flight, so
+    memory stays flat however many employees there are. Returns a summary with
+    the document count, elapsed seconds and docs/sec.
+    """
+    if fmt not in DOCUMENT_FORMATS:
+        raise ValueError(f"Unsupported document format '{fmt}'. Use one of: {', '.join(DOCUMENT_FORMATS)}")
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        filters = {column: {str(v).strip() for v in values} for column, values in (filters or {}).items() if values}
+        workers = workers or os.cpu_count() or 1
+        headers = excel_handler.get_headers()
+        columns = [column for column in APPRAISAL_COLUMNS if column in headers]
+        columns += [column for column in filters if column not in columns]
+        start = time.perf_counter()
+        written = 0
+        pending = set()
+        batch = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def collect(block):
+                nonlocal written, pending
+                done, pending = wait(pending, return_when=FIRST_COMPLETED if block else ALL_COMPLETED)
+                for future in done:
+                    written += future.result()
+                if progress_callback:
+                    progress_callback(written, 0)
+
+            for employee in excel_handler.stream_employees(columns):
+                if not matches_filter(employee, filters):
+                    continue
+                batch.append(employee)
+                if len(batch) >= batch_size:
+                    pending.add(pool.submit(render_batch, batch, output_dir, fmt))
+                    batch = []
+                    if len(pending) >= workers * 2:
+                        collect(block=True)
+            if batch:
+                pending.add(pool.submit(render_batch, batch, output_dir, fmt))
+            collect(block=False)
+        elapsed = time.perf_counter() - start
+        summary = {
+            "documents": written,
+            "format": fmt,
+            "output_dir": output_dir,
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(written / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info("Generated %s appraisal documents in %.2fs (%s docs/sec)", written, elapsed, summary['docs_per_second'])
+        return summary
+    except Exception as e:
+        logger.error("Error generating appraisal documents: %s", e)
+        raise Exception(f"Error generating appraisal documents: {str(e)}")
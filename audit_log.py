@@ -0,0 +1,124 @@
+import getpass
+import sqlite3
+import time
+from datetime import datetime
+from log_config import get_logger
+
+logger = get_logger("excel")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    employee_id TEXT NOT NULL,
+    field_id INTEGER NOT NULL,
+    old_value TEXT,
+    new_value TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_by_employee_field ON changes (employee_id, field_id, ts);
+"""
+
+
+def current_user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "unknown"
+
+
+class AuditLog:
+    """Append-only SQLite log of field-level changes to the workbook.
+
+    Field and user names are stored once in a labels table and referenced by
+    id, timestamps are integer milliseconds, and (employee_id, field, ts) is
+    indexed so the history of one employee or one field is an index range
+    scan regardless of how many entries the log holds.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._label_ids = {}
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A fresh connection per call keeps the log usable from the executor's worker thread
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _label_id(self, conn, name):
+        if name not in self._label_ids:
+            conn.execute("INSERT OR IGNORE INTO labels (name) VALUES (?)", (name,))
+            self._label_ids[name] = conn.execute("SELECT id FROM labels WHERE name = ?", (name,)).fetchone()[0]
+        return self._label_ids[name]
+
+    def record(self, changes, user=None, timestamp=None):
+        """Append (employee_id, field, old, new) tuples in one transaction; returns how many were written."""
+        if not changes:
+            return 0
+        ts = int((timestamp or time.time()) * 1000)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    user_id = self._label_id(conn, user or current_user())
+                    conn.executemany(
+                        "INSERT INTO changes (ts, user_id, employee_id, field_id, old_value, new_value) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (ts, user_id, str(emp_id), self._label_id(conn, field), old, new)
+                            for emp_id, field, old, new in changes
+                        ]
+                    )
+            finally:
+                conn.close()
+            logger.debug("Audit log recorded %s changes", len(changes))
+            return len(changes)
+        except Exception as e:
+            # Label ids cached during a rolled back transaction may not exist
+            self._label_ids.clear()
+            logger.error("Error writing audit log: %s", e)
+            raise Exception(f"Error writing audit log: {str(e)}")
+
+    def history(self, employee_id, field=None, limit=None):
+        """Changes to one employee (optionally one field), newest first."""
+        query = (
+            "SELECT c.ts, u.name, c.employee_id, f.name, c.old_value, c.new_value FROM changes c "
+            "JOIN labels u ON u.id = c.user_id JOIN labels f ON f.id = c.field_id "
+            "WHERE c.employee_id = ?"
+        )
+        params = [str(employee_id)]
+        conn = self._connect()
+        try:
+            if field is not None:
+                row = conn.execute("SELECT id FROM labels WHERE name = ?", (field,)).fetchone()
+                if row is None:
+                    return []
+                query += " AND c.field_id = ?"
+                params.append(row[0])
+            query += " ORDER BY c.ts DESC, c.id DESC"
+            if limit:
+                query += " LIMIT ?"
+                params.append(int(limit))
+            return [
+                {
+                    "timestamp": datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S"),
+                    "user": user,
+                    "employee_id": emp_id,
+                    "field": field_name,
+                    "old": old,
+                    "new": new,
+                }
+                for ts, user, emp_id, field_name, old, new in conn.execute(query, params)
+            ]
+        finally:
+            conn.close()
@@ -0,0 +1,278 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+import openpyxl
+from excel_handler import ExcelHandler
+from synthetic_data import STANDARD_SIZES, generate_workbook
+from log_config import configure_logging, get_logger
+from memory_profile import MemoryPhases, memory_report, start_tracing
+
+logger = get_logger("perf")
+
+OPERATIONS = [
+    "initialize_excel", "get_all_employees", "get_employee_data",
+    "save_employee_data", "add_new_employee", "add_column", "curved_view_load_data", "memory_footprint",
+    "read_employee_columns", "openpyxl_read_only",
+]
+
+
+def open_workbook_handler(path, load=True):
+    handler = ExcelHandler(autoload=False)
+    handler.file_path = path
+    handler.config_path = os.path.join(os.path.dirname(path), "column_config.json")
+    if load:
+        handler.load()
+    return handler
+
+
+def measure(fn, repeat, memory=True):
+    """Time fn `repeat` times, then run it once more under tracemalloc for the Python heap peak."""
+    runs = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    result = {
+        "runs": [round(run, 4) for run in runs],
+        "min_seconds": round(min(runs), 4),
+        "median_seconds": round(statistics.median(runs), 4),
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+class BenchmarkSuite:
+    """Times the ExcelHandler operations and the curve view load on generated workbooks.
+
+    Read benchmarks use the generated file as is. Write benchmarks run on a
+    scratch copy so every size starts from the same data; setup (copying,
+    loading) is never part of a timing.
+    """
+
+    def __init__(self, workdir, sizes=None, repeat=3, memory=True, operations=None, regenerate=False):
+        self.workdir = workdir
+        self.sizes = sizes or STANDARD_SIZES
+        self.repeat = repeat
+        self.memory = memory
+        self.operations = operations or OPERATIONS
+        self.regenerate = regenerate
+
+    def dataset(self, size):
+        directory = os.path.join(self.workdir, f"employees_{size}")
+        path = os.path.join(directory, "employee_performance_data.xlsx")
+        if self.regenerate or not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            generate_workbook(path, size, seed=size)
+        return path
+
+    def scratch_copy(self, path):
+        directory = os.path.join(self.workdir, "scratch")
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        copy = os.path.join(directory, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        return copy
+
+    def qt_application(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        self.qt_app = QApplication.instance() or QApplication([])
+        return self.qt_app
+
+    def curved_view(self, handler):
+        self.qt_application()
+        from curved_performance_view import CurvedPerformanceView
+        # Without an executor the view loads synchronously through load_data
+        return CurvedPerformanceView(SimpleNamespace(excel_handler=handler, go_back=lambda: None))
+
+    def memory_footprint(self, path):
+        """Memory retained per subsystem after the GUI's load sequence (workbook, employee list, curve view)."""
+        self.qt_application()
+        gc.collect()
+        start_tracing()
+        phases = MemoryPhases()
+        try:
+            with phases.phase("workbook"):
+                handler = open_workbook_handler(path)
+            with phases.phase("employee_cache"):
+                employees = handler.get_all_employees()
+            with phases.phase("view_models"):
+                view = self.curved_view(handler)
+            with phases.phase("charts"):
+                view.update_curves()
+                self.qt_app.processEvents()
+            report = memory_report(len(employees), limit=10, phases=phases.phases)
+        finally:
+            tracemalloc.stop()
+        view.deleteLater()
+        del report["taken"]
+        return report
+
+    def run_size(self, size):
+        path = self.dataset(size)
+        results = {}
+        reader = open_workbook_handler(path)
+        last_id = reader.get_all_employees(columns=["Employee ID"])[-1]["Employee ID"]
+        if "initialize_excel" in self.operations:
+            results["initialize_excel"] = measure(reader.initialize_excel, self.repeat, self.memory)
+        if "get_all_employees" in self.operations:
+            results["get_all_employees"] = measure(reader.get_all_employees, self.repeat, self.memory)
+        if "get_employee_data" in self.operations:
+            results["get_employee_data"] = measure(lambda: reader.get_employee_data(last_id), self.repeat, self.memory)
+        if "curved_view_load_data" in self.operations:
+            view = self.curved_view(reader)
+            results["curved_view_load_data"] = measure(view.load_data, self.repeat, self.memory)
+            view.deleteLater()
+        if "read_employee_columns" in self.operations:
+            # The fast reader never loads the workbook; self_checks.py checks it against get_all_employees
+            fast = open_workbook_handler(path, load=False)
+            fast.load_column_config()
+            results["read_employee_columns"] = measure(fast.read_employee_columns, self.repeat, self.memory)
+        if "openpyxl_read_only" in self.operations:
+            columns = reader.visible_columns
+            results["openpyxl_read_only"] = measure(
+                lambda: list(reader.stream_employees(columns=columns, as_text=False)), self.repeat, self.memory
+            )
+        if "memory_footprint" in self.operations and self.memory:
+            results["memory_footprint"] = self.memory_footprint(path)
+
+        writer = open_workbook_handler(self.scratch_copy(path))
+        if "save_employee_data" in self.operations:
+            record = writer.get_employee_data(last_id, columns=writer.get_headers())
+            counter = iter(range(10 ** 9))
+            results["save_employee_data"] = measure(
+                lambda: writer.save_employee_data(dict(record, Comments=f"benchmark {next(counter)}")),
+                self.repeat, self.memory
+            )
+        if "add_new_employee" in self.operations:
+            counter = iter(range(10 ** 9))
+            results["add_new_employee"] = measure(
+                lambda: writer.add_new_employee(
+                    f"BENCH{next(counter):06d}", "Benchmark", "IT", "Analyst",
+                    "01/07/2024", "30/06/2044", "Corporate", "1"
+                ), self.repeat, self.memory
+            )
+        if "add_column" in self.operations:
+            counter = iter(range(10 ** 9))
+            results["add_column"] = measure(
+                lambda: writer.add_column(f"Benchmark_Column_{next(counter)}"), self.repeat, self.memory
+            )
+        return [
+            dict(size=size, operation=operation, **results[operation])
+            for operation in self.operations if operation in results
+        ]
+
+    def run(self):
+        results = []
+        for size in self.sizes:
+            logger.warning("Benchmarking %s employees", size)
+            results.extend(self.run_size(size))
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "openpyxl": openpyxl.__version__,
+            "repeat": self.repeat,
+            "results": results,
+        }
+
+
+def compare(report, baseline):
+    """Rows of (size, operation, baseline median, current median, speedup)."""
+    previous = {(r["size"], r["operation"]): r for r in baseline["results"]}
+    rows = []
+    for result in report["results"]:
+        before = previous.get((result["size"], result["operation"]))
+        if before and "median_seconds" in result:
+            rows.append((
+                result["size"], result["operation"], before["median_seconds"], result["median_seconds"],
+                round(before["median_seconds"] / result["median_seconds"], 2) if result["median_seconds"] else None
+            ))
+    return rows
+
+
+def compare_memory(report, baseline):
+    """Rows of (size, subsystem, baseline bytes/employee, current bytes/employee, growth %)."""
+    previous = {r["size"]: r for r in baseline["results"] if r["operation"] == "memory_footprint"}
+    rows = []
+    for result in report["results"]:
+        before = previous.get(result["size"])
+        if result["operation"] != "memory_footprint" or not before:
+            continue
+        pairs = [("total", before["bytes_per_employee"], result["bytes_per_employee"])] + [
+            (name, before["subsystems"][name]["bytes_per_employee"], entry["bytes_per_employee"])
+            for name, entry in result["subsystems"].items() if name in before["subsystems"]
+        ]
+        for name, old, new in pairs:
+            growth = round((new - old) / old * 100, 1) if old else None
+            rows.append((result["size"], name, old, new, growth))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark workbook operations on generated data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=STANDARD_SIZES)
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc peak measurements and the (slow) memory_footprint operation")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "hr_performance_benchmarks"),
+                        help="Where generated workbooks are cached")
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--max-memory-growth", type=float, default=10.0, metavar="PERCENT",
+                        help="Exit with 1 if bytes/employee of any subsystem grew more than this over the baseline")
+    args = parser.parse_args(argv)
+    # Keep per-call INFO logging off the console
+    configure_logging(level="WARNING")
+
+    suite = BenchmarkSuite(args.workdir, args.sizes, args.repeat, not args.no_memory, args.operations, args.regenerate)
+    report = suite.run()
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for result in report["results"]:
+        if result["operation"] == "memory_footprint":
+            print(f"{result['size']:>7} {result['operation']:<24} {result['bytes_per_employee']:>9,.0f} B/employee  "
+                  + "  ".join(f"{name} {entry['bytes_per_employee']:,.0f}" for name, entry in result["subsystems"].items()))
+            continue
+        line = f"{result['size']:>7} {result['operation']:<24} {result['median_seconds']:>9.4f}s"
+        if "peak_memory_mb" in result:
+            line += f"  {result['peak_memory_mb']:>8.2f} MB"
+        print(line)
+    regressions = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for size, operation, before, after, speedup in compare(report, baseline):
+            print(f"{size:>7} {operation:<24} {before:>9.4f}s -> {after:>9.4f}s  x{speedup}")
+        for size, subsystem, before, after, growth in compare_memory(report, baseline):
+            flag = ""
+            if growth is not None and growth > args.max_memory_growth:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{size:>7} memory {subsystem:<17} {before:>9,.0f} -> {after:>9,.0f} B/employee  {growth}%{flag}")
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,430 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date
+
+# Only the data layer and scoring rules are imported here; Qt is never loaded
+from excel_handler import ExcelHandler
+from employment_dates import EmploymentDates, parse_date
+from employee_query import EmployeeQuery, parse_condition, rating_value
+from payroll_engine import PayrollEngine
+from increment_simulator import IncrementSimulator
+from column_schema import display_text
+from scoring import score_record
+import report_export
+import appraisal_documents
+from workbook_merge import WorkbookMerger
+import validation
+from snapshot_diff import SnapshotDiff
+import synthetic_data
+from instrumentation import metrics, profiled
+from log_config import configure_logging, parse_levels
+
+
+def open_handler(args, load=True):
+    handler = ExcelHandler(autoload=False)
+    if args.file:
+        handler.file_path = os.path.abspath(args.file)
+        handler.config_path = os.path.join(os.path.dirname(handler.file_path), "column_config.json")
+        if not os.path.exists(handler.file_path):
+            raise FileNotFoundError(f"Workbook not found: {handler.file_path}")
+    if args.user:
+        handler.user = args.user
+    # Streaming commands read the file in read-only mode instead of loading it whole
+    if load:
+        handler.load()
+    return handler
+
+
+def read_records(path):
+    """Read employee records from a .csv, .json (list) or .jsonl file."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def write_output(rows, fmt, out=None):
+    out = out or sys.stdout
+    if fmt == "csv":
+        fieldnames = []
+        for row in rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
+        writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        json.dump(rows, out, indent=2, default=str)
+        out.write("\n")
+
+
+def lookup_employee(handler, emp_id, columns=None):
+    data = handler.get_employee_data(emp_id, columns=columns)
+    # IDs typed as numbers in Excel come back as int, not as the string given on the command line
+    if data is None and emp_id.isdigit():
+        data = handler.get_employee_data(int(emp_id), columns=columns)
+    return data
+
+
+def cmd_list(handler, args):
+    columns = args.columns.split(",") if args.columns else None
+    write_output(handler.get_all_employees(columns=columns), args.format)
+
+
+def cmd_query(handler, args):
+    columns = args.columns.split(",") if args.columns else None
+    conditions = [parse_condition(text) for text in args.where]
+    results = EmployeeQuery(handler, columns=columns).query(conditions, args.sort, args.descending, args.limit)
+    if columns:
+        results = [{column: record.get(column, "") for column in columns} for record in results]
+    write_output(results, args.format)
+
+
+def cmd_get(handler, args):
+    data = lookup_employee(handler, args.employee_id, columns=handler.get_headers())
+    if data is None:
+        print(f"No employee found with ID {args.employee_id}", file=sys.stderr)
+        return 1
+    write_output([data] if args.format == "csv" else data, args.format)
+
+
+def cmd_import(handler, args):
+    updated, added = handler.save_employees(read_records(args.input))
+    write_output({"updated": updated, "added": added}, "json")
+
+
+def cmd_bulk_update(handler, args):
+    records = read_records(args.input)
+    known_ids = {emp["Employee ID"] for emp in handler.get_all_employees(columns=["Employee ID"])}
+    existing, missing = [], []
+    for record in records:
+        if str(record.get("Employee ID", "")).strip() in known_ids:
+            existing.append(record)
+        else:
+            missing.append(record.get("Employee ID", ""))
+    updated, _ = handler.save_employees(existing)
+    write_output({"updated": updated, "unknown_employee_ids": missing}, "json")
+
+
+def cmd_recompute_scores(handler, args):
+    headers = handler.get_headers()
+    rating_columns = [h for h in headers if h.endswith("_Rating") and h not in ("Overall_Rating", "Last_Year_Rating")]
+    changes = {}
+    changed_ids = set()
+    for employee in handler.get_all_employees(columns=headers):
+        # Employees who have not been rated yet keep their blank scores
+        if not any(employee.get(h) and employee.get(h) != "Select Rating" for h in rating_columns):
+            continue
+        for field, value in score_record(employee).items():
+            if field in headers and not handler.same_value(employee.get(field, ""), value):
+                changes.setdefault(field, {})[employee["Employee ID"]] = value
+                changed_ids.add(employee["Employee ID"])
+    if changes and not args.dry_run:
+        handler.update_columns(changes)
+    write_output({
+        "employees_changed": len(changed_ids),
+        "cells_changed": sum(len(values) for values in changes.values()),
+        "dry_run": args.dry_run
+    }, "json")
+
+
+def cmd_normalize_types(handler, args):
+    write_output({"cells_rewritten": handler.normalize_column_types()}, "json")
+
+
+def as_of_date(args):
+    if not args.as_of:
+        return None
+    as_of = parse_date(args.as_of)
+    if as_of is None:
+        raise ValueError(f"Unrecognised date: {args.as_of}")
+    return as_of
+
+
+def cmd_expiring(handler, args):
+    as_of = as_of_date(args) or date.today()
+    rows = [
+        {"Employee ID": emp_id, "Contract Expiry Date": display_text(expiry), "days_left": (expiry - as_of).days}
+        for emp_id, expiry in EmploymentDates(handler).expiring_within(args.days, as_of)
+    ]
+    write_output(rows, args.format)
+
+
+def cmd_recompute_experience(handler, args):
+    experience = EmploymentDates(handler).run(as_of=as_of_date(args), write=not args.dry_run)
+    write_output({"employees": len(experience), "dry_run": args.dry_run}, "json")
+
+
+def cmd_payroll(handler, args):
+    effective = parse_date(args.effective_date) if args.effective_date else None
+    if args.effective_date and effective is None:
+        raise ValueError(f"Unrecognised date: {args.effective_date}")
+    summary = PayrollEngine(handler).run(effective, as_of_date(args), write=not args.dry_run)
+    write_output(dict(summary, dry_run=args.dry_run), "json")
+
+
+def parse_increment(text):
+    """'5:Band A=12' -> ((rating code, band label), 12.0); the rating may also be (part of) its label."""
+    cohort, sep, percentage = text.rpartition("=")
+    rating, colon, band = cohort.partition(":")
+    if not sep or not colon:
+        raise ValueError(f"Not an increment: '{text}' (expected RATING:BAND=PERCENT, e.g. 5:Band A=12)")
+    return (rating_value(rating), band.strip()), float(percentage)
+
+
+def cmd_simulate(handler, args):
+    simulator = IncrementSimulator(PayrollEngine(handler))
+    simulator.prepare()
+    bands = [label for label, _ in simulator.salary_bands]
+    matrix = dict(parse_increment(text) for text in args.increment)
+    for _, band in matrix:
+        if band not in bands:
+            raise ValueError(f"Unknown salary band: {band} (bands: {', '.join(bands)})")
+    simulator.set_matrix(matrix)
+    totals = simulator.totals()
+    if not simulator.verify():
+        raise ValueError(f"Cohort totals {totals['total']} do not match a full recompute")
+    result = dict(totals, cohorts=simulator.cohort_rows(), committed=0)
+    if args.budget is not None:
+        result["budget"] = args.budget
+        result["remaining"] = round(args.budget - totals["total"], 2)
+    if args.commit:
+        result["committed"] = simulator.commit()
+    write_output(result, "json")
+
+
+def cmd_curve_report(handler, args):
+    columns = ["Employee ID", "Overall_Rating"] + ([args.group_by] if args.group_by else [])
+    rows = report_export.curve_rows(handler.stream_employees(columns), args.group_by)
+    write_output(rows, args.format)
+
+
+def cmd_export(handler, args):
+    if args.report == "scores":
+        count = report_export.export_employee_scores(handler, args.output, args.format)
+    elif args.report == "summary":
+        count = report_export.export_rating_summary(handler, args.output, args.format)
+    elif args.report == "curves":
+        count = report_export.export_group_curves(handler, args.output, args.group_by or "Department", args.format)
+    elif args.report == "scorecards":
+        count = report_export.export_scorecards(handler, args.output, args.group_by or "Department", args.format)
+    else:
+        count = report_export.export_all_columns(handler, args.output, args.format)
+    print(f"Exported {count} rows to {args.output}", file=sys.stderr)
+
+
+def cmd_appraisals(handler, args):
+    filters = {
+        "Employee ID": args.employee_id,
+        "Department": args.department,
+        "Division": args.division,
+        "Overall_Rating": args.rating,
+    }
+    summary = appraisal_documents.generate_appraisals(
+        handler, args.output_dir, fmt=args.format, filters=filters, workers=args.workers, batch_size=args.batch_size
+    )
+    write_output(summary, "json")
+
+
+def cmd_merge(handler, args):
+    report = WorkbookMerger(handler, args.inputs, workers=args.workers).run(dry_run=args.dry_run)
+    write_output(report, "json")
+
+
+def cmd_validate(handler, args):
+    report = validation.validate_workbook(handler, workers=args.workers, limit=args.limit)
+    if args.format == "csv":
+        write_output(report["violations"], "csv")
+    else:
+        write_output(report, "json")
+    return 2 if report["violations_total"] else 0
+
+
+def cmd_diff(handler, args):
+    report = SnapshotDiff(os.path.abspath(args.old), os.path.abspath(args.new or handler.file_path)).run()
+    if args.format == "csv":
+        write_output(report["changes"], "csv")
+    else:
+        write_output(report, "json")
+
+
+def cmd_history(handler, args):
+    rows = handler.audit_log().history(args.employee_id, field=args.field, limit=args.limit)
+    write_output(rows, args.format)
+
+
+def cmd_generate(handler, args):
+    for size in args.employees:
+        path = args.output.format(n=size) if "{n}" in args.output else args.output
+        synthetic_data.generate_workbook(path, size, seed=args.seed)
+        print(f"Generated {size} employees into {path}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Batch operations on the performance workbook without the GUI.")
+    parser.add_argument("--file", help="Workbook path (defaults to assets/employee_performance_data.xlsx)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show INFO logging")
+    parser.add_argument("--log-levels", metavar="SPEC",
+                        help="Per-subsystem levels, e.g. excel=DEBUG,reports=WARNING (also HR_LOG_LEVELS)")
+    parser.add_argument("--user", help="Name recorded in the audit log (default: the login name)")
+    parser.add_argument("--metrics", metavar="JSON", help="Record call counts and timings and write them to this file")
+    parser.add_argument("--profile", metavar="PROF", help="Run the command under cProfile and write the trace here")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="List employees")
+    p.add_argument("--columns", help="Comma separated columns (default: visible columns)")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.add_argument("--fast-reader", action="store_true",
+                   help="Decode only the needed columns straight from the sheet XML instead of loading the workbook")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("query", help="Filter, sort and limit employees using the secondary indexes")
+    p.add_argument("--where", action="append", default=[], metavar="CONDITION",
+                   help="Repeatable: Division=Finance, rating=2 (or a rating label), Overall_Percentage>=80, "
+                        "'Employee Name~khan' (substring)")
+    p.add_argument("--sort", metavar="COLUMN", help="Column to sort by (or rating); blanks come last")
+    p.add_argument("--descending", action="store_true", help="Highest first")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--columns", help="Comma separated columns (default: visible columns)")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.add_argument("--fast-reader", action="store_true",
+                   help="Decode only the needed columns straight from the sheet XML instead of loading the workbook")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("get", help="Show one employee with all columns")
+    p.add_argument("employee_id")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_get)
+
+    p = sub.add_parser("import", help="Add or update employees from a CSV/JSON/JSONL file")
+    p.add_argument("input")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("bulk-update", help="Update existing employees from a CSV/JSON/JSONL file")
+    p.add_argument("input")
+    p.set_defaults(func=cmd_bulk_update)
+
+    p = sub.add_parser("recompute-scores", help="Recompute weighted scores and overall ratings")
+    p.add_argument("--dry-run", action="store_true")
+    p.set_defaults(func=cmd_recompute_scores)
+
+    p = sub.add_parser("expiring", help="Employees whose contract expires in the next N days")
+    p.add_argument("--days", type=int, default=90)
+    p.add_argument("--as-of", help="Count from this date instead of today (DD/MM/YYYY or YYYY-MM-DD)")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_expiring)
+
+    p = sub.add_parser("recompute-experience", help="Recompute Exp in PMTF from Date of Joining for every employee")
+    p.add_argument("--as-of", help="Measure up to this date instead of each employee's Date of Evaluation")
+    p.add_argument("--dry-run", action="store_true")
+    p.set_defaults(func=cmd_recompute_experience)
+
+    p = sub.add_parser("payroll", help="Recompute salary totals and adjustments, with back-dated increment arrears")
+    p.add_argument("--effective-date", help="Increments apply from this date; adds Increment_Arrears up to --as-of")
+    p.add_argument("--as-of", help="Count arrears up to this date instead of today (DD/MM/YYYY or YYYY-MM-DD)")
+    p.add_argument("--dry-run", action="store_true", help="Print the cost summary without saving")
+    p.set_defaults(func=cmd_payroll)
+
+    p = sub.add_parser("simulate", help="Annual cost of a rating x salary band increment matrix against a budget")
+    p.add_argument("--increment", action="append", default=[], metavar="RATING:BAND=PERCENT",
+                   help="Repeatable, e.g. '5:Band A=12'; cohorts without one keep their current Salary_Increment_2425")
+    p.add_argument("--budget", type=float, help="Annual increment budget to compare the scenario with")
+    p.add_argument("--commit", action="store_true", help="Write the scenario's Salary_Increment_2425 values")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("normalize-types", help="Store numbers, dates and ratings saved as text in their column types")
+    p.set_defaults(func=cmd_normalize_types)
+
+    p = sub.add_parser("curve-report", help="Rating distribution against the required curve")
+    p.add_argument("--group-by", help="Column to group by, e.g. Department")
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_curve_report, streaming=True)
+
+    p = sub.add_parser("export", help="Stream a report to .xlsx, .csv or .jsonl")
+    p.add_argument("--output", required=True)
+    p.add_argument("--report", choices=["employees", "scores", "summary", "curves", "scorecards"], default="employees",
+                   help="employees: all columns; scores: score table; summary/curves: rating distribution; "
+                        "scorecards: headcount, scores, rating mix and salary impact per group")
+    p.add_argument("--group-by", help="Group column for --report curves/scorecards (default: Department)")
+    p.add_argument("--format", choices=list(report_export.REPORT_WRITERS), help="Defaults to the output file extension")
+    p.set_defaults(func=cmd_export, streaming=True)
+
+    p = sub.add_parser("appraisals", help="Render one appraisal document per employee")
+    p.add_argument("--output-dir", required=True)
+    p.add_argument("--format", choices=appraisal_documents.DOCUMENT_FORMATS, default="html")
+    p.add_argument("--employee-id", action="append", help="Repeat to select several employees")
+    p.add_argument("--department", action="append")
+    p.add_argument("--division", action="append")
+    p.add_argument("--rating", action="append", help="Overall_Rating text, e.g. \"Outstanding (5)\"")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument("--batch-size", type=int, default=25, help="Employees per worker task")
+    p.set_defaults(func=cmd_appraisals, streaming=True)
+
+    p = sub.add_parser("merge", help="Merge departmental workbooks into the master (--file) by Employee ID")
+    p.add_argument("inputs", nargs="+")
+    p.add_argument("--workers", type=int, help="Reader processes (default: one per input, up to CPU count)")
+    p.add_argument("--dry-run", action="store_true", help="Report changes and conflicts without saving")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("validate", help="Check KPI weightages, stored scores and dates on every row")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count; 1 runs in-process)")
+    p.add_argument("--limit", type=int, help="Only list the first N violations (counts stay complete)")
+    p.add_argument("--format", choices=["json", "csv"], default="json", help="csv lists the violations only")
+    p.set_defaults(func=cmd_validate, streaming=True)
+
+    p = sub.add_parser("diff", help="Show changed, added and removed employees between two workbook versions")
+    p.add_argument("old", help="Earlier snapshot")
+    p.add_argument("new", nargs="?", help="Later snapshot (default: the workbook, see --file)")
+    p.add_argument("--format", choices=["json", "csv"], default="json", help="csv lists the changed cells only")
+    p.set_defaults(func=cmd_diff, streaming=True)
+
+    p = sub.add_parser("history", help="Field change history of one employee from the audit log")
+    p.add_argument("employee_id")
+    p.add_argument("--field", help="Only changes to this column, e.g. Overall_Rating")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--format", choices=["json", "csv"], default="json")
+    p.set_defaults(func=cmd_history, streaming=True)
+
+    p = sub.add_parser("generate", help="Write a synthetic workbook in the standard layout for testing")
+    p.add_argument("--employees", type=int, nargs="+", default=[1000],
+                   help=f"One or more sizes, e.g. {' '.join(map(str, synthetic_data.STANDARD_SIZES))}")
+    p.add_argument("--output", required=True, help="Path; use {n} for the size when generating several")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_generate, streaming=True)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_logging(level="INFO" if args.verbose else "WARNING", levels=parse_levels(args.log_levels))
+    if args.metrics:
+        metrics.enabled = True
+    try:
+        if args.profile:
+            with profiled(args.profile):
+                return run_command(args)
+        return run_command(args)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        if args.metrics:
+            metrics.dump_json(args.metrics)
+
+
+def run_command(args):
+    fast_reader = getattr(args, "fast_reader", False)
+    handler = open_handler(args, load=not (getattr(args, "streaming", False) or fast_reader))
+    if fast_reader:
+        # Visible columns and column types still decide what is read and how it is decoded
+        handler.load_column_config()
+    return args.func(handler, args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
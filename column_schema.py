@@ -0,0 +1,114 @@
+# Column types of the performance workbook; keep this module free of Qt imports
+from datetime import date, datetime
+from employment_dates import parse_date
+from scoring import KPI_RATINGS, OVERALL_RATINGS, SOFT_SKILL_RATINGS, SOFT_SKILLS
+
+INT, DECIMAL, DATE, RATING, TEXT = "int", "decimal", "date", "rating", "text"
+COLUMN_TYPES = [TEXT, INT, DECIMAL, DATE, RATING]
+
+DISPLAY_DATE_FORMAT = "%d/%m/%Y"
+EXCEL_DATE_FORMAT = "DD/MM/YYYY"
+# Shown by unrated combo boxes; stored as a blank cell
+RATING_PLACEHOLDER = "Select Rating"
+
+SCHEMA = {
+    "Date of Joining": DATE, "Date of Evaluation": DATE, "Contract Expiry Date": DATE,
+    "Exp in PMTF": DECIMAL,
+    "Part_A_Total_Score": DECIMAL, "Part_B_Total_Score": DECIMAL,
+    "Overall_Rating": RATING, "Last_Year_Rating": RATING,
+    "Basic_Salary": DECIMAL, "Gross_Amount": DECIMAL, "Car_Allowance": DECIMAL, "Fuel_Litre": DECIMAL,
+    "Fuel_Price": DECIMAL, "House_Rent": DECIMAL, "Medical": DECIMAL, "Utilities": DECIMAL,
+    "Total_Salary": DECIMAL, "Diff_Salary": DECIMAL, "Diff_Conveyance": DECIMAL, "Fuel_Litre_Adj": DECIMAL,
+    "Fuel_Price_Adj": DECIMAL, "Diff_Car_Allowance": DECIMAL, "Amount_Diff_Fuel": DECIMAL,
+    "Total_Salary_Adj": DECIMAL, "Allowance_Adj": DECIMAL, "Salary_Increment_2425": DECIMAL,
+}
+RATING_LABELS = {"Overall_Rating": OVERALL_RATINGS, "Last_Year_Rating": OVERALL_RATINGS}
+for i in range(1, 7):
+    SCHEMA.update({f"KPI_{i}_Rating": RATING, f"KPI_{i}_Weightage": INT, f"KPI_{i}_Weighted_Score": DECIMAL})
+    RATING_LABELS[f"KPI_{i}_Rating"] = list(KPI_RATINGS)
+for skill in SOFT_SKILLS:
+    SCHEMA.update({f"{skill}_Rating": RATING, f"{skill}_Weighted_Score": DECIMAL})
+    RATING_LABELS[f"{skill}_Rating"] = list(SOFT_SKILL_RATINGS)
+
+
+def column_type(header, custom_types=None):
+    """Type of a column: custom columns as configured, known headers from SCHEMA, anything else text."""
+    if custom_types and header in custom_types:
+        return custom_types[header]
+    return SCHEMA.get(header, TEXT)
+
+
+def parse_number(value):
+    """Number from a cell or typed-in text ("76,798", "Rs. 1,200.00"); None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    text = str(value).replace("Rs.", "").replace(",", "").strip()
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def decode(value, kind):
+    """The in-memory value of a cell: blanks are "", anything that does not parse is kept as text."""
+    if value is None or value == "":
+        return ""
+    if kind == INT or kind == DECIMAL:
+        number = parse_number(value)
+        if number is None:
+            return str(value)
+        if kind == INT and float(number).is_integer():
+            return int(number)
+        return float(number)
+    if kind == DATE:
+        parsed = parse_date(value)
+        return parsed if parsed is not None else str(value)
+    if kind == RATING:
+        text = str(value).strip()
+        return "" if text == RATING_PLACEHOLDER else text
+    return str(value)
+
+
+def decoder(kind):
+    """decode() bound to one column type, for decoding a column row after row."""
+    if kind == TEXT:
+        return lambda value: "" if value is None else str(value)
+    return lambda value: decode(value, kind)
+
+
+def encode(value, kind, old_value=None, labels=None):
+    """The cell value to store for value (typically form text): typed, blanks as None.
+
+    Text columns keep a numeric cell numeric when numeric text is written
+    over it. labels (a rating column's enum) maps "4" or a label in any
+    case to the canonical label.
+    """
+    if value is None or (isinstance(value, str) and value.strip() == ""):
+        return None
+    if kind == TEXT:
+        if isinstance(value, str) and isinstance(old_value, (int, float)) and not isinstance(old_value, bool):
+            number = parse_number(value)
+            if number is not None:
+                return int(number) if isinstance(old_value, int) and float(number).is_integer() else float(number)
+        return value
+    decoded = decode(value, kind)
+    if kind == RATING:
+        if decoded == "":
+            return None
+        for label in labels or []:
+            if decoded.lower() == label.lower() or decoded == label[-2:-1]:
+                return label
+    if kind == DATE and isinstance(decoded, date):
+        return datetime(decoded.year, decoded.month, decoded.day)
+    return decoded
+
+
+def display_text(value):
+    """Text for a widget or export showing a cell or decoded value."""
+    if isinstance(value, datetime) and value.time() != datetime.min.time():
+        return value.strftime(DISPLAY_DATE_FORMAT + " %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime(DISPLAY_DATE_FORMAT)
+    return "" if value is None else str(value)
\ No newline at end of file
@@ -1,20 +1,25 @@
-import logging
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGroupBox, QScrollArea, 
-    QTableWidget, QTableWidgetItem, QGridLayout, QHeaderView, QPushButton
+    QTableWidget, QTableWidgetItem, QGridLayout, QHeaderView, QPushButton,
+    QComboBox, QFileDialog, QMessageBox, QLineEdit
 )
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor
 from PyQt5.QtChart import QChart, QChartView, QPieSeries, QPieSlice
 import openpyxl
 import os
+from scoring import OVERALL_RATINGS, REQUIRED_DISTRIBUTION, rating_distribution
+from employee_query import parse_conditions
+import report_export
+from instrumentation import instrumented, metrics
+from log_config import Lazy, get_logger
 
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = get_logger("curve")
 
 class CurvedPerformanceView(QWidget):
     def __init__(self, parent_app):
         super().__init__()
-        logging.debug("Initializing CurvedPerformanceView")
+        logger.debug("Initializing CurvedPerformanceView")
         self.parent_app = parent_app
         self.setMinimumSize(1600, 1200)
         self.setStyleSheet("""
@@ -57,17 +62,64 @@ class CurvedPerformanceView(QWidget):
                 font-weight: bold;
             }
         """)
+        self.employee_data = []
+        # Employee IDs the table is filtered to, in query order; None shows everyone
+        self.table_filter = None
+        self.load_task = None
+        self.actual_slices = []
+        self.no_data_slice = None
+        # Workbook mtime the shown data was read at; a save since then reloads on the next show
+        self.data_mtime = None
+        # Coalesces bursts of updates (reloads after saves, filter changes) into one redraw per interval
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.setInterval(100)
+        self.redraw_timer.timeout.connect(self.flush_redraw)
+        self.curves_pending = False
         self.create_ui()
         # logging.debug("UI created")
-        if not self.load_data():
-            # logging.error("Failed to load performance data")
-            from PyQt5.QtWidgets import QMessageBox
-            QMessageBox.critical(self, "Error", "Failed to load performance data. Please check the Excel file.")
-            if self.parent_app:
-                self.parent_app.go_back()
+        if self.parent_app and getattr(self.parent_app, "io_executor", None):
+            self.refresh()
+        elif not self.load_data():
+            self.on_load_failed()
         else:
             # logging.debug("Data loaded, scheduling curves update")
-            QTimer.singleShot(0, self.update_curves)
+            self.schedule_update_curves()
+
+    @instrumented()
+    def refresh(self):
+        """Reload the workbook on the I/O worker and redraw once the data arrives."""
+        self.parent_app.io_executor.cancel(self.load_task)
+        self.emp_count_value.setText("Loading...")
+        self.data_mtime = self.parent_app.excel_handler.loaded_mtime
+        self.load_task = self.parent_app.io_executor.submit(
+            "Loading performance data", self.read_performance_data,
+            on_finished=self.on_data_loaded,
+            on_error=lambda message: self.on_load_failed()
+        )
+
+    def on_data_loaded(self, employee_data):
+        self.load_task = None
+        if not employee_data:
+            logger.error("No employee data loaded")
+            self.on_load_failed()
+            return
+        self.employee_data = employee_data
+        self.schedule_update_curves()
+
+    def showEvent(self, event):
+        # Saves made in other views since the last load redraw the curves with fresh data
+        if self.load_task is None and getattr(self.parent_app, "io_executor", None) \
+                and self.data_mtime != self.parent_app.excel_handler.loaded_mtime:
+            self.refresh()
+        super().showEvent(event)
+
+    def on_load_failed(self):
+        self.load_task = None
+        # logging.error("Failed to load performance data")
+        QMessageBox.critical(self, "Error", "Failed to load performance data. Please check the Excel file.")
+        if self.parent_app:
+            self.parent_app.go_back()
 
     def create_ui(self):
         # logging.debug("Creating UI")
@@ -92,6 +144,19 @@ class CurvedPerformanceView(QWidget):
         if self.parent_app:
             back_button.clicked.connect(self.parent_app.go_back)
         main_layout.addWidget(back_button)
+
+        export_layout = QHBoxLayout()
+        export_layout.addStretch()
+        self.export_combo = QComboBox()
+        self.export_combo.addItems([
+            "Rating Distribution Summary", "Department Curves", "Division Curves",
+            "Department Scorecards", "Division Scorecards", "Employee Scores"
+        ])
+        export_layout.addWidget(self.export_combo)
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export_report)
+        export_layout.addWidget(self.export_button)
+        main_layout.addLayout(export_layout)
         
         header_label = QLabel("Annual Performance Review 2024/2025\n(Performance Curve)")
         header_label.setAlignment(Qt.AlignCenter)
@@ -154,6 +219,22 @@ class CurvedPerformanceView(QWidget):
         scroll_layout.addWidget(charts_group)
         employee_group = QGroupBox("Employee Performance Data")
         employee_layout = QVBoxLayout(employee_group)
+        filter_layout = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText(
+            "Filter, e.g. Division=Finance; rating=Below Expectations; Overall_Percentage>=80; Employee Name~khan"
+        )
+        self.filter_edit.returnPressed.connect(self.apply_filter)
+        filter_layout.addWidget(self.filter_edit)
+        filter_button = QPushButton("Filter")
+        filter_button.clicked.connect(self.apply_filter)
+        filter_layout.addWidget(filter_button)
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_filter)
+        filter_layout.addWidget(clear_button)
+        self.filter_count = QLabel()
+        filter_layout.addWidget(self.filter_count)
+        employee_layout.addLayout(filter_layout)
         self.employee_table = QTableWidget()
         self.employee_table.setColumnCount(11)
         self.employee_table.setHorizontalHeaderLabels([
@@ -172,75 +253,116 @@ class CurvedPerformanceView(QWidget):
         # logging.debug("UI creation complete")
         
 
+    @instrumented()
     def load_data(self):
         try:
-            # logging.debug("Loading data from employee_performance_data.xlsx")
-            emp_file = os.path.join("assets", "employee_performance_data.xlsx")
-            if not os.path.exists(emp_file):
-                logging.error(f"Employee file not found: {emp_file}")
-                return False
-            wb_emp = openpyxl.load_workbook(emp_file)
-            sheet_names = wb_emp.sheetnames
-            ws_emp = None
-            for sheet_name in ["Sheet1", "Performance_Data", "Data", "Employee_Data"]:
-                if sheet_name in sheet_names:
-                    ws_emp = wb_emp[sheet_name]
-                    break
-            if not ws_emp:
-                logging.error(f"No valid sheet found. Available sheets: {sheet_names}")
-                return False
-            self.employee_data = []
-            headers = []
-            for cell in ws_emp[1]:
-                headers.append(cell.value)
-            # logging.debug(f"Headers found: {headers[:15]}...")  
-            employee_id_col = self.find_column_index(headers, ["Employee ID", "Emp ID", "ID"])
-            employee_name_col = self.find_column_index(headers, ["Employee Name", "Name"])
-            department_col = self.find_column_index(headers, ["Department", "Dept"])
-            designation_col = self.find_column_index(headers, ["Designation", "Position"])
-            doj_col = self.find_column_index(headers, ["Date of Joining", "DOJ", "Joining Date"])
-            division_col = self.find_column_index(headers, ["Division", "Div"])
-            overall_rating_col = self.find_column_index(headers, ["Overall_Rating", "Overall Rating", "Rating"])
-            overall_percentage_col = self.find_column_index(headers, ["Overall_Percentage", "Overall Percentage", "Percentage"])
-            
-            for row in ws_emp.iter_rows(min_row=2, values_only=True):
-                if row and len(row) > 0 and row[0]:  # Employee ID exists
-                    employee_id = row[employee_id_col] if employee_id_col is not None else row[0]
-                    employee_name = row[employee_name_col] if employee_name_col is not None else (row[1] if len(row) > 1 else "")
-                    department = row[department_col] if department_col is not None else (row[2] if len(row) > 2 else "")
-                    designation = row[designation_col] if designation_col is not None else (row[3] if len(row) > 3 else "")
-                    doj = row[doj_col] if doj_col is not None else (row[4] if len(row) > 4 else "")
-                    division = row[division_col] if division_col is not None else (row[6] if len(row) > 6 else "")
-                    overall_rating = row[overall_rating_col] if overall_rating_col is not None else (
-                        row[43] if len(row) > 43 else "Meets Expectations (3)")
-                    overall_percentage = row[overall_percentage_col] if overall_percentage_col is not None else (
-                        row[44] if len(row) > 44 else 0)
-                    
-                    if isinstance(overall_percentage, str) and '%' in str(overall_percentage):
-                        overall_percentage = float(str(overall_percentage).replace('%', ''))
-                    elif overall_percentage is None:
-                        overall_percentage = 0
-                    
-                    self.employee_data.append({
-                        "id": str(employee_id) if employee_id else "",
-                        "name": str(employee_name) if employee_name else "",
-                        "department": str(department) if department else "",
-                        "designation": str(designation) if designation else "",
-                        "doj": str(doj) if doj else "",
-                        "division": str(division) if division else "",
-                        "overall_rating": str(overall_rating) if overall_rating else "Meets Expectations (3)",
-                        "overall_percentage": float(overall_percentage) if overall_percentage else 0
-                    })
-            
+            self.employee_data = self.read_performance_data()
             # logging.debug(f"Loaded {len(self.employee_data)} employee records")
             if not self.employee_data:
-                logging.error("No employee data loaded")
+                logger.error("No employee data loaded")
                 return False
             return True
         except Exception as e:
-            logging.error(f"Error loading data: {str(e)}")
+            logger.error("Error loading data: %s", e)
             return False
 
+    @instrumented()
+    def read_performance_data(self):
+        """Read the rating rows from the workbook; safe to call from a worker thread."""
+        # logging.debug("Loading data from employee_performance_data.xlsx")
+        emp_file = os.path.join("assets", "employee_performance_data.xlsx")
+        if self.parent_app and getattr(self.parent_app, "excel_handler", None):
+            emp_file = self.parent_app.excel_handler.file_path
+        if not os.path.exists(emp_file):
+            raise FileNotFoundError(f"Employee file not found: {emp_file}")
+        wb_emp = openpyxl.load_workbook(emp_file)
+        metrics.add_bytes("CurvedPerformanceView.read_performance_data", read_path=emp_file)
+        sheet_names = wb_emp.sheetnames
+        ws_emp = None
+        for sheet_name in ["Sheet1", "Performance_Data", "Data", "Employee_Data"]:
+            if sheet_name in sheet_names:
+                ws_emp = wb_emp[sheet_name]
+                break
+        if not ws_emp:
+            raise ValueError(f"No valid sheet found. Available sheets: {sheet_names}")
+        employee_data = []
+        headers = []
+        for cell in ws_emp[1]:
+            headers.append(cell.value)
+        # logging.debug(f"Headers found: {headers[:15]}...")  
+        employee_id_col = self.find_column_index(headers, ["Employee ID", "Emp ID", "ID"])
+        employee_name_col = self.find_column_index(headers, ["Employee Name", "Name"])
+        department_col = self.find_column_index(headers, ["Department", "Dept"])
+        designation_col = self.find_column_index(headers, ["Designation", "Position"])
+        doj_col = self.find_column_index(headers, ["Date of Joining", "DOJ", "Joining Date"])
+        division_col = self.find_column_index(headers, ["Division", "Div"])
+        overall_rating_col = self.find_column_index(headers, ["Overall_Rating", "Overall Rating", "Rating"])
+        overall_percentage_col = self.find_column_index(headers, ["Overall_Percentage", "Overall Percentage", "Percentage"])
+        
+        for row in ws_emp.iter_rows(min_row=2, values_only=True):
+            if row and len(row) > 0 and row[0]:  # Employee ID exists
+                employee_id = row[employee_id_col] if employee_id_col is not None else row[0]
+                employee_name = row[employee_name_col] if employee_name_col is not None else (row[1] if len(row) > 1 else "")
+                department = row[department_col] if department_col is not None else (row[2] if len(row) > 2 else "")
+                designation = row[designation_col] if designation_col is not None else (row[3] if len(row) > 3 else "")
+                doj = row[doj_col] if doj_col is not None else (row[4] if len(row) > 4 else "")
+                division = row[division_col] if division_col is not None else (row[6] if len(row) > 6 else "")
+                overall_rating = row[overall_rating_col] if overall_rating_col is not None else (
+                    row[43] if len(row) > 43 else "Meets Expectations (3)")
+                overall_percentage = row[overall_percentage_col] if overall_percentage_col is not None else (
+                    row[44] if len(row) > 44 else 0)
+                
+                if isinstance(overall_percentage, str) and '%' in str(overall_percentage):
+                    overall_percentage = float(str(overall_percentage).replace('%', ''))
+                elif overall_percentage is None:
+                    overall_percentage = 0
+                
+                employee_data.append({
+                    "id": str(employee_id) if employee_id else "",
+                    "name": str(employee_name) if employee_name else "",
+                    "department": str(department) if department else "",
+                    "designation": str(designation) if designation else "",
+                    "doj": str(doj) if doj else "",
+                    "division": str(division) if division else "",
+                    "overall_rating": str(overall_rating) if overall_rating else "Meets Expectations (3)",
+                    "overall_percentage": float(overall_percentage) if overall_percentage else 0
+                })
+        return employee_data
+
+    def export_report(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Report", "", "Excel Workbook (*.xlsx);;CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not path:
+            return
+        handler = self.parent_app.excel_handler
+        report = self.export_combo.currentText()
+        if report == "Rating Distribution Summary":
+            job = (report_export.export_rating_summary, handler, path)
+        elif report == "Department Curves":
+            job = (report_export.export_group_curves, handler, path, "Department")
+        elif report == "Division Curves":
+            job = (report_export.export_group_curves, handler, path, "Division")
+        elif report.endswith("Scorecards"):
+            group_by = report.split()[0]
+            job = (report_export.export_scorecards, handler, path, group_by, None,
+                   self.parent_app.scorecard_cache(group_by))
+        else:
+            job = (report_export.export_employee_scores, handler, path)
+        self.export_button.setEnabled(False)
+        self.parent_app.io_executor.submit(
+            f"Exporting {report}", *job,
+            on_finished=lambda count: self.on_export_done(f"Exported {count} rows to {path}"),
+            on_error=lambda message: self.on_export_done(f"Export failed: {message}", failed=True)
+        )
+
+    def on_export_done(self, message, failed=False):
+        self.export_button.setEnabled(True)
+        if failed:
+            QMessageBox.critical(self, "Error", message)
+        else:
+            QMessageBox.information(self, "Export", message)
+
     def find_column_index(self, headers, possible_names):
         for i, header in enumerate(headers):
             if header:
@@ -250,44 +372,34 @@ class CurvedPerformanceView(QWidget):
                         return i
         return None
 
+    def schedule_update_curves(self):
+        """Request a redraw; calls arriving while one is pending are merged into it."""
+        self.curves_pending = True
+        self.schedule_update_table()
+
+    def schedule_update_table(self):
+        """Request a redraw of the employee table only (the charts do not depend on the filter)."""
+        if not self.redraw_timer.isActive():
+            self.redraw_timer.start()
+
+    def flush_redraw(self):
+        if self.curves_pending:
+            self.curves_pending = False
+            self.update_curves()
+        else:
+            self.update_employee_table()
+
+    @instrumented()
     def update_curves(self):
         # logging.debug("Starting update_curves")
         try:
-            ratings = [
-                "Outstanding (5)", 
-                "Exceeds Expectations (4)",
-                "Meets Expectations (3)", 
-                "Below Expectations (2)", 
-                "Serious Performance Concerns (1)"
-            ]
-            
-            required_percentages = {
-                "Outstanding (5)": 5,
-                "Exceeds Expectations (4)": 15,
-                "Meets Expectations (3)": 65,
-                "Below Expectations (2)": 10,
-                "Serious Performance Concerns (1)": 5
-            }
-            actual_counts = {rating: 0 for rating in ratings}
+            ratings = OVERALL_RATINGS
+            required_percentages = REQUIRED_DISTRIBUTION
             # logging.debug("Sample employee ratings:")
-            for i, emp in enumerate(self.employee_data[:10]):  
-                logging.debug(f"Employee {i+1}: Name='{emp.get('name', 'No name')}', Rating='{emp.get('overall_rating', 'No rating')}'")
-            for emp in self.employee_data:
-                rating = emp.get("overall_rating", "")
-                if rating: 
-                    rating_str = str(rating).strip().lower()
-                    if "5" in rating_str or "outstanding" in rating_str:
-                        actual_counts["Outstanding (5)"] += 1
-                    elif "4" in rating_str or "exceed" in rating_str:
-                        actual_counts["Exceeds Expectations (4)"] += 1
-                    elif "2" in rating_str or "below" in rating_str:
-                        actual_counts["Below Expectations (2)"] += 1
-                    elif "1" in rating_str or "serious" in rating_str or "poor" in rating_str:
-                        actual_counts["Serious Performance Concerns (1)"] += 1
-                    else:
-                        actual_counts["Meets Expectations (3)"] += 1
-                else:
-                    actual_counts["Meets Expectations (3)"] += 1
+            logger.debug("Sample employee ratings: %s", Lazy(lambda: [
+                (emp.get('name', 'No name'), emp.get('overall_rating', 'No rating')) for emp in self.employee_data[:10]
+            ]))
+            actual_counts = rating_distribution(emp.get("overall_rating", "") for emp in self.employee_data)
             
             total_employees = len(self.employee_data)
             self.emp_count_value.setText(str(total_employees))
@@ -295,13 +407,13 @@ class CurvedPerformanceView(QWidget):
             # logging.debug(f"Total employees from data: {total_employees}")
             total_counted = sum(actual_counts.values())
             if total_counted != total_employees:
-                logging.warning(f"Count mismatch! Total employees: {total_employees}, Total counted: {total_counted}")
+                logger.warning("Count mismatch! Total employees: %s, Total counted: %s", total_employees, total_counted)
             self.update_summary_table(ratings, required_percentages, actual_counts, total_employees)
             self.create_actual_pie_chart(actual_counts, total_employees)
             self.create_required_pie_chart(required_percentages)
             self.update_employee_table()
         except Exception as e:
-            logging.error(f"Error in update_curves: {str(e)}")
+            logger.error("Error in update_curves: %s", e)
             import traceback
             traceback.print_exc()
 
@@ -385,13 +497,10 @@ class CurvedPerformanceView(QWidget):
         # logging.debug(f"REAL-TIME Summary table updated:")
         # logging.debug(f"  Total Required: {total_required_calc}")
         # logging.debug(f"  Total Actual: {total_actual_calc}")
-        for rating, count in actual_counts.items():
-            logging.debug(f"  {rating}: {count} employees")
+        logger.debug("Summary table actual counts: %s", actual_counts)
 
     def create_actual_pie_chart(self, actual_counts, total_employees):
-        self.actual_chart.removeAllSeries()
-        series = QPieSeries()
-        
+        """Update the actual distribution chart, creating its series on first use."""
         colors = ["#70ad47", "#ffc000", "#5b9bd5", "#ff9933", "#c55a5a"]
         
         chart_data = [
@@ -401,28 +510,37 @@ class CurvedPerformanceView(QWidget):
             ("Below Expectations (2)", actual_counts.get("Below Expectations (2)", 0)),
             ("Serious Performance Concerns (1)", actual_counts.get("Serious Performance Concerns (1)", 0))
         ]
-        for i, (rating, count) in enumerate(chart_data):
-            percentage = (count / total_employees * 100) if total_employees > 0 else 0
-            if count > 0:
-                label = rating.split('(')[0].strip()
-                slice_obj = QPieSlice(f"{label}\n{percentage:.0f}%", percentage)
+        if not self.actual_slices:
+            series = QPieSeries()
+            for i in range(len(chart_data)):
+                slice_obj = QPieSlice("", 0)
                 slice_obj.setBrush(QColor(colors[i % len(colors)]))
-                slice_obj.setLabelVisible(True)
                 slice_obj.setExploded(False)
                 series.append(slice_obj)
-        if total_employees == 0 or sum(actual_counts.values()) == 0:
-            slice_obj = QPieSlice("No Data\n0%", 100)
-            slice_obj.setBrush(QColor("#cccccc"))
-            slice_obj.setLabelVisible(True)
-            series.append(slice_obj)
-        self.actual_chart.addSeries(series)
-        self.actual_chart.setTitle("")
-        self.actual_chart.legend().setVisible(False)
+                self.actual_slices.append(slice_obj)
+            self.no_data_slice = QPieSlice("No Data\n0%", 0)
+            self.no_data_slice.setBrush(QColor("#cccccc"))
+            series.append(self.no_data_slice)
+            self.actual_chart.addSeries(series)
+            self.actual_chart.setTitle("")
+            self.actual_chart.legend().setVisible(False)
+        # Empty ratings keep their slice at zero with the label hidden
+        for slice_obj, (rating, count) in zip(self.actual_slices, chart_data):
+            percentage = (count / total_employees * 100) if total_employees > 0 else 0
+            label = rating.split('(')[0].strip()
+            slice_obj.setLabel(f"{label}\n{percentage:.0f}%")
+            slice_obj.setValue(percentage if count > 0 else 0)
+            slice_obj.setLabelVisible(count > 0)
+        no_data = total_employees == 0 or sum(actual_counts.values()) == 0
+        self.no_data_slice.setValue(100 if no_data else 0)
+        self.no_data_slice.setLabelVisible(no_data)
         self.actual_chart_view.update()
 
     def create_required_pie_chart(self, required_percentages):
         """Create pie chart for required distribution matching Excel"""
-        self.required_chart.removeAllSeries()
+        # The required distribution never changes, so the chart is only built once
+        if self.required_chart.series():
+            return
         series = QPieSeries()
         colors = ["#70ad47", "#ffc000", "#5b9bd5", "#ff9933", "#c55a5a"]
         chart_data = [
@@ -444,9 +562,41 @@ class CurvedPerformanceView(QWidget):
         self.required_chart.legend().setVisible(False)
         self.required_chart_view.update()
 
+    def apply_filter(self):
+        """Narrow the employee table with the query indexes; the charts keep showing everyone."""
+        try:
+            conditions = parse_conditions(self.filter_edit.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Filter", str(e))
+            return
+        if not conditions:
+            self.clear_filter()
+            return
+        self.parent_app.io_executor.submit(
+            "Filtering employees", self.parent_app.employee_query.query, conditions,
+            on_finished=self.on_filtered,
+            on_error=lambda message: QMessageBox.warning(self, "Filter", message)
+        )
+
+    def on_filtered(self, results):
+        self.table_filter = [str(record.get("Employee ID", "")) for record in results]
+        self.schedule_update_table()
+
+    def clear_filter(self):
+        self.filter_edit.clear()
+        self.table_filter = None
+        self.schedule_update_table()
+
     def update_employee_table(self):
-        self.employee_table.setRowCount(len(self.employee_data))
-        for row, emp in enumerate(self.employee_data):
+        rows = self.employee_data
+        if self.table_filter is not None:
+            by_id = {emp["id"]: emp for emp in self.employee_data}
+            rows = [by_id[emp_id] for emp_id in self.table_filter if emp_id in by_id]
+            self.filter_count.setText(f"{len(rows)} of {len(self.employee_data)} employees")
+        else:
+            self.filter_count.setText("")
+        self.employee_table.setRowCount(len(rows))
+        for row, emp in enumerate(rows):
             self.employee_table.setItem(row, 0, QTableWidgetItem(str(emp["id"])))
             self.employee_table.setItem(row, 1, QTableWidgetItem(emp["name"]))
             self.employee_table.setItem(row, 2, QTableWidgetItem(emp["designation"]))
@@ -0,0 +1,171 @@
+import os
+import tracemalloc
+from datetime import datetime
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt, QTimer
+from instrumentation import metrics
+from memory_profile import format_report, memory_report, start_tracing, write_report
+
+COLUMNS = [
+    ("Operation", None), ("Calls", "calls"), ("Errors", "errors"), ("Total ms", "total_ms"),
+    ("Mean ms", "mean_ms"), ("p50 ms", "p50_ms"), ("p95 ms", "p95_ms"), ("Max ms", "max_ms"),
+    ("Read KB", "bytes_read"), ("Written KB", "bytes_written"), ("Histogram", "histogram"),
+]
+
+
+class DiagnosticsPanel(QWidget):
+    """Live view of the instrumentation counters, with JSON export and one-shot profiling."""
+
+    def __init__(self, parent_app):
+        super().__init__()
+        self.parent_app = parent_app
+        self.setStyleSheet("""
+            QWidget { background-color: #f5f5f5; font-family: 'Segoe UI', sans-serif; }
+            QTableWidget { background-color: white; gridline-color: #cccccc; font-size: 11px; }
+            QHeaderView::section { background-color: #e8e8e8; padding: 5px; border: 1px solid #cccccc; font-weight: bold; }
+            QPushButton { background-color: #4CAF50; color: white; border: none; padding: 8px 16px; border-radius: 4px; font-weight: bold; }
+            QPushButton:hover { background-color: #45a049; }
+            QPushButton#backBtn { background-color: #ff9800; }
+            QLabel#title { font-size: 16px; font-weight: bold; color: #2c3e50; padding: 10px; }
+        """)
+        # Only refresh while the panel is on screen
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(1000)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.create_ui()
+        self.refresh()
+
+    def create_ui(self):
+        layout = QVBoxLayout(self)
+        title = QLabel("Diagnostics")
+        title.setObjectName("title")
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.enabled_checkbox = QCheckBox("Record timings")
+        self.enabled_checkbox.setChecked(metrics.enabled)
+        self.enabled_checkbox.toggled.connect(self.set_enabled)
+        controls.addWidget(self.enabled_checkbox)
+        self.since_label = QLabel()
+        controls.addWidget(self.since_label)
+        controls.addStretch()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        controls.addWidget(reset_btn)
+        export_btn = QPushButton("Export JSON...")
+        export_btn.clicked.connect(self.export_json)
+        controls.addWidget(export_btn)
+        memory_btn = QPushButton("Memory Report...")
+        memory_btn.clicked.connect(self.save_memory_report)
+        controls.addWidget(memory_btn)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([label for label, _ in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Profile the next call of:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.setEditable(True)
+        self.profile_combo.setMinimumWidth(320)
+        profile_layout.addWidget(self.profile_combo)
+        profile_btn = QPushButton("Capture Profile...")
+        profile_btn.clicked.connect(self.request_profile)
+        profile_layout.addWidget(profile_btn)
+        profile_layout.addStretch()
+        layout.addLayout(profile_layout)
+
+        back_btn = QPushButton("Back to Form")
+        back_btn.setObjectName("backBtn")
+        back_btn.clicked.connect(self.parent_app.go_back)
+        layout.addWidget(back_btn)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def set_enabled(self, enabled):
+        metrics.enabled = enabled
+
+    def reset(self):
+        metrics.reset()
+        self.refresh()
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        operations = snapshot["operations"]
+        self.since_label.setText(f"since {snapshot['since']}")
+        self.table.setRowCount(len(operations))
+        for row, (name, stats) in enumerate(operations.items()):
+            for column, (_, key) in enumerate(COLUMNS):
+                if key is None:
+                    text = name
+                elif key == "histogram":
+                    text = "  ".join(f"{bucket}: {count}" for bucket, count in stats[key].items())
+                elif key.startswith("bytes_"):
+                    text = f"{stats[key] / 1024:,.0f}" if stats[key] else ""
+                else:
+                    text = str(stats[key])
+                item = QTableWidgetItem(text)
+                if key not in (None, "histogram"):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        current = self.profile_combo.currentText()
+        known = [self.profile_combo.itemText(i) for i in range(self.profile_combo.count())]
+        for name in operations:
+            if name not in known:
+                self.profile_combo.addItem(name)
+        self.profile_combo.setEditText(current)
+
+    def export_json(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Diagnostics", f"diagnostics_{datetime.now():%Y%m%d_%H%M%S}.json", "JSON (*.json)"
+        )
+        if path:
+            metrics.dump_json(path)
+            QMessageBox.information(self, "Diagnostics", f"Saved to {path}")
+
+    def save_memory_report(self):
+        if not tracemalloc.is_tracing():
+            start_tracing()
+            QMessageBox.information(
+                self, "Memory Report",
+                "Memory tracing started; only memory allocated from now on is attributed. "
+                "Start the app with HR_MEMORY_PROFILE=1 to include the initial workbook load."
+            )
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Memory Report", f"memory_{datetime.now():%Y%m%d_%H%M%S}.json", "JSON (*.json)"
+        )
+        if path:
+            handler = self.parent_app.excel_handler
+            report = memory_report(handler.ws.max_row - 1 if handler.ws is not None else 0)
+            write_report(report, path)
+            QMessageBox.information(self, "Memory Report", format_report(report))
+
+    def request_profile(self):
+        name = self.profile_combo.currentText().strip()
+        if not name:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Profile", f"{name.replace('.', '_')}.prof", "cProfile (*.prof)"
+        )
+        if path:
+            metrics.profile_next(name, path)
+            self.enabled_checkbox.setChecked(True)
+            QMessageBox.information(
+                self, "Diagnostics",
+                f"The next call of {name} will be profiled to {os.path.basename(path)} (summary in .txt)."
+            )
@@ -0,0 +1,246 @@
+import bisect
+import re
+import time
+from datetime import date
+from itertools import chain
+from operator import ge, gt, le, lt
+from employment_dates import to_ordinal
+from payroll_engine import rating_code, to_number
+from scoring import OVERALL_RATINGS
+from log_config import get_logger
+
+logger = get_logger("excel")
+
+INDEXED_COLUMNS = ["Department", "Division", "Designation", "Line Manager"]
+# Pseudo column: the code (1-5) of Overall_Rating, 0 when unrated
+RATING = "rating"
+SCORE_COLUMN = "Overall_Percentage"
+CONDITION = re.compile(r"\s*(.+?)\s*(<=|>=|=|<|>|~)\s*(.*?)\s*$")
+COMPARISONS = {"<": lt, "<=": le, ">": gt, ">=": ge}
+
+
+def parse_condition(text):
+    """'Division=Finance', 'Overall_Percentage>=80', 'Employee Name~khan' -> (column, operator, value).
+
+    = is equality, < <= > >= compare numbers or dates, ~ is a substring
+    match; text comparisons ignore case.
+    """
+    match = CONDITION.match(text)
+    if not match or not match.group(1):
+        raise ValueError(f"Not a condition: '{text}' (expected e.g. Division=Finance or Overall_Percentage>=80)")
+    return match.groups()
+
+
+def parse_conditions(text):
+    """Conditions separated by ';', e.g. "Division=Finance; rating=Below Expectations"."""
+    return [parse_condition(part) for part in text.split(";") if part.strip()]
+
+
+def index_key(value):
+    return str(value).strip().lower()
+
+
+def rating_value(value):
+    """Rating code for "2", 2 or (part of) a rating label such as "Below Expectations"."""
+    text = index_key(value)
+    if text.isdigit():
+        return int(text)
+    for label in OVERALL_RATINGS:
+        if text and text in label.lower():
+            return rating_code(label)
+    raise ValueError(f"Unknown rating: {value}")
+
+
+def comparable(value):
+    """(kind, key) ordering numbers, then dates, then text; blanks are None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return (1, value.toordinal())
+    number = to_number(value, None)
+    if number is not None:
+        return (0, number)
+    ordinal = to_ordinal(value)
+    if ordinal is not None:
+        return (1, ordinal)
+    return (2, index_key(value))
+
+
+class EmployeeQuery:
+    """Employee records held in memory with secondary indexes, for filtering and sorting without a scan.
+
+    Equality on INDEXED_COLUMNS and on the rating code is answered from
+    hash indexes, ranges on Overall_Percentage and sorting by it from a
+    sorted index; any other condition is checked on the remaining rows only.
+    Loaded on first use and reloaded only after the workbook has been
+    saved or reloaded. Returned records are shared; do not modify them.
+    """
+
+    def __init__(self, excel_handler, columns=None):
+        self.excel_handler = excel_handler
+        self.columns = columns
+        self.records = []
+        self.indexes = {}
+        self.ratings = []
+        self.scores = []
+        self.key_columns = {}
+        self.text_columns = {}
+        self.ascending = []
+        self.descending = []
+        self.score_values = []
+        self.unscored = []
+        self.loaded = False
+        self.loaded_mtime = None
+
+    def load(self):
+        try:
+            headers = self.excel_handler.get_headers()
+            wanted = ["Employee ID"] + list(self.columns or self.excel_handler.visible_columns) + \
+                INDEXED_COLUMNS + ["Overall_Rating", SCORE_COLUMN]
+            columns = [column for column in dict.fromkeys(wanted) if column in headers]
+            self.build(self.excel_handler.get_all_employees(columns=columns))
+            self.loaded = True
+            self.loaded_mtime = self.excel_handler.loaded_mtime
+            return len(self.records)
+        except Exception as e:
+            logger.error("Error loading employee query indexes: %s", e)
+            raise Exception(f"Error loading employee query indexes: {str(e)}")
+
+    def ensure_loaded(self):
+        if not self.loaded or self.loaded_mtime != self.excel_handler.loaded_mtime:
+            self.load()
+
+    def build(self, records):
+        """Index records (as returned by get_all_employees)."""
+        start = time.perf_counter()
+        self.records = records
+        self.indexes = {column: {} for column in INDEXED_COLUMNS + [RATING]}
+        self.ratings, self.scores = [], []
+        self.key_columns, self.text_columns = {}, {}
+        for position, record in enumerate(records):
+            for column in INDEXED_COLUMNS:
+                self.indexes[column].setdefault(index_key(record.get(column, "")), set()).add(position)
+            code = rating_code(record.get("Overall_Rating"))
+            self.indexes[RATING].setdefault(code, set()).add(position)
+            self.ratings.append(code)
+            self.scores.append(to_number(record.get(SCORE_COLUMN), None))
+        scored = [position for position, score in enumerate(self.scores) if score is not None]
+        self.ascending = sorted(scored, key=self.scores.__getitem__)
+        self.descending = sorted(scored, key=self.scores.__getitem__, reverse=True)
+        self.score_values = [self.scores[position] for position in self.ascending]
+        self.unscored = [position for position, score in enumerate(self.scores) if score is None]
+        logger.info("Indexed %s employees in %.3fs", len(records), time.perf_counter() - start)
+
+    def score_range(self, operator, value):
+        """Positions whose score satisfies `score <operator> value`, from the sorted index."""
+        if operator in (">", ">="):
+            find = bisect.bisect_right if operator == ">" else bisect.bisect_left
+            return self.ascending[find(self.score_values, value):]
+        find = bisect.bisect_left if operator == "<" else bisect.bisect_right
+        return self.ascending[:find(self.score_values, value)]
+
+    def column_keys(self, column):
+        """comparable() of every row's value in column (rating codes for "rating"), computed once per load."""
+        keys = self.key_columns.get(column)
+        if keys is None:
+            if column == RATING:
+                keys = [(0, code) if code else None for code in self.ratings]
+            elif column == SCORE_COLUMN:
+                keys = [(0, score) if score is not None else None for score in self.scores]
+            else:
+                keys = [comparable(record.get(column)) for record in self.records]
+            self.key_columns[column] = keys
+        return keys
+
+    def column_text(self, column):
+        """Every row's value in column as index_key() text, computed once per load."""
+        texts = self.text_columns.get(column)
+        if texts is None:
+            texts = self.text_columns[column] = [index_key(record.get(column, "")) for record in self.records]
+        return texts
+
+    def matcher(self, column, operator, value):
+        """Predicate on a row position for a condition no index answers."""
+        if operator == "~":
+            needle, texts = index_key(value), self.column_text(column)
+            return lambda position: needle in texts[position]
+        if operator == "=" and column not in (RATING, SCORE_COLUMN):
+            wanted, texts = index_key(value), self.column_text(column)
+            return lambda position: texts[position] == wanted
+        if column == RATING:
+            bound = (0, rating_value(value))
+        elif column == SCORE_COLUMN:
+            number = to_number(value, None)
+            bound = (0, number) if number is not None else None
+        else:
+            bound = comparable(value)
+        if bound is None:
+            raise ValueError(f"Cannot compare {column} with '{value}' using {operator}")
+        keys = self.column_keys(column)
+        if operator == "=":
+            return lambda position: keys[position] == bound
+        test = COMPARISONS[operator]
+
+        def check(position):
+            # Blanks and values of another kind (text against a number) never match a range
+            key = keys[position]
+            return key is not None and key[0] == bound[0] and test(key, bound)
+        return check
+
+    def query(self, conditions=(), sort=None, descending=False, limit=None):
+        """Records matching every (column, operator, value) condition.
+
+        sort is a column name (or "rating"); without one, rows keep workbook
+        order. Rows without a value in the sort column come last.
+        """
+        self.ensure_loaded()
+        start = time.perf_counter()
+        candidates = None
+        residual = []
+        # Index lookups first, so the remaining conditions only see their matches
+        for column, operator, value in conditions:
+            if operator == "=" and column in self.indexes:
+                key = rating_value(value) if column == RATING else index_key(value)
+                hits = self.indexes[column].get(key, set())
+                candidates = hits if candidates is None else candidates & hits
+            else:
+                residual.append((column, operator, value))
+        checks = []
+        for column, operator, value in residual:
+            number = to_number(value, None)
+            if column == SCORE_COLUMN and operator in COMPARISONS and number is not None:
+                in_range = self.score_range(operator, number)
+                if candidates is None or len(in_range) < len(candidates):
+                    candidates = set(in_range) if candidates is None else candidates.intersection(in_range)
+                    continue
+            checks.append(self.matcher(column, operator, value))
+        if checks:
+            pool = range(len(self.records)) if candidates is None else candidates
+            for check in checks:
+                pool = filter(check, pool)
+            candidates = set(pool)
+        results = [self.records[position] for position in self.order(candidates, sort, descending, limit)]
+        logger.info("Query %s matched %s employees in %.3f ms",
+                    list(conditions), len(results), (time.perf_counter() - start) * 1000)
+        return results
+
+    def order(self, candidates, sort, descending, limit):
+        """Row positions of candidates (None for all rows) in result order, at most limit of them."""
+        if sort is None:
+            positions = range(len(self.records)) if candidates is None else sorted(candidates)
+            return list(positions[:limit] if limit else positions)
+        if sort == SCORE_COLUMN and (candidates is None or len(candidates) * 8 >= len(self.records)):
+            # Most rows still match: walk the score index instead of sorting them
+            positions = []
+            for position in chain(self.descending if descending else self.ascending, self.unscored):
+                if candidates is None or position in candidates:
+                    positions.append(position)
+                    if limit and len(positions) >= limit:
+                        break
+            return positions
+        keys = self.column_keys(sort)
+        pool = range(len(self.records)) if candidates is None else sorted(candidates)
+        positions = sorted((position for position in pool if keys[position] is not None),
+                           key=keys.__getitem__, reverse=descending)
+        positions += [position for position in pool if keys[position] is None]
+        return positions[:limit] if limit else positions
\ No newline at end of file
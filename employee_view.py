@@ -7,6 +7,9 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 from excel_handler import ExcelHandler
+from column_schema import display_text
+from payroll_engine import compute_salary_columns
+from instrumentation import instrumented
 
 class EmployeeViewWindow(QWidget):
     def __init__(self, employee_data, parent_app=None):
@@ -47,9 +50,9 @@ class EmployeeViewWindow(QWidget):
             }
         """)
         
+        self.built_tabs = set()
         self.create_ui()
-        self.populate_data()
-        self.populate_salary_data()
+        self.ensure_tab_built(self.tab_widget.currentIndex())
 
     def create_ui(self):
         main_layout = QVBoxLayout(self)
@@ -74,26 +77,37 @@ class EmployeeViewWindow(QWidget):
             back_button.clicked.connect(self.parent_app.go_back)
         main_layout.addWidget(back_button)
         
-        header_label = QLabel(f"Employee Performance Review Details\n{self.employee_data.get('Employee Name', 'N/A')} - {self.employee_data.get('Employee ID', 'N/A')}")
-        header_label.setAlignment(Qt.AlignCenter)
-        header_label.setFont(QFont("Arial", 16, QFont.Bold))
-        header_label.setStyleSheet("background-color: #007bff; color: white; padding: 20px; border-radius: 8px; margin-bottom: 10px;")
-        main_layout.addWidget(header_label)
+        self.header_label = QLabel(f"Employee Performance Review Details\n{self.employee_data.get('Employee Name', 'N/A')} - {self.employee_data.get('Employee ID', 'N/A')}")
+        self.header_label.setAlignment(Qt.AlignCenter)
+        self.header_label.setFont(QFont("Arial", 16, QFont.Bold))
+        self.header_label.setStyleSheet("background-color: #007bff; color: white; padding: 20px; border-radius: 8px; margin-bottom: 10px;")
+        main_layout.addWidget(self.header_label)
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll_widget = QWidget()
         scroll_layout = QVBoxLayout(scroll_widget)
-        tab_widget = QTabWidget()
-        performance_tab = QWidget()
-        self.create_performance_tab(performance_tab)
-        tab_widget.addTab(performance_tab, "Performance Review")
-        salary_tab = QWidget()
-        self.create_salary_tab(salary_tab)
-        tab_widget.addTab(salary_tab, "Salary & Adjustments")
-        scroll_layout.addWidget(tab_widget)
+        # Tab contents are built the first time each tab is shown
+        self.tab_widget = QTabWidget()
+        self.tab_builders = [
+            (self.create_performance_tab, self.populate_data),
+            (self.create_salary_tab, self.populate_salary_data),
+        ]
+        self.tab_widget.addTab(QWidget(), "Performance Review")
+        self.tab_widget.addTab(QWidget(), "Salary & Adjustments")
+        self.tab_widget.currentChanged.connect(self.ensure_tab_built)
+        scroll_layout.addWidget(self.tab_widget)
         scroll.setWidget(scroll_widget)
         main_layout.addWidget(scroll)
 
+    def ensure_tab_built(self, index):
+        """Build and populate a tab on first show."""
+        if index < 0 or index in self.built_tabs:
+            return
+        create_tab, populate_tab = self.tab_builders[index]
+        create_tab(self.tab_widget.widget(index))
+        self.built_tabs.add(index)
+        populate_tab()
+
     def create_performance_tab(self, parent):
         layout = QVBoxLayout(parent)
         basic_info_group = QGroupBox("Employee Information")
@@ -213,15 +227,19 @@ class EmployeeViewWindow(QWidget):
         summary_layout.addWidget(self.retention_field, 1, 3)
         layout.addWidget(summary_group)
 
+    @instrumented()
     def save_employee_data(self):
         """Save employee data to Excel - safer version"""
         try:
-            excel_handler = ExcelHandler()
+            for index in range(self.tab_widget.count()):
+                self.ensure_tab_built(index)
             emp_id = self.emp_id_field.text()
-            existing_data = excel_handler.get_employee_data(emp_id)
+            # The record loaded into this view is current; re-reading the workbook is not needed
+            existing_data = dict(self.employee_data) if self.employee_data else None
             if not existing_data:
                 raise ValueError("Employee not found!")
-            existing_data.update({
+            derived = self.compute_salary_fields()
+            fields = {
                 "Employee ID": emp_id,
                 "Employee Name": self.emp_name_field.text(),
                 "Department": self.emp_dept_field.text(),
@@ -239,23 +257,15 @@ class EmployeeViewWindow(QWidget):
                 "House_Rent": self.house_rent.value(),
                 "Medical": self.medical.value(),
                 "Utilities": self.utilities.value(),
-                "Total_Salary": (
-                    self.utilities.value() + self.medical.value() + self.basic_salary.value() +
-                    self.gross_amount.value() + self.car_allowance.value() +
-                    (self.fuel_litre.value() * self.fuel_price.value()) + self.house_rent.value()
-                ),
+                "Total_Salary": derived["Total_Salary"],
                 "Diff_Salary": self.diff_salary.value(),
                 "Diff_Conveyance": self.diff_conveyance.value(),
                 "Fuel_Litre_Adj": self.fuel_litre_adj.value(),
                 "Fuel_Price_Adj": self.fuel_price_adj.value(),
                 "Diff_Car_Allowance": self.diff_car_allowance.value(),
-                "Amount_Diff_Fuel": self.fuel_litre_adj.value() * self.fuel_price_adj.value(),
-                "Total_Salary_Adj": (
-                    self.diff_salary.value() + self.diff_conveyance.value() + self.diff_car_allowance.value()
-                ),
-                "Allowance_Adj": (
-                    self.diff_car_allowance.value() + self.diff_conveyance.value()
-                ),
+                "Amount_Diff_Fuel": derived["Amount_Diff_Fuel"],
+                "Total_Salary_Adj": derived["Total_Salary_Adj"],
+                "Allowance_Adj": derived["Allowance_Adj"],
                 "Salary_Adj_Impact": self.salary_adj_impact.text(),
                 "Salary_Increment_2425": self.salary_increment_2425.value(),
                 "Training_Recommendations": self.training_recommendations.toPlainText(),
@@ -299,14 +309,40 @@ class EmployeeViewWindow(QWidget):
                 "Overall_Percentage": self.overall_percentage_field.text(),
                 "Promotion_Recommendation": self.promotion_field.text(),
                 "Retention_Recommendation": self.retention_field.text(),
-            })
-            excel_handler.save_employee_data(existing_data)
-            QMessageBox.information(self, "Success", "Employee data saved successfully!")
+            }
+            # Blank salary cells show a default; left at it, they stay blank (as do derived fields that come to 0)
+            for field, (widget, default) in self.salary_inputs().items():
+                if existing_data.get(field) in (None, "") and widget.value() == default:
+                    fields[field] = ""
+            for field in ("Total_Salary", "Amount_Diff_Fuel", "Total_Salary_Adj", "Allowance_Adj"):
+                if existing_data.get(field) in (None, "") and fields[field] == 0:
+                    fields[field] = ""
+            # The record only holds the visible columns; widgets of hidden ones show defaults, not stored values
+            existing_data.update({field: value for field, value in fields.items() if field in existing_data})
+            existing_data["Employee ID"] = emp_id
             if self.parent_app:
-                self.parent_app.go_back()
+                self.save_button.setEnabled(False)
+                self.parent_app.save_employee_record(
+                    existing_data,
+                    on_finished=self.on_employee_data_saved,
+                    on_error=self.on_employee_data_save_failed
+                )
+            else:
+                ExcelHandler().save_employee_data(existing_data)
+                self.on_employee_data_saved()
 
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save data: {str(e)}")
+            self.on_employee_data_save_failed(str(e))
+
+    def on_employee_data_saved(self, _result=None):
+        self.save_button.setEnabled(True)
+        QMessageBox.information(self, "Success", "Employee data saved successfully!")
+        if self.parent_app:
+            self.parent_app.go_back()
+
+    def on_employee_data_save_failed(self, message):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Error", f"Failed to save data: {message}")
 
     def create_salary_tab(self, parent):
         layout = QVBoxLayout(parent)
@@ -460,8 +496,8 @@ class EmployeeViewWindow(QWidget):
         
         layout.addWidget(training_group)
         
-        save_button = QPushButton("Save Changes")
-        save_button.setStyleSheet("""
+        self.save_button = QPushButton("Save Changes")
+        self.save_button.setStyleSheet("""
             QPushButton {
                 background-color: #28a745;
                 color: white;
@@ -475,19 +511,30 @@ class EmployeeViewWindow(QWidget):
                 background-color: #218838;
             }
         """)
-        save_button.clicked.connect(self.save_employee_data)
-        layout.addWidget(save_button)
+        self.save_button.clicked.connect(self.save_employee_data)
+        layout.addWidget(self.save_button)
+
+    def compute_salary_fields(self):
+        """Derived salary fields for the open employee, using the workforce payroll formulas."""
+        inputs = {
+            "Basic_Salary": self.basic_salary, "Gross_Amount": self.gross_amount,
+            "Car_Allowance": self.car_allowance, "Fuel_Litre": self.fuel_litre,
+            "Fuel_Price": self.fuel_price, "House_Rent": self.house_rent,
+            "Medical": self.medical, "Utilities": self.utilities,
+            "Diff_Salary": self.diff_salary, "Diff_Conveyance": self.diff_conveyance,
+            "Fuel_Litre_Adj": self.fuel_litre_adj, "Fuel_Price_Adj": self.fuel_price_adj,
+            "Diff_Car_Allowance": self.diff_car_allowance,
+        }
+        derived = compute_salary_columns({name: [widget.value()] for name, widget in inputs.items()})
+        return {name: values[0] for name, values in derived.items()}
 
     def calculate_impact(self):
         """Calculate impact values"""
         try:
-            fuel_diff = self.fuel_litre_adj.value() * self.fuel_price_adj.value()
-            self.amount_diff_fuel.setText(f"Rs. {fuel_diff:,.2f}")
-            total_adj = (self.diff_salary.value() + self.diff_conveyance.value() + 
-                        self.diff_car_allowance.value())
-            self.total_salary_adj.setText(f"Rs. {total_adj:,.2f}")
-            allowance_adj = self.diff_conveyance.value() + self.diff_car_allowance.value()
-            self.allowance_adj.setText(f"Rs. {allowance_adj:,.2f}")
+            derived = self.compute_salary_fields()
+            self.amount_diff_fuel.setText(f"Rs. {derived['Amount_Diff_Fuel']:,.2f}")
+            self.total_salary_adj.setText(f"Rs. {derived['Total_Salary_Adj']:,.2f}")
+            self.allowance_adj.setText(f"Rs. {derived['Allowance_Adj']:,.2f}")
             self.salary_adj_impact.setText(f"Rs. {self.diff_salary.value():,.2f}")
             
         except:
@@ -499,22 +546,20 @@ class EmployeeViewWindow(QWidget):
     def calculate_totals(self):
         """Calculate total salary and adjustments"""
         try:
-            fuel_cost = self.fuel_litre.value() * self.fuel_price.value()
-            total = (self.basic_salary.value() + self.gross_amount.value() + 
-                    self.car_allowance.value() + fuel_cost + self.house_rent.value() + 
-                    self.medical.value() + self.utilities.value())
+            total = self.compute_salary_fields()["Total_Salary"]
             self.total_salary.setText(f"Rs. {total:,.2f}")
         except:
             self.total_salary.setText("Rs. 0.00")
 
+    @instrumented()
     def populate_data(self):
         """Populate fields with employee data"""
         self.emp_id_field.setText(str(self.employee_data.get('Employee ID', '')))
         self.emp_name_field.setText(str(self.employee_data.get('Employee Name', '')))
         self.emp_dept_field.setText(str(self.employee_data.get('Department', '')))
         self.emp_designation_field.setText(str(self.employee_data.get('Designation', '')))
-        self.joining_date_field.setText(str(self.employee_data.get('Date of Joining', '')))
-        self.contract_expiry_field.setText(str(self.employee_data.get('Contract Expiry Date', '')))
+        self.joining_date_field.setText(display_text(self.employee_data.get('Date of Joining', '')))
+        self.contract_expiry_field.setText(display_text(self.employee_data.get('Contract Expiry Date', '')))
         self.division_field.setText(str(self.employee_data.get('Division', '')))
         for i in range(1, 7):
             if f'KPI_{i}_Title' in self.employee_data:
@@ -530,6 +575,20 @@ class EmployeeViewWindow(QWidget):
         self.promotion_field.setText(str(self.employee_data.get('Promotion_Recommendation', '')))
         self.retention_field.setText(str(self.employee_data.get('Retention_Recommendation', '')))
 
+    @instrumented()
+    def salary_inputs(self):
+        """Salary spinbox per column, with the value it shows for a blank cell."""
+        return {
+            'Basic_Salary': (self.basic_salary, 0), 'Gross_Amount': (self.gross_amount, 0),
+            'Car_Allowance': (self.car_allowance, 0), 'Fuel_Litre': (self.fuel_litre, 0),
+            'Fuel_Price': (self.fuel_price, 267), 'House_Rent': (self.house_rent, 0),
+            'Medical': (self.medical, 0), 'Utilities': (self.utilities, 0),
+            'Diff_Salary': (self.diff_salary, 0), 'Diff_Conveyance': (self.diff_conveyance, 0),
+            'Fuel_Litre_Adj': (self.fuel_litre_adj, 0), 'Fuel_Price_Adj': (self.fuel_price_adj, 267),
+            'Diff_Car_Allowance': (self.diff_car_allowance, 0),
+            'Salary_Increment_2425': (self.salary_increment_2425, 0),
+        }
+
     def populate_salary_data(self):
         """Populate salary related data if available"""
         if 'Last_Year_Rating' in self.employee_data:
@@ -537,25 +596,35 @@ class EmployeeViewWindow(QWidget):
         if 'Last_Year_Increment' in self.employee_data:
             self.last_year_increment.setText(str(self.employee_data.get('Last_Year_Increment', '')))
         
-        self.basic_salary.setValue(float(self.employee_data.get('Basic_Salary', 0) or 0))
-        self.gross_amount.setValue(float(self.employee_data.get('Gross_Amount', 0) or 0))
-        self.car_allowance.setValue(float(self.employee_data.get('Car_Allowance', 0) or 0))
-        self.fuel_litre.setValue(float(self.employee_data.get('Fuel_Litre', 0) or 0))
-        self.house_rent.setValue(float(self.employee_data.get('House_Rent', 0) or 0))
-        self.medical.setValue(float(self.employee_data.get('Medical', 0) or 0))
-        self.utilities.setValue(float(self.employee_data.get('Utilities', 0) or 0))
-        self.salary_adj_impact.setText(str(self.employee_data.get('Salary_Adj_Impact', 'Rs. 0.00')))
+        # Block valueChanged while filling in so totals are computed once, not per field
+        # The save writes back only fields the record holds, so an unedited save changes nothing
+        salary_inputs = self.salary_inputs()
+        for widget, _ in salary_inputs.values():
+            widget.blockSignals(True)
+        try:
+            for field, (widget, default) in salary_inputs.items():
+                value = self.employee_data.get(field)
+                try:
+                    # Defaults only fill blanks; a stored 0 stays 0
+                    widget.setValue(float(default if value in (None, "") else value))
+                except (TypeError, ValueError):
+                    widget.setValue(default)
+        finally:
+            for widget, _ in salary_inputs.values():
+                widget.blockSignals(False)
         self.training_recommendations.setText(str(self.employee_data.get('Training_Recommendations', '')))
-        self.salary_increment_2425.setValue(float(self.employee_data.get('Salary_Increment_2425', 0) or 0))
         
         self.calculate_totals()
+        self.calculate_impact()
+        # calculate_impact derives the impact from Diff_Salary; show (and save back) the stored text instead
+        self.salary_adj_impact.setText(str(self.employee_data.get('Salary_Adj_Impact', 'Rs. 0.00')))
 
+    @instrumented()
     def update_employee_data(self, employee_data):
         """Update the widget with new employee data"""
         self.employee_data = employee_data
-        self.populate_data()
-        self.populate_salary_data()
+        # Only tabs that have been shown need repopulating; the rest fill in when first opened
+        for index in self.built_tabs:
+            self.tab_builders[index][1]()
         # Update header label
-        header_label = self.findChild(QLabel)
-        if header_label:
-            header_label.setText(f"Employee Performance Review Details\n{self.employee_data.get('Employee Name', 'N/A')} - {self.employee_data.get('Employee ID', 'N/A')}")
\ No newline at end of file
+        self.header_label.setText(f"Employee Performance Review Details\n{self.employee_data.get('Employee Name', 'N/A')} - {self.employee_data.get('Employee ID', 'N/A')}")
\ No newline at end of file
@@ -0,0 +1,144 @@
+import bisect
+from datetime import date, datetime
+from functools import lru_cache
+from log_config import get_logger
+
+logger = get_logger("dates")
+
+# Formats dates arrive in: the add-employee dialog, Date of Evaluation and Last_Updated
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%d-%m-%Y"]
+DAYS_PER_YEAR = 365.25
+EXPERIENCE_COLUMN = "Exp in PMTF"
+
+
+@lru_cache(maxsize=65536)
+def text_ordinal(text):
+    """Ordinal of a date string in one of DATE_FORMATS, or None; each distinct string is parsed once."""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def to_ordinal(value):
+    """Day number (date.toordinal) of an Excel datetime, a date or a date string; None for blanks and non-dates."""
+    if isinstance(value, date):
+        return value.toordinal()
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text_ordinal(text) if text else None
+
+
+def parse_date(value):
+    """date for value, or None (see to_ordinal)."""
+    ordinal = to_ordinal(value)
+    return date.fromordinal(ordinal) if ordinal is not None else None
+
+
+def years_between(start_ordinals, end_ordinals):
+    """Whole columns of years from start to end, to one decimal; None where either date is missing."""
+    return [
+        round((end - start) / DAYS_PER_YEAR, 1) if start is not None and end is not None else None
+        for start, end in zip(start_ordinals, end_ordinals)
+    ]
+
+
+def years_since(value, as_of=None):
+    """Years from the date value to as_of (default today), to one decimal; None if value is not a date."""
+    end = to_ordinal(as_of) if as_of is not None else date.today().toordinal()
+    return years_between([to_ordinal(value)], [end])[0]
+
+
+class ExpiryIndex:
+    """Employees sorted by a date column, for range queries by bisection instead of a scan."""
+
+    def __init__(self, employee_ids, ordinals):
+        pairs = sorted((ordinal, emp_id) for emp_id, ordinal in zip(employee_ids, ordinals) if ordinal is not None)
+        self.ordinals = [ordinal for ordinal, _ in pairs]
+        self.employee_ids = [emp_id for _, emp_id in pairs]
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def between(self, first, last):
+        """(employee id, ordinal) for dates from first to last, both inclusive, earliest first."""
+        lo = bisect.bisect_left(self.ordinals, first)
+        hi = bisect.bisect_right(self.ordinals, last)
+        return list(zip(self.employee_ids[lo:hi], self.ordinals[lo:hi]))
+
+
+class EmploymentDates:
+    """Joining, evaluation and contract expiry dates of every employee as ordinal columns.
+
+    Loaded in one pass over the sheet and reloaded only after the workbook
+    has been saved or reloaded since.
+    """
+
+    def __init__(self, excel_handler):
+        self.excel_handler = excel_handler
+        self.employee_ids = []
+        self.joining = []
+        self.evaluation = []
+        self.contract_expiry = []
+        self.expiry_index = None
+        self.loaded_mtime = None
+
+    def load(self):
+        try:
+            headers = self.excel_handler.get_headers()
+            emp_id_header = headers[self.excel_handler.find_employee_id_column(headers)]
+            # Through the column reader, so an unloaded handler (GUI startup, --fast-reader) works too
+            table = self.excel_handler.read_employee_columns(
+                [emp_id_header, "Date of Joining", "Date of Evaluation", "Contract Expiry Date"]
+            )
+            self.employee_ids = [str(emp_id) for emp_id in table[emp_id_header]]
+            blank = [None] * len(self.employee_ids)
+            self.joining, self.evaluation, self.contract_expiry = (
+                [to_ordinal(value) for value in table.get(column, blank)]
+                for column in ("Date of Joining", "Date of Evaluation", "Contract Expiry Date")
+            )
+            self.expiry_index = ExpiryIndex(self.employee_ids, self.contract_expiry)
+            self.loaded_mtime = self.excel_handler.loaded_mtime
+            logger.info("Loaded dates of %s employees (%s with a contract expiry, %s distinct date strings cached)",
+                        len(self.employee_ids), len(self.expiry_index), text_ordinal.cache_info().currsize)
+            return len(self.employee_ids)
+        except Exception as e:
+            logger.error("Error loading employment dates: %s", e)
+            raise Exception(f"Error loading employment dates: {str(e)}")
+
+    def ensure_loaded(self):
+        if self.expiry_index is None or self.loaded_mtime != self.excel_handler.loaded_mtime:
+            self.load()
+
+    def experience(self, as_of=None):
+        """Years since joining per employee, up to their Date of Evaluation, or as_of (default today) without one.
+
+        A given as_of applies to every employee.
+        """
+        self.ensure_loaded()
+        if as_of is not None:
+            ends = [to_ordinal(as_of)] * len(self.employee_ids)
+        else:
+            today = date.today().toordinal()
+            ends = [evaluated if evaluated is not None else today for evaluated in self.evaluation]
+        return years_between(self.joining, ends)
+
+    def expiring_within(self, days, as_of=None):
+        """[(employee id, expiry date)] for contracts expiring in the next `days` days, from as_of (default today)."""
+        self.ensure_loaded()
+        start = to_ordinal(as_of) if as_of is not None else date.today().toordinal()
+        return [(emp_id, date.fromordinal(ordinal)) for emp_id, ordinal in self.expiry_index.between(start, start + days)]
+
+    def run(self, as_of=None, write=True):
+        """Recompute Exp in PMTF for every employee with a joining date, written with one save.
+
+        Returns {employee id: years}.
+        """
+        years = self.experience(as_of)
+        experience = {emp_id: value for emp_id, value in zip(self.employee_ids, years) if value is not None}
+        if write and experience and EXPERIENCE_COLUMN in self.excel_handler.get_headers():
+            self.excel_handler.update_columns({EXPERIENCE_COLUMN: experience})
+        return experience
\ No newline at end of file
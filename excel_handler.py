@@ -1,21 +1,99 @@
 import openpyxl
 import os,sys
 import json
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
 from datetime import datetime
 import logging
+from audit_log import AuditLog, current_user
+from employment_dates import EXPERIENCE_COLUMN, years_since
+from column_schema import (
+    COLUMN_TYPES, EXCEL_DATE_FORMAT, RATING_LABELS, TEXT, column_type, decode, decoder, display_text, encode
+)
+from instrumentation import instrumented, metrics
+from xlsx_reader import XlsxSheetReader
+from log_config import Truncated, get_logger
 
-# Configure logging for debugging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = get_logger("excel")
+
+# Column layout of a new workbook
+DEFAULT_HEADERS = [
+    "Employee ID", "Employee Name", "Division", "Department", "Designation",
+    "Date of Joining", "Exp in PMTF", "Date of Evaluation", "Contract Expiry Date",
+    "Line Manager", "Entity Name",
+    "KPI_1_Title", "KPI_1_Rating", "KPI_1_Weightage", "KPI_1_Weighted_Score",
+    "KPI_2_Title", "KPI_2_Rating", "KPI_2_Weightage", "KPI_2_Weighted_Score",
+    "KPI_3_Title", "KPI_3_Rating", "KPI_3_Weightage", "KPI_3_Weighted_Score",
+    "KPI_4_Title", "KPI_4_Rating", "KPI_4_Weightage", "KPI_4_Weighted_Score",
+    "KPI_5_Title", "KPI_5_Rating", "KPI_5_Weightage", "KPI_5_Weighted_Score",
+    "KPI_6_Title", "KPI_6_Rating", "KPI_6_Weightage", "KPI_6_Weighted_Score",
+    "Part_A_Total_Score",
+    "Open_Clear_Communication_Rating", "Open_Clear_Communication_Weighted_Score",
+    "Attitude_Team_Work_Collaboration_Rating", "Attitude_Team_Work_Collaboration_Weighted_Score",
+    "Planning_Achievement_Focus_Rating", "Planning_Achievement_Focus_Weighted_Score",
+    "Creativity_Initiatives_Rating", "Creativity_Initiatives_Weighted_Score",
+    "Ownership_Self_Accountability_Rating", "Ownership_Self_Accountability_Weighted_Score",
+    "Part_B_Total_Score",
+    "Overall_Rating", "Overall_Percentage",
+    "Promotion_Recommendation", "Retention_Recommendation",
+    "Areas_of_Strength", "Areas_of_Development",
+    "Comments", "Last_Updated",
+    "Last_Year_Rating", "Last_Year_Increment",
+    "Basic_Salary", "Gross_Amount", "Car_Allowance", "Fuel_Litre",
+    "Fuel_Price", "House_Rent", "Medical", "Utilities", "Total_Salary",
+    "Diff_Salary", "Diff_Conveyance", "Fuel_Litre_Adj", "Fuel_Price_Adj",
+    "Diff_Car_Allowance", "Amount_Diff_Fuel",
+    "Total_Salary_Adj", "Allowance_Adj", "Salary_Adj_Impact",
+    "Salary_Increment_2425", "Training_Recommendations"
+]
+
+
+class WorkbookLock:
+    """Lock file next to the workbook so separate processes (GUI, CLI) never write it at once."""
+    def __init__(self, file_path, timeout=30, stale_after=300):
+        self.lock_path = file_path + ".lock"
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.fd = None
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self.fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(self.fd, str(os.getpid()).encode())
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > self.stale_after:
+                        logger.warning("Removing stale workbook lock %s", self.lock_path)
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Workbook is locked by another process: {self.lock_path}")
+                time.sleep(0.1)
+
+    def __exit__(self, exc_type, exc, tb):
+        os.close(self.fd)
+        self.fd = None
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+        return False
 
 class ExcelHandler:
-    def __init__(self):
+    def __init__(self, autoload=True):
         # Dynamically resolve the path for the assets folder
         if getattr(sys, 'frozen', False):
             base_path = sys._MEIPASS
-            logging.debug(f"Running as executable, using sys._MEIPASS: {base_path}")
+            logger.debug("Running as executable, using sys._MEIPASS: %s", base_path)
         else:
             base_path = os.path.dirname(os.path.abspath(__file__))
-            logging.debug(f"Running as script, using base path: {base_path}")
+            logger.debug("Running as script, using base path: %s", base_path)
 
         self.file_path = os.path.join(base_path, "assets", "employee_performance_data.xlsx")
         self.config_path = os.path.join(base_path, "assets", "column_config.json")
@@ -24,79 +102,185 @@ class ExcelHandler:
             "Date of Joining", "Contract Expiry Date", "Division", "Exp in PMTF"
         ]
         self.visible_columns = []
-        logging.debug(f"Excel file path set to: {self.file_path}")
-        logging.debug(f"Config file path set to: {self.config_path}")
+        # Types of custom columns; the create_file headers are typed by column_schema.SCHEMA
+        self.column_types = {}
+        self.headers = None
+        logger.debug("Excel file path set to: %s", self.file_path)
+        logger.debug("Config file path set to: %s", self.config_path)
 
+        self.wb = None
+        self.ws = None
+        self.loaded_mtime = None
+        # Counts (re)loads of the workbook, so caches can tell a reload from their own saves
+        self.generation = 0
+        # Called with the set of sheet rows each save changed, on the thread that saved
+        self.change_listeners = []
+        # Recorded against every field change in the audit log
+        self.user = current_user()
+        self._audit_log = None
+        # The GUI passes autoload=False and calls load() from a worker thread
+        if autoload:
+            self.load()
+
+    @instrumented()
+    def load(self):
+        """Create the workbook if needed, then open it and read the column config."""
         # Check if file exists, create if not
         if not os.path.exists(self.file_path):
-            logging.warning(f"Excel file not found at {self.file_path}. Creating a new one...")
+            logger.warning("Excel file not found at %s. Creating a new one...", self.file_path)
             self.create_file()
-
-        self.wb = None
-        self.ws = None
         self.initialize_excel()
         self.load_column_config()
 
-
     def create_file(self):
         """Create a new Excel file with default headers if it doesn't exist."""
         wb = openpyxl.Workbook()
         ws = wb.active
         ws.title = "Performance_Data"
-        headers = [
-            "Employee ID", "Employee Name", "Division", "Department", "Designation",
-            "Date of Joining", "Exp in PMTF", "Date of Evaluation", "Contract Expiry Date",
-            "Line Manager", "Entity Name",
-            "KPI_1_Title", "KPI_1_Rating", "KPI_1_Weightage", "KPI_1_Weighted_Score",
-            "KPI_2_Title", "KPI_2_Rating", "KPI_2_Weightage", "KPI_2_Weighted_Score",
-            "KPI_3_Title", "KPI_3_Rating", "KPI_3_Weightage", "KPI_3_Weighted_Score",
-            "KPI_4_Title", "KPI_4_Rating", "KPI_4_Weightage", "KPI_4_Weighted_Score",
-            "KPI_5_Title", "KPI_5_Rating", "KPI_5_Weightage", "KPI_5_Weighted_Score",
-            "KPI_6_Title", "KPI_6_Rating", "KPI_6_Weightage", "KPI_6_Weighted_Score",
-            "Part_A_Total_Score",
-            "Open_Clear_Communication_Rating", "Open_Clear_Communication_Weighted_Score",
-            "Attitude_Team_Work_Collaboration_Rating", "Attitude_Team_Work_Collaboration_Weighted_Score",
-            "Planning_Achievement_Focus_Rating", "Planning_Achievement_Focus_Weighted_Score",
-            "Creativity_Initiatives_Rating", "Creativity_Initiatives_Weighted_Score",
-            "Ownership_Self_Accountability_Rating", "Ownership_Self_Accountability_Weighted_Score",
-            "Part_B_Total_Score",
-            "Overall_Rating", "Overall_Percentage",
-            "Promotion_Recommendation", "Retention_Recommendation",
-            "Areas_of_Strength", "Areas_of_Development",
-            "Comments", "Last_Updated",
-            "Last_Year_Rating", "Last_Year_Increment",
-            "Basic_Salary", "Gross_Amount", "Car_Allowance", "Fuel_Litre",
-            "Fuel_Price", "House_Rent", "Medical", "Utilities", "Total_Salary",
-            "Diff_Salary", "Diff_Conveyance", "Fuel_Litre_Adj", "Fuel_Price_Adj",
-            "Diff_Car_Allowance", "Amount_Diff_Fuel",
-            "Total_Salary_Adj", "Allowance_Adj", "Salary_Adj_Impact",
-            "Salary_Increment_2425", "Training_Recommendations"
-        ]
+        headers = list(DEFAULT_HEADERS)
         ws.append(headers)
         for col in range(1, len(headers) + 1):
             cell = ws.cell(row=1, column=col)
             cell.font = openpyxl.styles.Font(bold=True)
             cell.fill = openpyxl.styles.PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
         wb.save(self.file_path)
-        logging.info(f"Created new Excel file at {self.file_path}")
+        logger.info("Created new Excel file at %s", self.file_path)
 
+    @instrumented()
     def initialize_excel(self):
         """Initialize the Excel workbook and worksheet."""
         try:
+            self.headers = None
+            self.ws = None
+            self.generation += 1
+            self.loaded_mtime = os.path.getmtime(self.file_path)
             self.wb = openpyxl.load_workbook(self.file_path)
+            metrics.add_bytes("ExcelHandler.initialize_excel", read_path=self.file_path)
             sheet_names = self.wb.sheetnames
-            logging.debug(f"Available sheets: {sheet_names}")
+            logger.debug("Available sheets: %s", sheet_names)
             for sheet_name in ["Sheet1", "Performance_Data", "Data", "Employee_Data"]:
                 if sheet_name in sheet_names:
                     self.ws = self.wb[sheet_name]
-                    logging.info(f"Selected sheet: {sheet_name}")
+                    logger.info("Selected sheet: %s", sheet_name)
                     break
             if not self.ws:
                 raise ValueError(f"No valid sheet found in {self.file_path}. Available sheets: {sheet_names}")
         except Exception as e:
-            logging.error(f"Failed to initialize Excel file: {str(e)}")
+            logger.error("Failed to initialize Excel file: %s", e)
             raise Exception(f"Failed to initialize Excel file: {str(e)}")
 
+    @contextmanager
+    def write_transaction(self):
+        """Lock the workbook file, pick up changes another process saved, then save on success.
+
+        The body can set transaction.save = False when it ends up changing nothing.
+        Rows changed through write_cell/write_new_row are stamped with
+        Last_Updated, their changes recorded in the audit log and passed to
+        change_listeners once the save succeeds.
+        """
+        with WorkbookLock(self.file_path):
+            if os.path.getmtime(self.file_path) != self.loaded_mtime:
+                logger.info("Workbook changed on disk, reloading before write")
+                self.initialize_excel()
+            transaction = SimpleNamespace(save=True, changes=[], changed_rows=set())
+            yield transaction
+            if transaction.save:
+                self.stamp_last_updated(transaction.changed_rows)
+                start = time.perf_counter()
+                self.wb.save(self.file_path)
+                if metrics.enabled:
+                    metrics.record("ExcelHandler.wb.save", time.perf_counter() - start)
+                    metrics.add_bytes("ExcelHandler.wb.save", written_path=self.file_path)
+                self.loaded_mtime = os.path.getmtime(self.file_path)
+                if transaction.changes:
+                    try:
+                        self.audit_log().record(transaction.changes, user=self.user)
+                    except Exception as e:
+                        # The workbook is already saved; a failed audit write must not report the save as failed
+                        logger.error("Audit log write failed after save: %s", e)
+                if transaction.changed_rows:
+                    for listener in self.change_listeners:
+                        try:
+                            listener(transaction.changed_rows)
+                        except Exception as e:
+                            logger.error("Change listener failed after save: %s", e)
+
+    def audit_log(self):
+        """The audit log kept next to the workbook."""
+        db_path = os.path.join(os.path.dirname(self.file_path), "audit_log.sqlite")
+        if self._audit_log is None or self._audit_log.db_path != db_path:
+            self._audit_log = AuditLog(db_path)
+        return self._audit_log
+
+    @staticmethod
+    def audit_text(value):
+        return "" if value is None else str(value)
+
+    @classmethod
+    def same_value(cls, old_value, new_value):
+        """Equal as text, or as numbers (a stored 20000 re-saved as 20000.0 is not a change)."""
+        old_text, new_text = cls.audit_text(old_value), cls.audit_text(new_value)
+        if old_text == new_text:
+            return True
+        try:
+            return float(old_text) == float(new_text)
+        except ValueError:
+            return False
+
+    def column_type(self, header):
+        return column_type(header, self.column_types)
+
+    def encode_value(self, header, value, old_value=None):
+        """value as it is stored in the header's column (see column_schema.encode)."""
+        return encode(value, self.column_type(header), old_value, RATING_LABELS.get(header))
+
+    def set_cell(self, cell, value):
+        cell.value = value
+        if isinstance(value, datetime):
+            cell.number_format = EXCEL_DATE_FORMAT
+
+    def write_cell(self, transaction, row_index, col_idx, value, emp_id, header):
+        """Set a cell inside a write transaction if its value differs; returns whether it changed.
+
+        The value is stored in the column's type, and cells whose decoded
+        value is unchanged are not touched. Last_Updated is left to
+        stamp_last_updated.
+        """
+        if header == "Last_Updated":
+            return False
+        cell = self.ws.cell(row=row_index, column=col_idx)
+        old_value = cell.value
+        new_value = self.encode_value(header, value, old_value)
+        kind = self.column_type(header)
+        if decode(old_value, kind) == decode(new_value, kind) or self.same_value(old_value, new_value):
+            return False
+        self.set_cell(cell, new_value)
+        transaction.changes.append((emp_id, header, self.audit_text(old_value), self.audit_text(new_value)))
+        transaction.changed_rows.add(row_index)
+        return True
+
+    def write_new_row(self, transaction, values, emp_id, headers):
+        """Append a row, typed per column, inside a write transaction; every non-blank field is recorded as a change."""
+        values = [self.encode_value(header, value) for header, value in zip(headers, values)]
+        self.ws.append(values)
+        row_index = self.ws.max_row
+        for col_idx, (header, value) in enumerate(zip(headers, values), start=1):
+            if isinstance(value, datetime):
+                self.ws.cell(row=row_index, column=col_idx).number_format = EXCEL_DATE_FORMAT
+            if header != "Last_Updated" and self.audit_text(value) != "":
+                transaction.changes.append((emp_id, header, "", self.audit_text(value)))
+        transaction.changed_rows.add(row_index)
+        return row_index
+
+    def stamp_last_updated(self, rows):
+        headers = self.get_headers()
+        if not rows or "Last_Updated" not in headers:
+            return
+        col_idx = headers.index("Last_Updated") + 1
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for row_index in rows:
+            self.ws.cell(row=row_index, column=col_idx).value = now
+
     def load_column_config(self):
         """Load visible columns from config file."""
         try:
@@ -106,13 +290,16 @@ class ExcelHandler:
                     self.visible_columns = self.mandatory_columns + [
                         col for col in config.get("visible_columns", []) if col not in self.mandatory_columns
                     ]
+                    self.column_types = {
+                        col: kind for col, kind in config.get("column_types", {}).items() if kind in COLUMN_TYPES
+                    }
             else:
                 headers = self.get_headers()
                 self.visible_columns = headers  # All columns visible by default
                 self.save_column_config()
-            logging.info(f"Loaded visible columns: {self.visible_columns}")
+            logger.debug("Loaded visible columns: %s", Truncated(self.visible_columns))
         except Exception as e:
-            logging.error(f"Error loading column config: {str(e)}")
+            logger.error("Error loading column config: %s", e)
             self.visible_columns = self.mandatory_columns  # Fallback to mandatory columns
 
     def save_column_config(self):
@@ -121,20 +308,34 @@ class ExcelHandler:
             config = {"visible_columns": [
                 col for col in self.visible_columns if col not in self.mandatory_columns
             ]}
+            if self.column_types:
+                config["column_types"] = self.column_types
             with open(self.config_path, 'w') as f:
                 json.dump(config, f, indent=4)
-            logging.info(f"Saved column config: {config}")
+            logger.debug("Saved column config: %s", Truncated(config))
         except Exception as e:
-            logging.error(f"Error saving column config: {str(e)}")
+            logger.error("Error saving column config: %s", e)
 
+    @instrumented()
     def get_headers(self):
         """Get all column headers from Excel file."""
         try:
-            headers = [cell.value for cell in self.ws[1] if cell.value is not None]
-            logging.info(f"Headers found: {headers}")
+            # Cached so GUI-thread callers never touch the worksheet while a worker writes to it
+            if self.headers is None and self.ws is None:
+                # Not loaded (e.g. streaming exports): read just the header row
+                wb = openpyxl.load_workbook(self.file_path, read_only=True)
+                try:
+                    ws = next(wb[name] for name in ["Sheet1", "Performance_Data", "Data", "Employee_Data"] if name in wb.sheetnames)
+                    self.headers = [value for value in next(ws.iter_rows(max_row=1, values_only=True), ()) if value is not None]
+                finally:
+                    wb.close()
+            elif self.headers is None:
+                self.headers = [cell.value for cell in self.ws[1] if cell.value is not None]
+            headers = list(self.headers)
+            logger.debug("Headers found: %s", Truncated(headers))
             return headers
         except Exception as e:
-            logging.error(f"Error fetching headers: {str(e)}")
+            logger.error("Error fetching headers: %s", e)
             raise Exception(f"Error fetching headers: {str(e)}")
 
     def get_visible_headers(self):
@@ -149,32 +350,128 @@ class ExcelHandler:
                 col for col in visible_columns if col not in self.mandatory_columns
             ]
             self.save_column_config()
-            logging.info(f"Updated visible columns: {self.visible_columns}")
+            logger.info("Updated visible columns: %s", Truncated(self.visible_columns))
         except Exception as e:
-            logging.error(f"Error updating visible columns: {str(e)}")
+            logger.error("Error updating visible columns: %s", e)
             raise Exception(f"Error updating visible columns: {str(e)}")
 
-    def add_column(self, column_name):
-        """Add a new column to the Excel file."""
+    @instrumented()
+    def add_column(self, column_name, column_type=TEXT):
+        """Add a new column of one of column_schema.COLUMN_TYPES to the Excel file."""
         try:
-            headers = self.get_headers()
-            if column_name in headers:
-                return False, "Column already exists"
-            if not column_name:
-                return False, "Column name cannot be empty"
-            self.ws.cell(row=1, column=len(headers)+1).value = column_name
-            self.wb.save(self.file_path)
-            if column_name not in self.visible_columns:
-                self.visible_columns.append(column_name)
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                if column_name in headers:
+                    transaction.save = False
+                    return False, "Column already exists"
+                if not column_name:
+                    transaction.save = False
+                    return False, "Column name cannot be empty"
+                if column_type not in COLUMN_TYPES:
+                    transaction.save = False
+                    return False, f"Unknown column type: {column_type}"
+                self.ws.cell(row=1, column=len(headers)+1).value = column_name
+                self.headers = None
+                if column_type != TEXT:
+                    self.column_types[column_name] = column_type
+                else:
+                    self.column_types.pop(column_name, None)
+                if column_name not in self.visible_columns:
+                    self.visible_columns.append(column_name)
                 self.save_column_config()
-            logging.info(f"Added new column: {column_name}")
-            return True, "Column added successfully"
+                logger.info("Added new %s column: %s", column_type, column_name)
+                return True, "Column added successfully"
         except Exception as e:
-            logging.error(f"Error adding column: {str(e)}")
+            logger.error("Error adding column: %s", e)
             return False, f"Error adding column: {str(e)}"
 
-    def get_all_employees(self):
-        """Retrieve all employees from the Excel file."""
+    def find_employee_id_column(self, headers):
+        """Return the 0-based index of the Employee ID column."""
+        for i, header in enumerate(headers):
+            if header and str(header).strip().lower() in ["employee id", "emp id", "id", "employee_id"]:
+                return i
+        raise ValueError("Column 'Employee ID' not found in Excel file")
+
+    @instrumented()
+    def update_columns(self, column_values):
+        """Write many cells for many employees with a single save.
+
+        column_values maps header -> {employee id: value}; headers that do not
+        exist yet are appended. Returns the number of rows touched.
+        """
+        try:
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                emp_id_col = self.find_employee_id_column(headers)
+                added_headers = [header for header in column_values if header not in headers]
+                for header in column_values:
+                    if header not in headers:
+                        self.ws.cell(row=1, column=len(headers) + 1).value = header
+                        headers.append(header)
+                        if header not in self.visible_columns:
+                            self.visible_columns.append(header)
+                            self.save_column_config()
+                self.headers = None
+                targets = [(headers.index(header) + 1, header, values) for header, values in column_values.items()]
+                rows_updated = 0
+                for row_index, row in enumerate(self.ws.iter_rows(min_row=2, max_col=emp_id_col + 1), start=2):
+                    emp_id = row[emp_id_col].value
+                    if emp_id in (None, ""):
+                        continue
+                    emp_id = str(emp_id)
+                    touched = False
+                    for col_idx, header, values in targets:
+                        if emp_id in values:
+                            self.write_cell(transaction, row_index, col_idx, values[emp_id], emp_id, header)
+                            touched = True
+                    rows_updated += touched
+                transaction.save = bool(transaction.changed_rows or added_headers)
+                logger.info("Updated %s columns across %s rows", len(column_values), rows_updated)
+                return rows_updated
+        except Exception as e:
+            logger.error("Error updating columns: %s", e)
+            raise Exception(f"Error updating columns: {str(e)}")
+
+    @instrumented()
+    def normalize_column_types(self):
+        """Rewrite cells stored as text (e.g. "15", "01/07/2024") in their column's type, with a single save.
+
+        Values do not change, so nothing is audited or stamped. Returns the number of cells rewritten.
+        """
+        try:
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                typed = [(col_idx, header) for col_idx, header in enumerate(headers) if self.column_type(header) != TEXT]
+                rewritten = 0
+                for row in self.ws.iter_rows(min_row=2, max_col=len(headers)):
+                    for col_idx, header in typed:
+                        cell = row[col_idx]
+                        value = self.encode_value(header, cell.value, cell.value)
+                        if value != cell.value or (isinstance(cell.value, str) and not isinstance(value, str)):
+                            self.set_cell(cell, value)
+                            rewritten += 1
+                transaction.save = rewritten > 0
+                logger.info("Rewrote %s cells in their column types", rewritten)
+                return rewritten
+        except Exception as e:
+            logger.error("Error normalizing column types: %s", e)
+            raise Exception(f"Error normalizing column types: {str(e)}")
+
+    def column_decoders(self, headers, columns=None):
+        """(header, index, decode) for each wanted column present in headers; columns defaults to the visible ones."""
+        return [
+            (header, headers.index(header), decoder(self.column_type(header)))
+            for header in (columns or self.visible_columns) if header in headers
+        ]
+
+    @instrumented()
+    def get_all_employees(self, progress_callback=None, columns=None):
+        """Retrieve all employees from the Excel file.
+
+        progress_callback(done, total) is called every few hundred rows when given.
+        columns defaults to the visible columns. Values are decoded to their
+        column types (numbers, dates, text); blank cells are "".
+        """
         try:
             headers = self.get_headers()
             if not headers:
@@ -185,29 +482,113 @@ class ExcelHandler:
                 header_str = str(header).strip().lower()
                 if header_str in ["employee id", "emp id", "id", "employee_id"]:
                     emp_id_col = i
-                    logging.info(f"Employee ID column found at index {i}: '{header}'")
+                    logger.debug("Employee ID column found at index %s: '%s'", i, header)
                     break
             if emp_id_col is None:
                 raise ValueError("Column 'Employee ID' not found in Excel file")
             
+            if self.ws is None:
+                # Not loaded (e.g. the CLI's --fast-reader): decode the wanted columns straight from the sheet XML
+                employees = [dict(row) for row in self.read_sheet_rows(columns, progress_callback)]
+                logger.info("Loaded %s employees", len(employees))
+                return employees
+
             employees = []
-            for row in self.ws.iter_rows(min_row=2, values_only=True):
+            total_rows = max(self.ws.max_row - 1, 0)
+            wanted = self.column_decoders(headers, columns)
+            for row_num, row in enumerate(self.ws.iter_rows(min_row=2, values_only=True), start=1):
+                if progress_callback and row_num % 500 == 0:
+                    progress_callback(row_num, total_rows)
                 if row and row[emp_id_col] and row[emp_id_col] != "":
-                    employee = {}
-                    for header in self.visible_columns:
-                        if header in headers:
-                            idx = headers.index(header)
-                            employee[header] = str(row[idx]) if idx < len(row) and row[idx] is not None else ""
-                    employees.append(employee)
+                    employees.append({
+                        header: decode_cell(row[idx]) if idx < len(row) else ""
+                        for header, idx, decode_cell in wanted
+                    })
             
-            logging.info(f"Loaded {len(employees)} employees: {[emp['Employee ID'] for emp in employees]}")
+            if progress_callback:
+                progress_callback(total_rows, total_rows)
+            logger.info("Loaded %s employees", len(employees))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Employee IDs: %s", Truncated([emp['Employee ID'] for emp in employees]))
             return employees
         except Exception as e:
-            logging.error(f"Error fetching employees: {str(e)}")
+            logger.error("Error fetching employees: %s", e)
             raise Exception(f"Error fetching employees: {str(e)}")
 
-    def get_employee_data(self, emp_id):
-        """Retrieve data for a specific employee by ID."""
+    def read_sheet_rows(self, columns=None, progress_callback=None, reader=None):
+        """Yield [(header, value)] per employee from the sheet XML, without loading the workbook.
+
+        Only the wanted columns (default: visible) are decoded, to the same
+        values get_all_employees returns. progress_callback(done, 0) is
+        called every few hundred rows; the total is not known up front.
+        """
+        reader = reader or XlsxSheetReader(self.file_path)
+        metrics.add_bytes("ExcelHandler.read_sheet_rows", read_path=self.file_path)
+        headers = reader.headers
+        if not headers:
+            raise ValueError("No headers found in Excel file")
+        emp_id_col = self.find_employee_id_column(headers)
+        wanted = {header: (idx, decode_cell) for header, idx, decode_cell in self.column_decoders(headers, columns)}
+        indexes = list(dict.fromkeys([emp_id_col] + [idx for idx, _ in wanted.values()]))
+        decoders = [(header, indexes.index(idx), decode_cell) for header, (idx, decode_cell) in wanted.items()]
+        done = 0
+        for _, values in reader.rows(indexes, min_row=2):
+            done += 1
+            if progress_callback and done % 500 == 0:
+                progress_callback(done, 0)
+            if values[0] and values[0] != "":
+                yield [(header, decode_cell(values[slot])) for header, slot, decode_cell in decoders]
+
+    @instrumented()
+    def read_employee_columns(self, columns=None, progress_callback=None):
+        """Columnar get_all_employees read straight from the sheet XML: {header: [value per employee]}."""
+        try:
+            reader = XlsxSheetReader(self.file_path)
+            table = {header: [] for header, _, _ in self.column_decoders(reader.headers, columns)}
+            appends = [column.append for column in table.values()]
+            for row in self.read_sheet_rows(columns, progress_callback, reader):
+                for append, (_, value) in zip(appends, row):
+                    append(value)
+            return table
+        except Exception as e:
+            logger.error("Error reading employee columns: %s", e)
+            raise Exception(f"Error reading employee columns: {str(e)}")
+
+    @instrumented()
+    def stream_employees(self, columns=None, as_text=True):
+        """Yield employees one at a time straight from the file, in openpyxl read-only mode.
+
+        Memory stays constant regardless of headcount; values are the text of each cell
+        (dates as DD/MM/YYYY), or the raw cell values (blank cells as None) when as_text is False.
+        columns defaults to every column in the sheet.
+        """
+        wb = openpyxl.load_workbook(self.file_path, read_only=True)
+        metrics.add_bytes("ExcelHandler.stream_employees", read_path=self.file_path)
+        try:
+            ws = None
+            for sheet_name in ["Sheet1", "Performance_Data", "Data", "Employee_Data"]:
+                if sheet_name in wb.sheetnames:
+                    ws = wb[sheet_name]
+                    break
+            if ws is None:
+                raise ValueError(f"No valid sheet found in {self.file_path}. Available sheets: {wb.sheetnames}")
+            rows = ws.iter_rows(values_only=True)
+            headers = [header for header in next(rows, ()) if header is not None]
+            emp_id_col = self.find_employee_id_column(headers)
+            wanted = [(header, headers.index(header)) for header in (columns or headers) if header in headers]
+            for row in rows:
+                if not row or emp_id_col >= len(row) or row[emp_id_col] in (None, ""):
+                    continue
+                if not as_text:
+                    yield {header: row[idx] if idx < len(row) else None for header, idx in wanted}
+                else:
+                    yield {header: display_text(row[idx]) if idx < len(row) else "" for header, idx in wanted}
+        finally:
+            wb.close()
+
+    @instrumented()
+    def get_employee_data(self, emp_id, columns=None):
+        """Retrieve data for a specific employee by ID, typed as in get_all_employees."""
         try:
             headers = self.get_headers()
             emp_id_col = None
@@ -220,94 +601,144 @@ class ExcelHandler:
             
             for row in self.ws.iter_rows(min_row=2, values_only=True):
                 if row and row[emp_id_col] == emp_id:
-                    employee_data = {}
-                    for header in self.visible_columns:
-                        if header in headers:
-                            idx = headers.index(header)
-                            employee_data[header] = str(row[idx]) if idx < len(row) and row[idx] is not None else ""
-                    logging.info(f"Employee data found for ID {emp_id}: {employee_data}")
+                    employee_data = {
+                        header: decode_cell(row[idx]) if idx < len(row) else ""
+                        for header, idx, decode_cell in self.column_decoders(headers, columns)
+                    }
+                    logger.debug("Employee data found for ID %s: %s", emp_id, Truncated(employee_data))
                     return employee_data
-            logging.warning(f"No employee found with ID {emp_id}")
+            logger.warning("No employee found with ID %s", emp_id)
             return None
         except Exception as e:
-            logging.error(f"Error fetching employee data for ID {emp_id}: {str(e)}")
+            logger.error("Error fetching employee data for ID %s: %s", emp_id, e)
             raise Exception(f"Error fetching employee data for ID {emp_id}: {str(e)}")
 
+    @instrumented()
     def save_employee_data(self, data):
-        """Save or update employee data in the Excel file."""
+        """Save or update employee data in the Excel file.
+
+        Only cells whose value differs are written, and the file is not saved
+        at all when nothing changed. Returns the number of changed fields.
+        """
         try:
-            headers = self.get_headers()
-            emp_id_col = None
-            for i, header in enumerate(headers):
-                if header and str(header).strip().lower() in ["employee id", "emp id", "id", "employee_id"]:
-                    emp_id_col = i
-                    break
-            if emp_id_col is None:
-                raise ValueError("Column 'Employee ID' not found in Excel file")
-            
-            emp_id = data.get("Employee ID")
-            row_index = None
-            for i, row in enumerate(self.ws.iter_rows(min_row=2), start=2):
-                if row[emp_id_col].value == emp_id:
-                    row_index = i
-                    break
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                emp_id_col = None
+                for i, header in enumerate(headers):
+                    if header and str(header).strip().lower() in ["employee id", "emp id", "id", "employee_id"]:
+                        emp_id_col = i
+                        break
+                if emp_id_col is None:
+                    raise ValueError("Column 'Employee ID' not found in Excel file")
             
-            if row_index:
-                # Update existing row
-                for col_idx, header in enumerate(headers):
-                    if header in data:
-                        self.ws.cell(row=row_index, column=col_idx + 1).value = data[header]
-                logging.info(f"Updated employee data for ID {emp_id} at row {row_index}")
-            else:
-                # Append new row
-                new_row = [data.get(header, "") for header in headers]
-                self.ws.append(new_row)
-                logging.info(f"Appended new employee data for ID {emp_id}")
+                emp_id = data.get("Employee ID")
+                row_index = None
+                for i, row in enumerate(self.ws.iter_rows(min_row=2, max_col=emp_id_col + 1), start=2):
+                    if row[emp_id_col].value == emp_id:
+                        row_index = i
+                        break
             
-            self.wb.save(self.file_path)
-            logging.info(f"Excel file saved: {self.file_path}")
+                if row_index:
+                    # Update existing row
+                    for col_idx, header in enumerate(headers):
+                        if header in data:
+                            self.write_cell(transaction, row_index, col_idx + 1, data[header], emp_id, header)
+                    logger.info("Updated %s fields for ID %s at row %s", len(transaction.changes), emp_id, row_index)
+                else:
+                    # Append new row
+                    new_row = [data.get(header, "") for header in headers]
+                    self.write_new_row(transaction, new_row, emp_id, headers)
+                    logger.info("Appended new employee data for ID %s", emp_id)
+
+                transaction.save = bool(transaction.changed_rows)
+                if transaction.save:
+                    logger.info("Excel file saved: %s", self.file_path)
+                else:
+                    logger.info("No changes for ID %s; save skipped", emp_id)
+                return len(transaction.changes)
         except Exception as e:
-            logging.error(f"Error saving employee data: {str(e)}")
+            logger.error("Error saving employee data: %s", e)
             raise Exception(f"Error saving employee data: {str(e)}")
 
+    @instrumented()
+    def save_employees(self, records):
+        """Update or append many employee records with a single save.
+
+        Returns (updated, added) counts. Only headers present in the sheet are written.
+        """
+        try:
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                emp_id_col = self.find_employee_id_column(headers)
+                row_by_id = {}
+                for row_index, row in enumerate(self.ws.iter_rows(min_row=2, max_col=emp_id_col + 1), start=2):
+                    if row[emp_id_col].value not in (None, ""):
+                        row_by_id[str(row[emp_id_col].value)] = row_index
+                updated, added = 0, 0
+                for data in records:
+                    emp_id = str(data.get("Employee ID", "")).strip()
+                    if not emp_id:
+                        continue
+                    row_index = row_by_id.get(emp_id)
+                    if row_index:
+                        for col_idx, header in enumerate(headers):
+                            if header in data:
+                                self.write_cell(transaction, row_index, col_idx + 1, data[header], emp_id, header)
+                        updated += 1
+                    else:
+                        row_by_id[emp_id] = self.write_new_row(
+                            transaction, [data.get(header, "") for header in headers], emp_id, headers
+                        )
+                        added += 1
+                transaction.save = bool(transaction.changed_rows)
+                logger.info("Saved %s updated and %s new employee records (%s fields changed)",
+                            updated, added, len(transaction.changes))
+                return updated, added
+        except Exception as e:
+            logger.error("Error saving employee records: %s", e)
+            raise Exception(f"Error saving employee records: {str(e)}")
+
+    @instrumented()
     def add_new_employee(self, emp_id, name, department, designation, joining_date, contract_expiry, division, exp_pmtf):
         """Add a new employee to the Excel file."""
         try:
-            headers = self.get_headers()
-            emp_id_col = None
-            for i, header in enumerate(headers):
-                if header and str(header).strip().lower() in ["employee id", "emp id", "id", "employee_id"]:
-                    emp_id_col = i
-                    break
-            if emp_id_col is None:
-                raise ValueError("Column 'Employee ID' not found in Excel file")
+            with self.write_transaction() as transaction:
+                headers = self.get_headers()
+                emp_id_col = None
+                for i, header in enumerate(headers):
+                    if header and str(header).strip().lower() in ["employee id", "emp id", "id", "employee_id"]:
+                        emp_id_col = i
+                        break
+                if emp_id_col is None:
+                    raise ValueError("Column 'Employee ID' not found in Excel file")
             
-            # Check for duplicate Employee ID
-            for row in self.ws.iter_rows(min_row=2, values_only=True):
-                if row and row[emp_id_col] == emp_id:
-                    logging.warning(f"Duplicate Employee ID {emp_id} found")
-                    return False, "Employee ID already exists"
+                # Check for duplicate Employee ID
+                for row in self.ws.iter_rows(min_row=2, values_only=True):
+                    if row and row[emp_id_col] == emp_id:
+                        logger.warning("Duplicate Employee ID %s found", emp_id)
+                        transaction.save = False
+                        return False, "Employee ID already exists"
             
-            # Prepare new employee data
-            new_employee = {
-                "Employee ID": emp_id,
-                "Employee Name": name,
-                "Department": department,
-                "Designation": designation,
-                "Date of Joining": joining_date,
-                "Contract Expiry Date": contract_expiry,
-                "Division": division,
-                "Exp in xyz": exp_pmtf,
-                "Entity Name": "xyz",
-                "Date of Evaluation": datetime.now().strftime("%Y-%m-%d")
-            }
+                # Prepare new employee data
+                new_employee = {
+                    "Employee ID": emp_id,
+                    "Employee Name": name,
+                    "Department": department,
+                    "Designation": designation,
+                    "Date of Joining": joining_date,
+                    "Contract Expiry Date": contract_expiry,
+                    "Division": division,
+                    # Typed in by hand; counted from the joining date when left blank
+                    EXPERIENCE_COLUMN: exp_pmtf if str(exp_pmtf or "").strip() else years_since(joining_date),
+                    "Entity Name": "xyz",
+                    "Date of Evaluation": datetime.now().strftime("%Y-%m-%d")
+                }
             
-            # Append new row with default values for other columns
-            row_data = [new_employee.get(header, "") for header in headers]
-            self.ws.append(row_data)
-            self.wb.save(self.file_path)
-            logging.info(f"Added new employee {emp_id} to Excel file")
-            return True, "Employee added successfully"
+                # Append new row with default values for other columns
+                row_data = [new_employee.get(header, "") for header in headers]
+                self.write_new_row(transaction, row_data, emp_id, headers)
+                logger.info("Added new employee %s to Excel file", emp_id)
+                return True, "Employee added successfully"
         except Exception as e:
-            logging.error(f"Error adding new employee: {str(e)}")
+            logger.error("Error adding new employee: %s", e)
             return False, f"Error adding new employee: {str(e)}"
\ No newline at end of file
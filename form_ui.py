@@ -6,6 +6,9 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from datetime import datetime
+from column_schema import display_text
+from scoring import get_rating_value, kpi_weighted_score, soft_skill_weighted_score, overall_rating_label
+from instrumentation import instrumented
 
 class PerformanceForm(QWidget):
     def __init__(self, parent_app=None):
@@ -19,8 +22,8 @@ class PerformanceForm(QWidget):
             QPushButton { background-color: #4CAF50; color: white; border: none; padding: 8px 16px; border-radius: 4px; font-weight: bold; }
             QPushButton:hover { background-color: #55DB4D; }
             QPushButton:pressed { background-color: #3d8b40; }
-            QPushButton#searchBtn, QPushButton#viewCurvedBtn, QPushButton#adminBtn { background-color: #0886C2; }
-            QPushButton#searchBtn:hover, QPushButton#viewCurvedBtn:hover, QPushButton#adminBtn:hover { background-color: #16AAF0; }
+            QPushButton#searchBtn, QPushButton#viewCurvedBtn, QPushButton#scorecardBtn, QPushButton#adminBtn, QPushButton#diagnosticsBtn { background-color: #0886C2; }
+            QPushButton#searchBtn:hover, QPushButton#viewCurvedBtn:hover, QPushButton#scorecardBtn:hover, QPushButton#adminBtn:hover, QPushButton#diagnosticsBtn:hover { background-color: #16AAF0; }
             QPushButton#resetBtn { background-color: #0886C2; }
             QPushButton#resetBtn:hover { background-color: #16AAF0; }
             QPushButton#addEmpBtn { background-color: #0886C2; }
@@ -31,6 +34,8 @@ class PerformanceForm(QWidget):
         self.kpi_widgets = {}
         self.soft_skill_widgets = {}
         self.input_widgets = {}
+        self.column_widgets = {}  # header -> widgets shown/hidden with that column
+        self.shown_headers = set()
         self.soft_skills_mapping = {
             "Open & Clear Communication": "Open_Clear_Communication",
             "Attitude, Team Work & Collaboration": "Attitude_Team_Work_Collaboration",
@@ -39,6 +44,7 @@ class PerformanceForm(QWidget):
             "Ownership & Self Accountability": "Ownership_Self_Accountability"
         }
         self.create_ui()
+        self.apply_column_visibility()
 
     def create_ui(self):
         main_layout = QVBoxLayout(self)
@@ -54,8 +60,9 @@ class PerformanceForm(QWidget):
         scroll_widget = QWidget()
         scroll_layout = QVBoxLayout(scroll_widget)
 
-        # Get visible headers from ExcelHandler
-        headers = self.parent_app.excel_handler.get_visible_headers()
+        # Build widgets for every known column; visibility is applied afterwards so
+        # toggling a column in the admin panel never needs a rebuild
+        headers = self.parent_app.excel_handler.get_headers()
 
         # Employee Information Group
         emp_info_group = QGroupBox("Employee Information")
@@ -92,7 +99,9 @@ class PerformanceForm(QWidget):
                 elif field == "Entity Name":
                     input_widget.setText("xyz")
                 self.input_widgets[field] = input_widget
-                emp_info_layout.addWidget(QLabel(field + ":"), row, col)
+                field_label = QLabel(field + ":")
+                self.track_column_widgets(field, field_label, input_widget)
+                emp_info_layout.addWidget(field_label, row, col)
                 emp_info_layout.addWidget(input_widget, row, col+1)
                 col += 2
                 if col >= 4:
@@ -144,6 +153,7 @@ class PerformanceForm(QWidget):
                 kpi_data['title'] = title_input
                 kpi_table_layout.addWidget(title_input, i, 0)
                 self.input_widgets[kpi_title] = title_input
+                self.track_column_widgets(kpi_title, title_input)
             
             if kpi_desc in headers:
                 desc_input = QLineEdit()
@@ -151,6 +161,7 @@ class PerformanceForm(QWidget):
                 kpi_data['description'] = desc_input
                 kpi_table_layout.addWidget(desc_input, i, 1)
                 self.input_widgets[kpi_desc] = desc_input
+                self.track_column_widgets(kpi_desc, desc_input)
             
             if kpi_rating in headers:
                 rating_combo = QComboBox()
@@ -159,6 +170,7 @@ class PerformanceForm(QWidget):
                 kpi_data['rating'] = rating_combo
                 kpi_table_layout.addWidget(rating_combo, i, 2)
                 self.input_widgets[kpi_rating] = rating_combo
+                self.track_column_widgets(kpi_rating, rating_combo)
             
             if kpi_weight in headers:
                 weightage_spin = QSpinBox()
@@ -169,6 +181,7 @@ class PerformanceForm(QWidget):
                 kpi_data['weightage'] = weightage_spin
                 kpi_table_layout.addWidget(weightage_spin, i, 3)
                 self.input_widgets[kpi_weight] = weightage_spin
+                self.track_column_widgets(kpi_weight, weightage_spin)
             
             if kpi_score in headers:
                 score_label = QLabel("0.0")
@@ -176,6 +189,7 @@ class PerformanceForm(QWidget):
                 kpi_data['score'] = score_label
                 kpi_table_layout.addWidget(score_label, i, 4)
                 self.input_widgets[kpi_score] = score_label
+                self.track_column_widgets(kpi_score, score_label)
             
             self.kpi_widgets[f'kpi_{i}'] = kpi_data
         
@@ -229,6 +243,7 @@ class PerformanceForm(QWidget):
                 soft_skills_layout.addWidget(skill_label, i, 0)
                 soft_skills_layout.addWidget(rating_combo, i, 1)
                 self.input_widgets[rating_key] = rating_combo
+                self.track_column_widgets(rating_key, skill_label, rating_combo)
                 self.soft_skill_widgets[clean_name] = {'rating': rating_combo}
                 
                 if score_key in headers:
@@ -236,6 +251,7 @@ class PerformanceForm(QWidget):
                     score_label.setStyleSheet("background-color: #f0f0f0; padding: 5px; border: 1px solid #ccc;")
                     soft_skills_layout.addWidget(score_label, i, 2)
                     self.input_widgets[score_key] = score_label
+                    self.track_column_widgets(score_key, score_label)
                     self.soft_skill_widgets[clean_name]['score'] = score_label
         
         part_b_layout.addLayout(soft_skills_layout)
@@ -257,34 +273,42 @@ class PerformanceForm(QWidget):
         overall_layout = QGridLayout(overall_group)
         
         if "Overall_Rating" in headers:
-            overall_layout.addWidget(QLabel("Overall Performance Rating:"), 0, 0)
+            field_label = QLabel("Overall Performance Rating:")
+            overall_layout.addWidget(field_label, 0, 0)
             self.overall_rating_label = QLabel("0.0")
             self.overall_rating_label.setFont(QFont("Arial", 14, QFont.Bold))
             self.overall_rating_label.setStyleSheet("background-color: #fff3cd; padding: 10px; border: 2px solid #ffc107;")
             overall_layout.addWidget(self.overall_rating_label, 0, 1)
             self.input_widgets["Overall_Rating"] = self.overall_rating_label
+            self.track_column_widgets("Overall_Rating", field_label, self.overall_rating_label)
         
         if "Overall_Percentage" in headers:
-            overall_layout.addWidget(QLabel("Overall Percentage:"), 0, 2)
+            field_label = QLabel("Overall Percentage:")
+            overall_layout.addWidget(field_label, 0, 2)
             self.overall_percentage_label = QLabel("0.0%")
             self.overall_percentage_label.setFont(QFont("Arial", 14, QFont.Bold))
             self.overall_percentage_label.setStyleSheet("background-color: #fff3cd; padding: 10px; border: 2px solid #ffc107;")
             overall_layout.addWidget(self.overall_percentage_label, 0, 3)
             self.input_widgets["Overall_Percentage"] = self.overall_percentage_label
+            self.track_column_widgets("Overall_Percentage", field_label, self.overall_percentage_label)
         
         if "Promotion_Recommendation" in headers:
-            overall_layout.addWidget(QLabel("Promotion Recommendation:"), 1, 0)
+            field_label = QLabel("Promotion Recommendation:")
+            overall_layout.addWidget(field_label, 1, 0)
             self.promotion_combo = QComboBox()
             self.promotion_combo.addItems(["Select", "Yes", "No"])
             overall_layout.addWidget(self.promotion_combo, 1, 1)
             self.input_widgets["Promotion_Recommendation"] = self.promotion_combo
+            self.track_column_widgets("Promotion_Recommendation", field_label, self.promotion_combo)
         
         if "Retention_Recommendation" in headers:
-            overall_layout.addWidget(QLabel("Retention Recommendation:"), 1, 2)
+            field_label = QLabel("Retention Recommendation:")
+            overall_layout.addWidget(field_label, 1, 2)
             self.retention_combo = QComboBox()
             self.retention_combo.addItems(["Select", "Yes", "No"])
             overall_layout.addWidget(self.retention_combo, 1, 3)
             self.input_widgets["Retention_Recommendation"] = self.retention_combo
+            self.track_column_widgets("Retention_Recommendation", field_label, self.retention_combo)
         
         scroll_layout.addWidget(overall_group)
 
@@ -292,34 +316,63 @@ class PerformanceForm(QWidget):
         button_layout = QHBoxLayout()
         button_layout.addStretch()
         
-        save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self.save_form)
-        button_layout.addWidget(save_btn)
+        self.save_btn = QPushButton("Save")
+        self.save_btn.clicked.connect(self.save_form)
+        button_layout.addWidget(self.save_btn)
         
         reset_btn = QPushButton("Reset")
         reset_btn.setObjectName("resetBtn")
         reset_btn.clicked.connect(self.clear_form)
         button_layout.addWidget(reset_btn)
         
-        add_emp_btn = QPushButton("Add New Employee")
-        add_emp_btn.setObjectName("addEmpBtn")
-        add_emp_btn.clicked.connect(self.show_add_employee_dialog)
-        button_layout.addWidget(add_emp_btn)
+        self.add_emp_btn = QPushButton("Add New Employee")
+        self.add_emp_btn.setObjectName("addEmpBtn")
+        self.add_emp_btn.clicked.connect(self.show_add_employee_dialog)
+        button_layout.addWidget(self.add_emp_btn)
         
         view_curved_btn = QPushButton("View Curved")
         view_curved_btn.setObjectName("viewCurvedBtn")
         view_curved_btn.clicked.connect(self.view_curved)
         button_layout.addWidget(view_curved_btn)
+
+        scorecard_btn = QPushButton("Scorecards")
+        scorecard_btn.setObjectName("scorecardBtn")
+        scorecard_btn.clicked.connect(self.parent_app.open_scorecard_view)
+        button_layout.addWidget(scorecard_btn)
         
         admin_btn = QPushButton("Manage Columns")
         admin_btn.setObjectName("adminBtn")
         admin_btn.clicked.connect(self.parent_app.open_admin_panel)
         button_layout.addWidget(admin_btn)
+
+        diagnostics_btn = QPushButton("Diagnostics")
+        diagnostics_btn.setObjectName("diagnosticsBtn")
+        diagnostics_btn.clicked.connect(self.parent_app.open_diagnostics_panel)
+        button_layout.addWidget(diagnostics_btn)
         
         scroll_layout.addLayout(button_layout)
         scroll.setWidget(scroll_widget)
         main_layout.addWidget(scroll)
 
+    def track_column_widgets(self, header, *widgets):
+        self.column_widgets.setdefault(header, []).extend(widgets)
+
+    @instrumented()
+    def apply_column_visibility(self):
+        """Show or hide existing widgets to match the visible column list."""
+        visible_headers = set(self.parent_app.excel_handler.get_visible_headers())
+        revealed = visible_headers - self.shown_headers
+        self.shown_headers = visible_headers
+        for header, widgets in self.column_widgets.items():
+            for widget in widgets:
+                widget.setVisible(header in visible_headers)
+        if self.employee_combo.currentIndex() > 0:
+            self.calculate_scores()
+            if revealed:
+                # The employee was loaded without these columns; their widgets still hold stale values
+                self.on_employee_selected(self.employee_combo.currentText())
+
+    @instrumented()
     def calculate_scores(self, skill=None):
         try:
             part_a_total = 0.0
@@ -333,7 +386,7 @@ class PerformanceForm(QWidget):
                     rating_text = kpi['rating'].currentText()
                     weightage = kpi['weightage'].value()
                     rating_value = self.get_rating_value(rating_text)
-                    score = rating_value * (weightage / 100.0) * 70
+                    score = kpi_weighted_score(rating_value, weightage)
                     kpi['score'].setText(f"{score:.1f}")
                     part_a_total += score
             self.part_a_total_label.setText(f"{part_a_total:.1f}")
@@ -346,7 +399,7 @@ class PerformanceForm(QWidget):
                     widgets = self.soft_skill_widgets.get(clean_name, {})
                     rating_text = widgets['rating'].currentText()
                     rating_value = self.get_rating_value(rating_text, is_soft_skill=True)
-                    score = rating_value * (6 / 100.0) * 30
+                    score = soft_skill_weighted_score(rating_value)
                     widgets['score'].setText(f"{score:.1f}")
                     part_b_total += score
             self.part_b_total_label.setText(f"{part_b_total:.1f}")
@@ -354,38 +407,12 @@ class PerformanceForm(QWidget):
             overall_score = part_a_total + part_b_total
             self.overall_percentage_label.setText(f"{overall_score:.1f}%")
             
-            if overall_score >= 90:
-                rating = "Outstanding (5)"
-            elif overall_score >= 80:
-                rating = "Exceeds Expectations (4)"
-            elif overall_score >= 60:
-                rating = "Meets Expectations (3)"
-            elif overall_score >= 40:
-                rating = "Below Expectations (2)"
-            else:
-                rating = "Serious Performance Concerns (1)"
-            self.overall_rating_label.setText(rating)
+            self.overall_rating_label.setText(overall_rating_label(overall_score))
         except Exception as e:
             self.show_error_message(f"Error calculating scores: {str(e)}")
 
     def get_rating_value(self, rating_text, is_soft_skill=False):
-        if is_soft_skill:
-            rating_map = {
-                "Does not Demonstrate (1)": 1,
-                "Developing (2)": 2,
-                "Proficient (3)": 3,
-                "Proficient (4)": 4,
-                "Expert (5)": 5
-            }
-        else:
-            rating_map = {
-                "Serious Performance Concerns (1)": 1,
-                "Below Expectations (2)": 2,
-                "Meets Expectations (3)": 3,
-                "Exceeds Expectations (4)": 4,
-                "Outstanding (5)": 5
-            }
-        return rating_map.get(rating_text, 0)
+        return get_rating_value(rating_text, is_soft_skill)
 
     def get_form_data(self):
         try:
@@ -411,6 +438,7 @@ class PerformanceForm(QWidget):
             self.show_error_message(f"Error collecting form data: {str(e)}")
             return None
 
+    @instrumented()
     def populate_employee_dropdown(self, employees):
         self.employee_combo.clear()
         self.employee_combo.addItem("Select Employee ID")
@@ -420,24 +448,36 @@ class PerformanceForm(QWidget):
 
     def on_employee_selected(self, display_text):
         if display_text and display_text != "Select Employee ID" and self.parent_app:
-            try:
-                emp_id = self.employee_combo.itemData(self.employee_combo.currentIndex())
-                if not emp_id:
-                    emp_id = display_text.split(" - ")[0]
-                employee_data = self.parent_app.excel_handler.get_employee_data(emp_id)
-                if employee_data:
-                    headers = self.parent_app.excel_handler.get_visible_headers()
-                    for header, widget in self.input_widgets.items():
-                        if header in employee_data:
-                            value = employee_data.get(header, "")
-                            if isinstance(widget, QLineEdit) or isinstance(widget, QLabel):
-                                widget.setText(value)
-                            elif isinstance(widget, QComboBox):
-                                widget.setCurrentText(value)
-                            elif isinstance(widget, QSpinBox):
-                                widget.setValue(int(value) if value.isdigit() else 15)
-            except Exception as e:
-                self.show_error_message(f"Error loading employee data: {str(e)}")
+            emp_id = self.employee_combo.itemData(self.employee_combo.currentIndex())
+            if not emp_id:
+                emp_id = display_text.split(" - ")[0]
+            self.parent_app.fetch_employee_data(emp_id, self.populate_employee_fields)
+
+    @instrumented()
+    def populate_employee_fields(self, employee_data):
+        try:
+            if employee_data:
+                for header, widget in self.input_widgets.items():
+                    if header in employee_data:
+                        # Values arrive typed (column_schema); widgets show them as text
+                        value = employee_data.get(header, "")
+                        if isinstance(widget, QLineEdit) or isinstance(widget, QLabel):
+                            widget.setText(display_text(value))
+                        elif isinstance(widget, QComboBox):
+                            if value == "" and not widget.isEditable():
+                                # Unrated / blank: back to the "Select ..." entry
+                                widget.setCurrentIndex(0)
+                            else:
+                                widget.setCurrentText(display_text(value))
+                        elif isinstance(widget, QSpinBox):
+                            widget.setValue(value if isinstance(value, int) else 15)
+        except Exception as e:
+            self.show_error_message(f"Error loading employee data: {str(e)}")
+
+    def set_busy(self, busy):
+        """Block actions that write to the workbook while background I/O is running."""
+        self.save_btn.setEnabled(not busy)
+        self.add_emp_btn.setEnabled(not busy)
 
     def search_employee(self):
         emp_id = self.employee_combo.itemData(self.employee_combo.currentIndex())
@@ -521,7 +561,7 @@ class PerformanceForm(QWidget):
         layout.addRow(buttons)
         
         if dialog.exec_() == QDialog.Accepted:
-            success, message = self.parent_app.add_new_employee(
+            self.parent_app.add_new_employee(
                 emp_id.text(),
                 name.text(),
                 department.text(),
@@ -530,9 +570,4 @@ class PerformanceForm(QWidget):
                 contract_expiry.date().toString("dd/MM/yyyy"),
                 division.text(),
                 exp_pmtf.text()
-            )
-            if success:
-                self.show_success_message("Employee added successfully!")
-                self.parent_app.load_employees()
-            else:
-                self.show_error_message(message)
\ No newline at end of file
+            )
\ No newline at end of file
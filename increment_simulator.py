@@ -0,0 +1,155 @@
+from payroll_engine import compute_salary_columns
+from log_config import get_logger
+
+logger = get_logger("payroll")
+
+# (band label, upper Total_Salary limit); the last band has no upper limit
+DEFAULT_SALARY_BANDS = [
+    ("Band A", 100000),
+    ("Band B", 200000),
+    ("Band C", 400000),
+    ("Band D", None),
+]
+
+
+class IncrementSimulator:
+    """What-if costing of a rating x salary band increment matrix.
+
+    Employees are grouped once into cohorts by (rating code, salary band), and
+    each cohort keeps its salary base per (Division, Department). Changing one
+    matrix cell therefore only recomputes that cohort's contribution. Cohorts
+    without a matrix cell keep their current Salary_Increment_2425.
+    """
+
+    def __init__(self, engine, salary_bands=None):
+        self.engine = engine
+        self.salary_bands = salary_bands or DEFAULT_SALARY_BANDS
+        self.matrix = {}
+        self.cohorts = {}
+        self.group_costs = {}
+
+    def salary_band(self, total_salary):
+        for label, upper in self.salary_bands:
+            if upper is None or total_salary < upper:
+                return label
+        return self.salary_bands[-1][0]
+
+    def prepare(self):
+        """Group employees into cohorts; run once after loading the workbook."""
+        if not self.engine.employee_ids:
+            self.engine.load()
+        engine = self.engine
+        totals = compute_salary_columns(engine.columns)["Total_Salary"]
+        current = engine.columns["Salary_Increment_2425"]
+        self.cohorts = {}
+        for i, emp_id in enumerate(engine.employee_ids):
+            key = (engine.ratings[i], self.salary_band(totals[i]))
+            cohort = self.cohorts.setdefault(key, {"members": [], "base": {}, "current_cost": {}})
+            group = (str(engine.divisions[i]), str(engine.departments[i]))
+            cohort["members"].append(emp_id)
+            cohort["base"][group] = cohort["base"].get(group, 0.0) + totals[i]
+            cohort["current_cost"][group] = cohort["current_cost"].get(group, 0.0) + totals[i] * current[i] / 100.0 * 12
+        self.group_costs = {}
+        for key in self.cohorts:
+            for group, cost in self.cohort_costs(key).items():
+                self.group_costs[group] = self.group_costs.get(group, 0.0) + cost
+        logger.info("Increment simulator prepared %s cohorts", len(self.cohorts))
+
+    def cohort_costs(self, key):
+        """Annual increment cost of one cohort per (Division, Department)."""
+        cohort = self.cohorts[key]
+        pct = self.matrix.get(key)
+        if pct is None:
+            return dict(cohort["current_cost"])
+        return {group: base * pct / 100.0 * 12 for group, base in cohort["base"].items()}
+
+    def set_cell(self, rating, band, percentage):
+        """Set one matrix cell (None clears it) and update the totals for that cohort only."""
+        key = (rating, band)
+        old_costs = self.cohort_costs(key) if key in self.cohorts else {}
+        if percentage is None:
+            self.matrix.pop(key, None)
+        else:
+            self.matrix[key] = float(percentage)
+        if key not in self.cohorts:
+            return
+        for group, cost in self.cohort_costs(key).items():
+            self.group_costs[group] += cost - old_costs.get(group, 0.0)
+
+    def set_matrix(self, matrix):
+        """Replace the whole matrix; matrix maps (rating code, band label) -> percentage."""
+        for key in list(self.matrix):
+            if key not in matrix:
+                self.set_cell(key[0], key[1], None)
+        for (rating, band), percentage in matrix.items():
+            self.set_cell(rating, band, percentage)
+
+    def totals(self):
+        """Annual increment cost overall, by Division and by Department."""
+        by_division = {}
+        by_department = {}
+        for (division, department), cost in self.group_costs.items():
+            by_division[division] = by_division.get(division, 0.0) + cost
+            by_department[department] = by_department.get(department, 0.0) + cost
+        return {
+            "total": round(sum(self.group_costs.values()), 2),
+            "by_division": {k: round(v, 2) for k, v in by_division.items()},
+            "by_department": {k: round(v, 2) for k, v in by_department.items()},
+        }
+
+    def recompute_totals(self):
+        """totals() computed from scratch employee by employee, to check the incrementally kept cohort costs."""
+        engine = self.engine
+        totals = compute_salary_columns(engine.columns)["Total_Salary"]
+        current = engine.columns["Salary_Increment_2425"]
+        costs = {}
+        for i in range(len(engine.employee_ids)):
+            pct = self.matrix.get((engine.ratings[i], self.salary_band(totals[i])), current[i])
+            group = (str(engine.divisions[i]), str(engine.departments[i]))
+            costs[group] = costs.get(group, 0.0) + totals[i] * pct / 100.0 * 12
+        group_costs, self.group_costs = self.group_costs, costs
+        try:
+            return self.totals()
+        finally:
+            self.group_costs = group_costs
+
+    def verify(self, tolerance=0.01):
+        """True when totals() agrees with recompute_totals() overall and for every Division and Department."""
+        totals, full = self.totals(), self.recompute_totals()
+        if abs(totals["total"] - full["total"]) > tolerance:
+            return False
+        return all(
+            abs(totals[part].get(name, 0.0) - cost) <= tolerance
+            for part in ("by_division", "by_department") for name, cost in full[part].items()
+        )
+
+    def cohort_rows(self):
+        """One row per cohort: rating code, band, headcount, matrix percentage (None: current) and annual cost."""
+        return [
+            {
+                "rating": rating, "band": band, "employees": len(self.cohorts[(rating, band)]["members"]),
+                "increment_pct": self.matrix.get((rating, band)),
+                "annual_cost": round(sum(self.cohort_costs((rating, band)).values()), 2),
+            }
+            for rating, band in sorted(self.cohorts)
+        ]
+
+    def commit(self):
+        """Write the chosen scenario's Salary_Increment_2425 values in one batch save."""
+        try:
+            values = {}
+            for key, percentage in self.matrix.items():
+                for emp_id in self.cohorts.get(key, {}).get("members", []):
+                    values[emp_id] = percentage
+            if values:
+                self.engine.excel_handler.update_columns({"Salary_Increment_2425": values})
+                increments = self.engine.columns["Salary_Increment_2425"]
+                for i, emp_id in enumerate(self.engine.employee_ids):
+                    if emp_id in values:
+                        increments[i] = values[emp_id]
+                self.prepare()
+            logger.info("Committed increment scenario for %s employees", len(values))
+            return len(values)
+        except Exception as e:
+            logger.error("Error committing increment scenario: %s", e)
+            raise Exception(f"Error committing increment scenario: {str(e)}")
@@ -0,0 +1,260 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from log_config import get_logger
+
+logger = get_logger("perf")
+
+# inspect.CO_GENERATOR, without importing inspect at startup
+CO_GENERATOR = 0x20
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open ended
+BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30]
+
+
+class OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add(self, elapsed, failed):
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed
+        self.min = elapsed if self.min is None else min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+        for i, bound in enumerate(BUCKETS):
+            if elapsed <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls (an estimate)."""
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            "min_ms": round((self.min or 0.0) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "histogram": {
+                (f"<={bound * 1000:g}ms" if i < len(BUCKETS) else f">{BUCKETS[-1] * 1000:g}ms"): count
+                for i, (bound, count) in enumerate(zip(BUCKETS + [None], self.buckets)) if count
+            },
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+class Instrumentation:
+    """Process-wide call counts, latency histograms and file bytes per operation.
+
+    Disabled by default (or enabled with HR_INSTRUMENTATION=1); while disabled
+    an instrumented call costs one attribute check. Updates are guarded by a
+    lock because workbook operations run on the executor's worker thread.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("HR_INSTRUMENTATION", "") not in ("", "0")
+        self.stats = {}
+        self.started = datetime.now()
+        self.profile_requests = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats.setdefault(name, OperationStats())
+        return stats
+
+    def record(self, name, elapsed, failed=False):
+        with self._lock:
+            self._stats_for(name).add(elapsed, failed)
+
+    def add_bytes(self, name, read_path=None, written_path=None):
+        """Count the size of a file read or written by an operation (only while enabled)."""
+        if not self.enabled:
+            return
+        try:
+            read = os.path.getsize(read_path) if read_path else 0
+            written = os.path.getsize(written_path) if written_path else 0
+        except OSError:
+            return
+        with self._lock:
+            stats = self._stats_for(name)
+            stats.bytes_read += read
+            stats.bytes_written += written
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.started = datetime.now()
+
+    def snapshot(self):
+        with self._lock:
+            operations = {name: stats.to_dict() for name, stats in sorted(self.stats.items())}
+        return {
+            "since": self.started.isoformat(timespec="seconds"),
+            "taken": datetime.now().isoformat(timespec="seconds"),
+            "enabled": self.enabled,
+            "operations": operations,
+        }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def profile_next(self, name, path):
+        """Capture a cProfile trace of the next call to operation `name` into path (a .prof file)."""
+        self.enabled = True
+        with self._lock:
+            self.profile_requests[name] = path
+
+    def _take_profile_request(self, name):
+        if not self.profile_requests:
+            return None
+        with self._lock:
+            return self.profile_requests.pop(name, None)
+
+
+metrics = Instrumentation()
+
+
+class StartupTrace:
+    """Durations of the application's startup phases, in the order they complete.
+
+    start() takes the time the process began (captured before the heavy
+    imports); each mark() closes the phase since the previous mark. Phases
+    are also recorded as "startup.<phase>" operations, so the diagnostics
+    panel shows them even when instrumentation is off.
+    """
+
+    def __init__(self):
+        self.origin = None
+        self.last = None
+        self.phases = []
+        self.finished = False
+
+    def start(self, origin=None):
+        self.origin = self.last = time.perf_counter() if origin is None else origin
+
+    def mark(self, phase):
+        if self.origin is None or self.finished:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        metrics.record(f"startup.{phase}", now - self.last)
+        self.last = now
+
+    def finish(self, phase):
+        """Close the last phase and log the whole breakdown once."""
+        if self.origin is None or self.finished:
+            return
+        self.mark(phase)
+        self.finished = True
+        logger.info(
+            "Startup took %.3fs: %s", self.last - self.origin,
+            ", ".join(f"{name} {elapsed:.3f}s" for name, elapsed in self.phases)
+        )
+
+    def to_dict(self):
+        return {name: round(elapsed, 4) for name, elapsed in self.phases}
+
+
+startup = StartupTrace()
+
+
+@contextmanager
+def profiled(path, sort="cumulative", limit=40):
+    """Run the body under cProfile; writes the raw trace to path and a text summary to path + '.txt'."""
+    # Imported here to keep them off the application's startup path
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        with open(path + ".txt", "w") as f:
+            pstats.Stats(profiler, stream=f).sort_stats(sort).print_stats(limit)
+        logger.info("Profile written to %s", path)
+
+
+def instrumented(name=None):
+    """Decorator recording calls, latency and failures of a function under `name`.
+
+    Generator functions are timed until they are exhausted or closed.
+    """
+    def decorate(fn):
+        op_name = name or fn.__qualname__
+
+        def run(call):
+            profile_path = metrics._take_profile_request(op_name)
+            start = time.perf_counter()
+            failed = True
+            try:
+                if profile_path:
+                    with profiled(profile_path):
+                        result = call()
+                else:
+                    result = call()
+                failed = False
+                return result
+            finally:
+                metrics.record(op_name, time.perf_counter() - start, failed)
+
+        if fn.__code__.co_flags & CO_GENERATOR:
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                if not metrics.enabled:
+                    return (yield from fn(*args, **kwargs))
+                return (yield from run_generator(args, kwargs))
+
+            def run_generator(args, kwargs):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    result = yield from fn(*args, **kwargs)
+                    failed = False
+                    return result
+                except GeneratorExit:
+                    failed = False
+                    raise
+                finally:
+                    metrics.record(op_name, time.perf_counter() - start, failed)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            return run(lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorate
@@ -0,0 +1,138 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from log_config import get_logger
+
+logger = get_logger("io")
+
+
+class TaskCancelled(Exception):
+    """Raised from a task's progress callback once cancellation was requested."""
+
+
+class TaskSignals(QObject):
+    """Signals emitted by an IOTask; delivered on the GUI thread."""
+    started = pyqtSignal()
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class IOTask(QRunnable):
+    def __init__(self, name, fn, args, kwargs, with_progress=False):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.with_progress = with_progress
+        self.signals = TaskSignals()
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Request cancellation; long running tasks stop at their next progress report."""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def report_progress(self, done, total):
+        if self.is_cancelled():
+            raise TaskCancelled(f"{self.name} cancelled")
+        self.signals.progress.emit(int(done), int(total))
+
+    def run(self):
+        if self.is_cancelled():
+            self.signals.cancelled.emit()
+            return
+        self.signals.started.emit()
+        try:
+            kwargs = dict(self.kwargs)
+            if self.with_progress:
+                kwargs["progress_callback"] = self.report_progress
+            result = self.fn(*self.args, **kwargs)
+        except Exception as e:
+            # ExcelHandler re-wraps errors, so a cancelled task may surface as a plain Exception
+            if self.is_cancelled():
+                logger.info("Task '%s' cancelled", self.name)
+                self.signals.cancelled.emit()
+            else:
+                logger.error("Task '%s' failed: %s", self.name, e)
+                self.signals.error.emit(str(e))
+            return
+        if self.is_cancelled():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class ExcelIOExecutor(QObject):
+    """Runs workbook operations off the GUI thread.
+
+    openpyxl workbooks are not thread-safe, so every task that touches the
+    workbook goes through a single-threaded pool: reads and writes run one at a
+    time, in submission order. Work that does not touch the workbook can be
+    submitted with exclusive=False to use the global pool instead.
+    """
+    busy_changed = pyqtSignal(bool, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.workbook_pool = QThreadPool(self)
+        self.workbook_pool.setMaxThreadCount(1)
+        self.compute_pool = QThreadPool.globalInstance()
+        self._tasks = []
+
+    def submit(self, name, fn, *args, on_finished=None, on_error=None, on_progress=None,
+               on_cancelled=None, with_progress=False, exclusive=True, **kwargs):
+        """Queue fn(*args, **kwargs) and return its IOTask.
+
+        When with_progress is True, fn receives a progress_callback(done, total)
+        keyword argument which also raises TaskCancelled after cancel().
+        """
+        task = IOTask(name, fn, args, kwargs, with_progress=with_progress)
+        if on_finished:
+            task.signals.finished.connect(on_finished)
+        if on_error:
+            task.signals.error.connect(on_error)
+        if on_progress:
+            task.signals.progress.connect(on_progress)
+        if on_cancelled:
+            task.signals.cancelled.connect(on_cancelled)
+        for signal in (task.signals.finished, task.signals.error, task.signals.cancelled):
+            signal.connect(lambda *_, t=task: self._task_done(t))
+        task.pool = self.workbook_pool if exclusive else self.compute_pool
+        self._tasks.append(task)
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True, name)
+        logger.debug("Queued task '%s'", name)
+        task.pool.start(task)
+        return task
+
+    def cancel(self, task):
+        """Cancel a task: drop it if still queued, otherwise stop it cooperatively."""
+        if task is None or task not in self._tasks:
+            return
+        task.cancel()
+        if task.pool.tryTake(task):
+            task.signals.cancelled.emit()
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            self.cancel(task)
+
+    def is_busy(self):
+        return bool(self._tasks)
+
+    def wait_for_done(self, msecs=-1):
+        """Block until queued workbook tasks finish (used on shutdown so writes are not lost)."""
+        return self.workbook_pool.waitForDone(msecs)
+
+    def _task_done(self, task):
+        if task in self._tasks:
+            self._tasks.remove(task)
+            if not self._tasks:
+                self.busy_changed.emit(False, "")
+            else:
+                self.busy_changed.emit(True, self._tasks[0].name)
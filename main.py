@@ -1,18 +1,29 @@
 import sys
 import os
+import time
+
+# Taken before the heavy imports so the startup trace covers them
+STARTED = time.perf_counter()
+
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout,
     QCheckBox, QPushButton, QLineEdit, QFormLayout, QMessageBox, QLabel,
-    QGroupBox, QScrollArea
+    QGroupBox, QScrollArea, QProgressBar, QComboBox
 )
+from PyQt5.QtCore import Qt, QEvent
 from form_ui import PerformanceForm
 from excel_handler import ExcelHandler
-from employee_view import EmployeeViewWindow
-from curved_performance_view import CurvedPerformanceView
-import logging
+from column_schema import COLUMN_TYPES
+from employee_query import EmployeeQuery
+from scorecards import ScorecardCache
+from io_executor import ExcelIOExecutor
+from instrumentation import startup
+from log_config import Lazy, configure_logging, get_logger
+# employee_view, curved_performance_view (QtChart), scorecard_view and
+# diagnostics_panel are imported the first time their screen opens
+
+logger = get_logger("ui")
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class AdminColumnManager(QWidget):
     def __init__(self, parent_app):
@@ -82,6 +93,7 @@ class AdminColumnManager(QWidget):
         """)
         self.column_checkboxes = {}
         self.dynamic_layout = None  # Store dynamic_layout for adding new checkboxes
+        self.apply_button = None
         self.create_ui()
 
     def create_ui(self):
@@ -109,10 +121,15 @@ class AdminColumnManager(QWidget):
             if header not in mandatory_columns:
                 checkbox = QCheckBox(header)
                 checkbox.setChecked(header in self.parent_app.excel_handler.visible_columns)
-                checkbox.stateChanged.connect(self.update_column_visibility)
+                checkbox.stateChanged.connect(self.mark_pending_changes)
                 self.column_checkboxes[header] = checkbox
                 self.dynamic_layout.addWidget(checkbox)
         
+        self.apply_button = QPushButton("Apply")
+        self.apply_button.setEnabled(False)
+        self.apply_button.clicked.connect(self.update_column_visibility)
+        self.dynamic_layout.addWidget(self.apply_button)
+
         scroll_layout.addWidget(dynamic_group)
 
         # Mandatory columns group
@@ -130,9 +147,12 @@ class AdminColumnManager(QWidget):
         add_column_layout = QFormLayout(add_column_group)
         self.new_column_name = QLineEdit()
         self.new_column_name.setPlaceholderText("Enter new column name (e.g., Bonus Amount)")
+        self.new_column_type = QComboBox()
+        self.new_column_type.addItems(COLUMN_TYPES)
         add_button = QPushButton("Add Column")
         add_button.clicked.connect(self.add_new_column)
         add_column_layout.addRow("Column Name:", self.new_column_name)
+        add_column_layout.addRow("Column Type:", self.new_column_type)
         add_column_layout.addRow(add_button)
         
         scroll_layout.addWidget(add_column_group)
@@ -148,34 +168,52 @@ class AdminColumnManager(QWidget):
         
         main_layout.addStretch()
 
+    def mark_pending_changes(self):
+        self.apply_button.setEnabled(True)
+
     def update_column_visibility(self):
+        """Apply all pending checkbox changes with one config write."""
         visible_columns = self.parent_app.excel_handler.mandatory_columns + [
             header for header, checkbox in self.column_checkboxes.items() if checkbox.isChecked()
         ]
         self.parent_app.excel_handler.update_visible_columns(visible_columns)
-        self.parent_app.reload_form()
+        self.parent_app.form.apply_column_visibility()
+        self.apply_button.setEnabled(False)
         QMessageBox.information(self, "Success", "Column visibility updated!")
 
     def add_new_column(self):
         column_name = self.new_column_name.text().strip()
         if column_name:
-            success, message = self.parent_app.excel_handler.add_column(column_name)
-            if success:
-                checkbox = QCheckBox(column_name)
-                checkbox.setChecked(True)
-                checkbox.stateChanged.connect(self.update_column_visibility)
-                self.column_checkboxes[column_name] = checkbox
-                self.dynamic_layout.addWidget(checkbox)
-                self.parent_app.reload_form()
-                QMessageBox.information(self, "Success", message)
-            else:
-                QMessageBox.critical(self, "Error", message)
+            if self.parent_app.session_recorder is not None:
+                self.parent_app.session_recorder.record(
+                    "add_column", name=column_name, type=self.new_column_type.currentText()
+                )
+            self.parent_app.io_executor.submit(
+                "Adding column", self.parent_app.excel_handler.add_column, column_name,
+                self.new_column_type.currentText(),
+                on_finished=lambda result, name=column_name: self.on_column_added(name, result),
+                on_error=lambda message: QMessageBox.critical(self, "Error", message)
+            )
             self.new_column_name.clear()
 
+    def on_column_added(self, column_name, result):
+        success, message = result
+        if success:
+            checkbox = QCheckBox(column_name)
+            checkbox.setChecked(True)
+            checkbox.stateChanged.connect(self.mark_pending_changes)
+            self.column_checkboxes[column_name] = checkbox
+            self.dynamic_layout.insertWidget(self.dynamic_layout.indexOf(self.apply_button), checkbox)
+            # A new header may be one the form knows how to render, so rebuild it once
+            self.parent_app.reload_form()
+            QMessageBox.information(self, "Success", message)
+        else:
+            QMessageBox.critical(self, "Error", message)
+
 class App(QMainWindow):
-    def __init__(self):
+    def __init__(self, file_path=None):
         super().__init__()
-        logging.info("Initializing App...")
+        logger.info("Initializing App...")
         self.setWindowTitle("Performance Review System")
         self.setMinimumSize(1200, 800)
 
@@ -183,76 +221,181 @@ class App(QMainWindow):
         self.stacked_widget = QStackedWidget()
         self.setCentralWidget(self.stacked_widget)
 
-        # Initialize ExcelHandler
-        self.excel_handler = ExcelHandler()
-        logging.info("ExcelHandler created.")
+        # Busy indicator for background workbook I/O
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.io_executor = ExcelIOExecutor(self)
+        self.io_executor.busy_changed.connect(self.on_io_busy_changed)
 
-        # Initialize screens
-        logging.info("Creating PerformanceForm...")
-        self.form = PerformanceForm(self)
-        self.form.parent_app = self
-        logging.info("Form created.")
+        # Initialize ExcelHandler; the workbook itself is opened on a worker thread
+        self.excel_handler = ExcelHandler(autoload=False)
+        if file_path:
+            self.excel_handler.file_path = os.path.abspath(file_path)
+            self.excel_handler.config_path = os.path.join(os.path.dirname(self.excel_handler.file_path), "column_config.json")
+        logger.info("ExcelHandler created.")
+        # Indexed in memory on the first query; only used on the I/O worker
+        self.employee_query = EmployeeQuery(self.excel_handler)
+        # Scorecard caches by group column, kept current by the handler's saves
+        self.scorecard_caches = {}
 
-        # Add form to stacked widget
-        self.stacked_widget.addWidget(self.form)
-        logging.info("Form added to stacked widget.")
+        self.form = None
+        self.loading_label = QLabel("Loading workbook...")
+        self.loading_label.setAlignment(Qt.AlignCenter)
+        self.stacked_widget.addWidget(self.loading_label)
 
         # Initialize other screens (will be created on demand)
         self.employee_view = None
         self.curved_view = None
         self.admin_panel = None
+        self.diagnostics_panel = None
+        self.scorecard_view = None
+        # Set by SessionRecorder.install() when HR_RECORD_SESSION is given
+        self.session_recorder = None
+        self.selection_task = None
+
+        self.io_executor.submit(
+            "Opening workbook", self.excel_handler.load,
+            on_finished=self.on_workbook_loaded,
+            on_error=self.on_workbook_load_failed
+        )
+        logger.info("App initialization complete.")
+
+    def on_workbook_loaded(self, _result=None):
+        startup.mark("excel_handler")
+        # Initialize screens
+        logger.info("Creating PerformanceForm...")
+        self.form = PerformanceForm(self)
+        self.form.parent_app = self
+        logger.info("Form created.")
+        startup.mark("form_build")
+
+        # Add form to stacked widget
+        self.stacked_widget.addWidget(self.form)
+        self.stacked_widget.setCurrentWidget(self.form)
+        self.stacked_widget.removeWidget(self.loading_label)
+        logger.info("Form added to stacked widget.")
 
-        logging.info("Loading employees...")
+        logger.info("Loading employees...")
         self.load_employees()
-        logging.info("Employees loaded.")
-        logging.info("App initialization complete.")
+
+    def on_workbook_load_failed(self, message):
+        self.loading_label.setText(f"Failed to open workbook:\n{message}")
+        QMessageBox.critical(self, "Error", message)
+
+    def on_io_busy_changed(self, busy, name):
+        if busy:
+            if QApplication.overrideCursor() is None:
+                QApplication.setOverrideCursor(Qt.BusyCursor)
+            self.statusBar().showMessage(f"{name}...")
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.show()
+        else:
+            while QApplication.overrideCursor() is not None:
+                QApplication.restoreOverrideCursor()
+            self.statusBar().clearMessage()
+            self.progress_bar.hide()
+        if self.form:
+            self.form.set_busy(busy)
+
+    def on_io_progress(self, done, total):
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
 
     def load_employees(self):
-        logging.info("Loading employees function called...")
-        try:
-            employees = self.excel_handler.get_all_employees()
-            logging.info(f"Employees fetched: {len(employees)}")
-            if employees:
-                self.form.populate_employee_dropdown(employees)
-                logging.info("Dropdown populated.")
-            else:
-                logging.info("No employees found in Excel file.")
-                self.form.show_error_message("No employees found in the Excel file. Please add employees.")
-        except Exception as e:
-            logging.error(f"Error loading employees: {e}")
-            self.form.show_error_message(f"Error loading employees: {str(e)}")
+        logger.info("Loading employees function called...")
+        self.io_executor.submit(
+            "Loading employees", self.excel_handler.get_all_employees,
+            with_progress=True,
+            on_progress=self.on_io_progress,
+            on_finished=self.on_employees_loaded,
+            on_error=lambda message: self.form.show_error_message(f"Error loading employees: {message}")
+        )
+
+    def on_employees_loaded(self, employees):
+        logger.info("Employees fetched: %s", len(employees))
+        if employees:
+            self.form.populate_employee_dropdown(employees)
+            logger.info("Dropdown populated.")
+        else:
+            logger.info("No employees found in Excel file.")
+            self.form.show_error_message("No employees found in the Excel file. Please add employees.")
+        if not startup.finished:
+            startup.mark("employee_load")
+            # The trace ends when the populated form is first painted
+            self.form.installEventFilter(self)
+            self.form.update()
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and watched is self.form and not startup.finished:
+            startup.finish("first_paint")
+            watched.removeEventFilter(self)
+        return super().eventFilter(watched, event)
+
+    def fetch_employee_data(self, emp_id, on_finished):
+        """Load one employee record in the background; a newer request cancels the previous one."""
+        self.io_executor.cancel(self.selection_task)
+        self.selection_task = self.io_executor.submit(
+            "Loading employee", self.excel_handler.get_employee_data, emp_id,
+            on_finished=on_finished,
+            on_error=lambda message: self.form.show_error_message(f"Error loading employee data: {message}")
+        )
 
     def save_form_data(self):
         try:
             form_data = self.form.get_form_data()
             if form_data:
-                emp_id = form_data.get("Employee ID")
-                existing_data = self.excel_handler.get_employee_data(emp_id)
-                final_data = existing_data if existing_data else {}
-                final_data.update(form_data)
-                logging.info(f"Final data to save for {emp_id} (soft skills): {{k: v for k, v in final_data.items() if 'Rating' in k or 'Score' in k or k == 'Part_B_Total_Score'}}")
-                self.excel_handler.save_employee_data(final_data)
-                self.form.show_success_message("Data saved successfully!")
-                self.form.clear_form()
+                # save_employee_data only writes fields that differ from the stored record
+                logger.debug("Form data to save for %s (soft skills): %s", form_data.get("Employee ID"), Lazy(lambda: {
+                    k: v for k, v in form_data.items() if 'Rating' in k or 'Score' in k or k == 'Part_B_Total_Score'
+                }))
+                self.io_executor.submit(
+                    "Saving employee", self.excel_handler.save_employee_data, form_data,
+                    on_finished=self.on_form_data_saved,
+                    on_error=lambda message: self.form.show_error_message(f"Error saving data: {message}")
+                )
         except Exception as e:
             self.form.show_error_message(f"Error saving data: {str(e)}")
 
+    def on_form_data_saved(self, _result=None):
+        self.form.show_success_message("Data saved successfully!")
+        self.form.clear_form()
+
     def add_new_employee(self, emp_id, name, department, designation, joining_date, contract_expiry, division, exp_pmtf):
-        try:
-            success, message = self.excel_handler.add_new_employee(
-                emp_id, name, department, designation,
-                joining_date, contract_expiry, division, exp_pmtf
-            )
-            return success, message
-        except Exception as e:
-            return False, f"Error adding employee: {str(e)}"
+        self.io_executor.submit(
+            "Adding employee", self.excel_handler.add_new_employee,
+            emp_id, name, department, designation,
+            joining_date, contract_expiry, division, exp_pmtf,
+            on_finished=self.on_employee_added,
+            on_error=lambda message: self.form.show_error_message(f"Error adding employee: {message}")
+        )
+
+    def on_employee_added(self, result):
+        success, message = result
+        if success:
+            self.form.show_success_message("Employee added successfully!")
+            self.load_employees()
+        else:
+            self.form.show_error_message(message)
+
+    def save_employee_record(self, data, on_finished=None, on_error=None):
+        """Queue a full-record save from the employee view."""
+        self.io_executor.submit(
+            "Saving employee", self.excel_handler.save_employee_data, data,
+            on_finished=on_finished, on_error=on_error
+        )
 
     def open_employee_view(self, emp_id):
+        logger.info("Opening employee view for ID: %s", emp_id)
+        self.fetch_employee_data(emp_id, self.show_employee_view)
+
+    def show_employee_view(self, employee_data):
         try:
-            logging.info(f"Opening employee view for ID: {emp_id}")
-            employee_data = self.excel_handler.get_employee_data(emp_id)
             if employee_data:
                 if self.employee_view is None:
+                    from employee_view import EmployeeViewWindow
                     self.employee_view = EmployeeViewWindow(employee_data, self)
                     self.stacked_widget.addWidget(self.employee_view)
                 else:
@@ -265,30 +408,56 @@ class App(QMainWindow):
 
     def open_curved_view(self):
         try:
-            logging.info("Opening curved view...")
+            logger.info("Opening curved view...")
             if self.curved_view is None:
-                logging.info("Creating CurvedPerformanceView...")
+                logger.info("Creating CurvedPerformanceView...")
+                from curved_performance_view import CurvedPerformanceView
                 self.curved_view = CurvedPerformanceView(self)
                 self.stacked_widget.addWidget(self.curved_view)
-                logging.info("Curved view created.")
+                logger.info("Curved view created.")
             self.stacked_widget.setCurrentWidget(self.curved_view)
         except Exception as e:
             self.form.show_error_message(f"Error opening curved view: {str(e)}")
 
     def open_admin_panel(self):
         try:
-            logging.info("Opening admin panel...")
+            logger.info("Opening admin panel...")
             if self.admin_panel is None:
-                logging.info("Creating AdminColumnManager...")
+                logger.info("Creating AdminColumnManager...")
                 self.admin_panel = AdminColumnManager(self)
                 self.stacked_widget.addWidget(self.admin_panel)
-                logging.info("Admin panel created.")
+                logger.info("Admin panel created.")
             self.stacked_widget.setCurrentWidget(self.admin_panel)
         except Exception as e:
             self.form.show_error_message(f"Error opening admin panel: {str(e)}")
 
+    def scorecard_cache(self, group_by):
+        if group_by not in self.scorecard_caches:
+            self.scorecard_caches[group_by] = ScorecardCache(self.excel_handler, group_by).watch()
+        return self.scorecard_caches[group_by]
+
+    def open_scorecard_view(self):
+        try:
+            if self.scorecard_view is None:
+                from scorecard_view import ScorecardView
+                self.scorecard_view = ScorecardView(self)
+                self.stacked_widget.addWidget(self.scorecard_view)
+            self.stacked_widget.setCurrentWidget(self.scorecard_view)
+        except Exception as e:
+            self.form.show_error_message(f"Error opening scorecards: {str(e)}")
+
+    def open_diagnostics_panel(self):
+        try:
+            if self.diagnostics_panel is None:
+                from diagnostics_panel import DiagnosticsPanel
+                self.diagnostics_panel = DiagnosticsPanel(self)
+                self.stacked_widget.addWidget(self.diagnostics_panel)
+            self.stacked_widget.setCurrentWidget(self.diagnostics_panel)
+        except Exception as e:
+            self.form.show_error_message(f"Error opening diagnostics: {str(e)}")
+
     def reload_form(self):
-        logging.info("Reloading PerformanceForm...")
+        logger.info("Reloading PerformanceForm...")
         try:
             old_form = self.form
             self.form = PerformanceForm(self)
@@ -297,20 +466,39 @@ class App(QMainWindow):
             self.stacked_widget.removeWidget(old_form)
             self.stacked_widget.insertWidget(old_index, self.form)
             self.load_employees()
-            logging.info("Form reloaded.")
+            logger.info("Form reloaded.")
         except Exception as e:
-            logging.error(f"Error reloading form: {str(e)}")
+            logger.error("Error reloading form: %s", e)
             self.form.show_error_message(f"Error reloading form: {str(e)}")
 
     def go_back(self):
         self.stacked_widget.setCurrentWidget(self.form)
 
+    def closeEvent(self, event):
+        # Let queued saves reach the disk before the process exits
+        self.io_executor.wait_for_done()
+        if self.session_recorder is not None:
+            self.session_recorder.close()
+        event.accept()
+
 if __name__ == '__main__':
-    logging.info("Main execution starting...")
+    configure_logging()
+    startup.start(STARTED)
+    startup.mark("imports")
+    if os.environ.get("HR_MEMORY_PROFILE", "") not in ("", "0"):
+        from memory_profile import start_tracing
+        # Trace before the workbook is opened so the load itself is attributed
+        start_tracing()
+    logger.info("Main execution starting...")
     app = QApplication(sys.argv)
-    logging.info("QApplication created.")
+    logger.info("QApplication created.")
+    startup.mark("qapplication")
     main_window = App()
-    logging.info("App object created, showing window...")
+    if os.environ.get("HR_RECORD_SESSION"):
+        from session_replay import SessionRecorder
+        SessionRecorder(main_window, os.environ["HR_RECORD_SESSION"]).install()
+    logger.info("App object created, showing window...")
     main_window.show()
-    logging.info("Starting event loop...")
+    startup.mark("window")
+    logger.info("Starting event loop...")
     sys.exit(app.exec_())
\ No newline at end of file
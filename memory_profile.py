@@ -0,0 +1,161 @@
+import gc
+import inspect
+import json
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from log_config import get_logger
+
+logger = get_logger("perf")
+
+# Frames are matched from the innermost outwards; the first frame matching a
+# pattern decides the subsystem. "file.py:function" limits a pattern to one function.
+SUBSYSTEMS = [
+    ("workbook", ["/openpyxl/", "/et_xmlfile/", "/zipfile", "/xml/etree/"]),
+    ("employee_cache", ["/excel_handler.py"]),
+    ("view_models", ["/curved_performance_view.py:read_performance_data", "/scoring.py", "/payroll_engine.py",
+                     "/increment_simulator.py"]),
+    ("charts", ["/curved_performance_view.py", "/PyQt5/", "/form_ui.py", "/employee_view.py", "/main.py",
+                "/diagnostics_panel.py"]),
+]
+OTHER = "other"
+# Deeper tracebacks make traced loads much slower (about 5x at 2 frames, 40x at 10)
+DEFAULT_FRAMES = 2
+
+_function_ranges = {}
+
+
+def start_tracing(nframes=DEFAULT_FRAMES):
+    """Start tracemalloc if it is not already running (HR_MEMORY_PROFILE=1 does this at startup)."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(nframes)
+        logger.info("Memory tracing started with %s frames", nframes)
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def function_at(filename, lineno):
+    """Name of the function defined at filename:lineno in an imported module, if any."""
+    ranges = _function_ranges.get(filename)
+    if ranges is None:
+        ranges = []
+        module = next((m for m in list(sys.modules.values())
+                       if getattr(m, "__file__", None) == filename), None)
+        members = list(vars(module).values()) if module else []
+        for obj in members + [m for cls in members if inspect.isclass(cls) for m in vars(cls).values()]:
+            code = getattr(inspect.unwrap(obj), "__code__", None) if callable(obj) else None
+            if code is not None and code.co_filename == filename:
+                lines = [line for _, _, line in code.co_lines() if line is not None]
+                ranges.append((code.co_firstlineno, max(lines, default=code.co_firstlineno), code.co_name))
+        _function_ranges[filename] = ranges
+    return next((name for first, last, name in ranges if first <= lineno <= last), None)
+
+
+def frame_matches(frame, pattern):
+    path, _, function = pattern.partition(":")
+    filename = frame.filename.replace("\\", "/")
+    if path not in filename:
+        return False
+    return not function or function_at(frame.filename, frame.lineno) == function
+
+
+def subsystem_of(traceback):
+    for frame in reversed(traceback):
+        for subsystem, patterns in SUBSYSTEMS:
+            if any(frame_matches(frame, pattern) for pattern in patterns):
+                return subsystem
+    return OTHER
+
+
+class MemoryPhases:
+    """Traced and resident memory retained by each named phase of a load.
+
+    RSS deltas include Qt's C++ allocations (widgets, charts) that
+    tracemalloc cannot see.
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        gc.collect()
+        traced_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        rss_before = rss_bytes()
+        try:
+            yield
+        finally:
+            gc.collect()
+            traced_after = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+            rss_after = rss_bytes()
+            self.phases.append({
+                "phase": name,
+                "traced_bytes": traced_after - traced_before,
+                "rss_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            })
+
+
+def memory_report(employees, limit=15, phases=None):
+    """Attribute the memory currently held to subsystems, with the top allocation sites.
+
+    employees is the row count the per-employee costs are divided by.
+    Requires tracing to have been started before the data was loaded.
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("Memory tracing is not running; start it before loading the workbook")
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    subsystems = {name: {"bytes": 0, "blocks": 0} for name, _ in SUBSYSTEMS + [(OTHER, None)]}
+    sites = {}
+    for stat in snapshot.statistics("traceback"):
+        subsystem = subsystem_of(stat.traceback)
+        subsystems[subsystem]["bytes"] += stat.size
+        subsystems[subsystem]["blocks"] += stat.count
+        innermost = stat.traceback[-1]
+        key = (f"{innermost.filename}:{innermost.lineno}", subsystem)
+        site = sites.setdefault(key, {"location": key[0], "subsystem": subsystem, "bytes": 0, "blocks": 0})
+        site["bytes"] += stat.size
+        site["blocks"] += stat.count
+    total = sum(entry["bytes"] for entry in subsystems.values())
+    for entry in subsystems.values():
+        entry["bytes_per_employee"] = round(entry["bytes"] / employees, 1) if employees else None
+    return {
+        "taken": datetime.now().isoformat(timespec="seconds"),
+        "employees": employees,
+        "traced_bytes": total,
+        "bytes_per_employee": round(total / employees, 1) if employees else None,
+        "rss_bytes": rss_bytes(),
+        "subsystems": subsystems,
+        "phases": phases or [],
+        "top_allocators": sorted(sites.values(), key=lambda site: site["bytes"], reverse=True)[:limit],
+    }
+
+
+def format_report(report):
+    lines = [f"{report['employees']} employees, {report['traced_bytes'] / 1024 / 1024:.1f} MB traced"
+             + (f", {report['rss_bytes'] / 1024 / 1024:.1f} MB RSS" if report["rss_bytes"] else "")]
+    for name, entry in report["subsystems"].items():
+        per_employee = f"{entry['bytes_per_employee']:>9,.0f} B/employee" if entry["bytes_per_employee"] is not None else ""
+        lines.append(f"  {name:<15} {entry['bytes'] / 1024 / 1024:>8.1f} MB {per_employee}")
+    for phase in report["phases"]:
+        rss = f", RSS {phase['rss_bytes'] / 1024 / 1024:+.1f} MB" if phase["rss_bytes"] is not None else ""
+        lines.append(f"  phase {phase['phase']:<15} traced {phase['traced_bytes'] / 1024 / 1024:+.1f} MB{rss}")
+    lines.append("Top allocators:")
+    for site in report["top_allocators"]:
+        lines.append(f"  {site['bytes'] / 1024:>10,.0f} KB {site['blocks']:>9,} blocks  [{site['subsystem']}] {site['location']}")
+    return "\n".join(lines)
+
+
+def write_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
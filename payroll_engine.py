@@ -0,0 +1,190 @@
+import calendar
+from datetime import date
+from employment_dates import to_ordinal
+from log_config import get_logger
+
+logger = get_logger("payroll")
+
+# Fuel price used by the salary tab when none is stored
+DEFAULT_FUEL_PRICE = 267
+
+SALARY_INPUT_COLUMNS = [
+    "Basic_Salary", "Gross_Amount", "Car_Allowance", "Fuel_Litre", "Fuel_Price",
+    "House_Rent", "Medical", "Utilities",
+    "Diff_Salary", "Diff_Conveyance", "Fuel_Litre_Adj", "Fuel_Price_Adj", "Diff_Car_Allowance",
+    "Salary_Increment_2425"
+]
+DERIVED_SALARY_COLUMNS = ["Total_Salary", "Amount_Diff_Fuel", "Total_Salary_Adj", "Allowance_Adj"]
+ARREARS_COLUMN = "Increment_Arrears"
+
+
+def to_number(value, default=0.0):
+    """Parse a stored cell value ("76798", 76798.0, "Rs. 1,200.00", "15%", "") into a float."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace("Rs.", "").replace(",", "").replace("%", "").strip()
+    try:
+        return float(text) if text else default
+    except ValueError:
+        return default
+
+
+def rating_code(value):
+    """Numeric code of a rating label such as "Meets Expectations (3)"; 0 when unrated."""
+    text = str(value or "")
+    for code in range(5, 0, -1):
+        if f"({code})" in text:
+            return code
+    return 0
+
+
+def compute_salary_columns(columns):
+    """Compute the derived salary fields for whole columns at once.
+
+    columns maps each SALARY_INPUT_COLUMNS name to an equally long list of
+    floats; the result maps each DERIVED_SALARY_COLUMNS name to a list.
+    """
+    basic = columns["Basic_Salary"]
+    rows = range(len(basic))
+    gross = columns["Gross_Amount"]
+    car = columns["Car_Allowance"]
+    fuel_litre = columns["Fuel_Litre"]
+    fuel_price = columns["Fuel_Price"]
+    house_rent = columns["House_Rent"]
+    medical = columns["Medical"]
+    utilities = columns["Utilities"]
+    diff_salary = columns["Diff_Salary"]
+    diff_conveyance = columns["Diff_Conveyance"]
+    fuel_litre_adj = columns["Fuel_Litre_Adj"]
+    fuel_price_adj = columns["Fuel_Price_Adj"]
+    diff_car = columns["Diff_Car_Allowance"]
+    return {
+        "Total_Salary": [
+            basic[i] + gross[i] + car[i] + fuel_litre[i] * fuel_price[i] +
+            house_rent[i] + medical[i] + utilities[i]
+            for i in rows
+        ],
+        "Amount_Diff_Fuel": [fuel_litre_adj[i] * fuel_price_adj[i] for i in rows],
+        "Total_Salary_Adj": [diff_salary[i] + diff_conveyance[i] + diff_car[i] for i in rows],
+        "Allowance_Adj": [diff_car[i] + diff_conveyance[i] for i in rows],
+    }
+
+
+def months_elapsed(effective_date, as_of_date):
+    """Months from effective_date up to (not including) as_of_date.
+
+    The month containing effective_date counts pro rata by the days remaining
+    in it; every later month counts as one.
+    """
+    if as_of_date <= effective_date:
+        return 0.0
+    days_in_month = calendar.monthrange(effective_date.year, effective_date.month)[1]
+    if (as_of_date.year, as_of_date.month) == (effective_date.year, effective_date.month):
+        return (as_of_date.day - effective_date.day) / days_in_month
+    first_month = (days_in_month - effective_date.day + 1) / days_in_month
+    full_months = (as_of_date.year - effective_date.year) * 12 + as_of_date.month - effective_date.month - 1
+    return first_month + full_months + (as_of_date.day - 1) / calendar.monthrange(as_of_date.year, as_of_date.month)[1]
+
+
+def parse_date(value):
+    ordinal = to_ordinal(value)
+    if ordinal is None:
+        raise ValueError(f"Unrecognised date: {value}")
+    return date.fromordinal(ordinal)
+
+
+class PayrollEngine:
+    """Computes salary totals, adjustments and increment arrears for every employee."""
+
+    def __init__(self, excel_handler):
+        self.excel_handler = excel_handler
+        self.employee_ids = []
+        self.divisions = []
+        self.departments = []
+        self.ratings = []
+        self.columns = {}
+
+    def load(self):
+        """Read the salary inputs of every employee into column lists in one pass.
+
+        Goes through the handler's column reader, so it works on a handler
+        whose workbook is not loaded (the GUI loads it in the background).
+        """
+        try:
+            headers = self.excel_handler.get_headers()
+            emp_id_header = headers[self.excel_handler.find_employee_id_column(headers)]
+            table = self.excel_handler.read_employee_columns(
+                [emp_id_header, "Division", "Department", "Overall_Rating"] + SALARY_INPUT_COLUMNS
+            )
+            count = len(table[emp_id_header])
+            blank = [None] * count
+            self.employee_ids = [str(emp_id) for emp_id in table[emp_id_header]]
+            self.divisions = [value or "" for value in table.get("Division", blank)]
+            self.departments = [value or "" for value in table.get("Department", blank)]
+            self.ratings = [rating_code(value) for value in table.get("Overall_Rating", blank)]
+            defaults = {"Fuel_Price": DEFAULT_FUEL_PRICE, "Fuel_Price_Adj": DEFAULT_FUEL_PRICE}
+            self.columns = {
+                name: [to_number(value, defaults.get(name, 0.0)) for value in table.get(name, blank)]
+                for name in SALARY_INPUT_COLUMNS
+            }
+            logger.info("Payroll engine loaded %s employees", len(self.employee_ids))
+            return len(self.employee_ids)
+        except Exception as e:
+            logger.error("Error loading payroll data: %s", e)
+            raise Exception(f"Error loading payroll data: {str(e)}")
+
+    def compute(self, effective_date=None, as_of_date=None):
+        """Return the derived columns, plus increment arrears when effective_date is given.
+
+        Arrears are the monthly increase (Total_Salary x Salary_Increment_2425 %)
+        times the months between effective_date and as_of_date (default: today).
+        """
+        derived = compute_salary_columns(self.columns)
+        if effective_date is not None:
+            months = months_elapsed(parse_date(effective_date), parse_date(as_of_date or date.today()))
+            increments = self.columns["Salary_Increment_2425"]
+            derived[ARREARS_COLUMN] = [
+                round(total * increment / 100.0 * months, 2)
+                for total, increment in zip(derived["Total_Salary"], increments)
+            ]
+        return derived
+
+    def summarize(self, derived):
+        """Total cost impact for the whole workforce and per division."""
+        increments = self.columns["Salary_Increment_2425"]
+        monthly_increase = [t * p / 100.0 for t, p in zip(derived["Total_Salary"], increments)]
+        arrears = derived.get(ARREARS_COLUMN, [0.0] * len(self.employee_ids))
+        summary = {
+            "employees": len(self.employee_ids),
+            "total_salary": round(sum(derived["Total_Salary"]), 2),
+            "total_salary_adjustment": round(sum(derived["Total_Salary_Adj"]), 2),
+            "total_allowance_adjustment": round(sum(derived["Allowance_Adj"]), 2),
+            "total_fuel_adjustment": round(sum(derived["Amount_Diff_Fuel"]), 2),
+            "monthly_increment_cost": round(sum(monthly_increase), 2),
+            "annual_increment_cost": round(sum(monthly_increase) * 12, 2),
+            "total_arrears": round(sum(arrears), 2),
+            "by_division": {},
+        }
+        for division, increase, arrear in zip(self.divisions, monthly_increase, arrears):
+            group = summary["by_division"].setdefault(
+                str(division), {"employees": 0, "monthly_increment_cost": 0.0, "arrears": 0.0}
+            )
+            group["employees"] += 1
+            group["monthly_increment_cost"] += increase
+            group["arrears"] += arrear
+        for group in summary["by_division"].values():
+            group["monthly_increment_cost"] = round(group["monthly_increment_cost"], 2)
+            group["arrears"] = round(group["arrears"], 2)
+        return summary
+
+    def run(self, effective_date=None, as_of_date=None, write=True):
+        """Load, compute and (optionally) write every derived field with one save; returns the summary."""
+        self.load()
+        derived = self.compute(effective_date, as_of_date)
+        if write:
+            self.excel_handler.update_columns({
+                name: dict(zip(self.employee_ids, values)) for name, values in derived.items()
+            })
+        return self.summarize(derived)
@@ -0,0 +1,182 @@
+import csv
+import json
+import os
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from scoring import OVERALL_RATINGS, REQUIRED_DISTRIBUTION, SOFT_SKILLS, rating_category
+from scorecards import SCORECARD_COLUMNS, SOURCE_COLUMNS, scorecard_rows
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+EMPLOYEE_SCORE_COLUMNS = (
+    ["Employee ID", "Employee Name", "Division", "Department", "Designation", "Line Manager"] +
+    [f"KPI_{i}_Weighted_Score" for i in range(1, 7)] + ["Part_A_Total_Score"] +
+    [f"{skill}_Weighted_Score" for skill in SOFT_SKILLS] + ["Part_B_Total_Score"] +
+    ["Overall_Percentage", "Overall_Rating"]
+)
+
+
+class CsvReportWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.columns = []
+
+    def write_header(self, columns):
+        self.columns = list(columns)
+        self.writer.writerow(self.columns)
+
+    def write_row(self, row):
+        self.writer.writerow([row.get(column, "") for column in self.columns])
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesReportWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = []
+
+    def write_header(self, columns):
+        self.columns = list(columns)
+
+    def write_row(self, row):
+        self.file.write(json.dumps({column: row.get(column, "") for column in self.columns}, default=str))
+        self.file.write("\n")
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxReportWriter:
+    """openpyxl write-only workbook: rows go to a temporary file as they are appended."""
+
+    def __init__(self, path, sheet_title="Report"):
+        self.path = path
+        self.wb = openpyxl.Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(sheet_title)
+        self.columns = []
+
+    def write_header(self, columns):
+        self.columns = list(columns)
+        header_cells = []
+        for column in self.columns:
+            cell = WriteOnlyCell(self.ws, value=column)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+            header_cells.append(cell)
+        self.ws.append(header_cells)
+
+    def write_row(self, row):
+        self.ws.append([row.get(column, "") for column in self.columns])
+
+    def close(self):
+        self.wb.save(self.path)
+
+
+REPORT_WRITERS = {
+    "csv": CsvReportWriter,
+    "jsonl": JsonLinesReportWriter,
+    "xlsx": XlsxReportWriter,
+}
+
+
+def open_report_writer(path, fmt=None):
+    """Pick a writer from fmt, or from the file extension when fmt is not given."""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt not in REPORT_WRITERS:
+        raise ValueError(f"Unsupported export format '{fmt}'. Use one of: {', '.join(REPORT_WRITERS)}")
+    return REPORT_WRITERS[fmt](path)
+
+
+def write_report(path, columns, rows, fmt=None):
+    """Stream rows into path; returns the number of rows written."""
+    writer = open_report_writer(path, fmt)
+    count = 0
+    try:
+        writer.write_header(columns)
+        for row in rows:
+            writer.write_row(row)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+def curve_rows(employees, group_by=None):
+    """Rating distribution rows (overall, or per group) against the required curve.
+
+    Consumes employees lazily and only keeps counts per group.
+    """
+    counts_by_group = {}
+    for employee in employees:
+        key = employee.get(group_by, "") if group_by else "All"
+        counts = counts_by_group.setdefault(key, {rating: 0 for rating in OVERALL_RATINGS})
+        counts[rating_category(employee.get("Overall_Rating", ""))] += 1
+    rows = []
+    for group, counts in sorted(counts_by_group.items()):
+        total = sum(counts.values())
+        for rating in OVERALL_RATINGS:
+            row = {group_by: group} if group_by else {}
+            row.update({
+                "rating": rating,
+                "required_percentage": REQUIRED_DISTRIBUTION[rating],
+                "required_count": round(total * REQUIRED_DISTRIBUTION[rating] / 100),
+                "actual_count": counts[rating],
+                "actual_percentage": round(counts[rating] / total * 100, 1) if total else 0.0,
+            })
+            rows.append(row)
+    return rows
+
+
+def curve_columns(group_by=None):
+    return ([group_by] if group_by else []) + [
+        "rating", "required_percentage", "required_count", "actual_count", "actual_percentage"
+    ]
+
+
+def export_employee_scores(excel_handler, path, fmt=None):
+    """Full employee score table, streamed row by row from the workbook."""
+    headers = excel_handler.get_headers()
+    columns = [column for column in EMPLOYEE_SCORE_COLUMNS if column in headers]
+    count = write_report(path, columns, excel_handler.stream_employees(columns), fmt)
+    logger.info("Exported %s employee score rows to %s", count, path)
+    return count
+
+
+def export_rating_summary(excel_handler, path, fmt=None):
+    """Company-wide rating distribution against the required curve."""
+    rows = curve_rows(excel_handler.stream_employees(["Employee ID", "Overall_Rating"]))
+    count = write_report(path, curve_columns(), rows, fmt)
+    logger.info("Exported rating summary to %s", path)
+    return count
+
+
+def export_group_curves(excel_handler, path, group_by="Department", fmt=None):
+    """Rating distribution per group (Department, Division, ...) against the required curve."""
+    rows = curve_rows(excel_handler.stream_employees(["Employee ID", "Overall_Rating", group_by]), group_by)
+    count = write_report(path, curve_columns(group_by), rows, fmt)
+    logger.info("Exported %s curves to %s", group_by, path)
+    return count
+
+
+def export_scorecards(excel_handler, path, group_by="Department", fmt=None, cache=None):
+    """Scorecard per group; pass the app's ScorecardCache to reuse its materialized groups instead of a scan."""
+    if cache is not None:
+        group_by, rows = cache.group_by, cache.scorecards()
+    else:
+        columns = ["Employee ID", group_by] + [column for column in SOURCE_COLUMNS if column in excel_handler.get_headers()]
+        rows = scorecard_rows(excel_handler.stream_employees(columns, as_text=False), group_by)
+    count = write_report(path, [group_by] + SCORECARD_COLUMNS, rows, fmt)
+    logger.info("Exported %s %s scorecards to %s", count, group_by, path)
+    return count
+
+
+def export_all_columns(excel_handler, path, fmt=None):
+    """Every column of every employee, streamed."""
+    count = write_report(path, excel_handler.get_headers(), excel_handler.stream_employees(), fmt)
+    logger.info("Exported %s employees to %s", count, path)
+    return count
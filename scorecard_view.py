@@ -0,0 +1,115 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt
+import report_export
+from scorecards import GROUP_COLUMNS, SCORECARD_COLUMNS
+
+
+class ScorecardView(QWidget):
+    """Per-group scorecards from the app's materialized scorecard cache, with export."""
+
+    def __init__(self, parent_app):
+        super().__init__()
+        self.parent_app = parent_app
+        self.load_task = None
+        self.setStyleSheet("""
+            QWidget { background-color: #f5f5f5; font-family: 'Segoe UI', sans-serif; }
+            QTableWidget { background-color: white; gridline-color: #cccccc; font-size: 11px; }
+            QHeaderView::section { background-color: #e8e8e8; padding: 5px; border: 1px solid #cccccc; font-weight: bold; }
+            QPushButton { background-color: #4CAF50; color: white; border: none; padding: 8px 16px; border-radius: 4px; font-weight: bold; }
+            QPushButton:hover { background-color: #45a049; }
+            QPushButton#backBtn { background-color: #ff9800; }
+            QLabel#title { font-size: 16px; font-weight: bold; color: #2c3e50; padding: 10px; }
+        """)
+        self.create_ui()
+
+    def create_ui(self):
+        layout = QVBoxLayout(self)
+        title = QLabel("Scorecards")
+        title.setObjectName("title")
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Group by:"))
+        self.group_combo = QComboBox()
+        self.group_combo.addItems(GROUP_COLUMNS)
+        self.group_combo.currentTextChanged.connect(self.refresh)
+        controls.addWidget(self.group_combo)
+        self.status_label = QLabel()
+        controls.addWidget(self.status_label)
+        controls.addStretch()
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export_scorecards)
+        controls.addWidget(self.export_button)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(SCORECARD_COLUMNS) + 1)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        back_btn = QPushButton("Back to Form")
+        back_btn.setObjectName("backBtn")
+        back_btn.clicked.connect(self.parent_app.go_back)
+        layout.addWidget(back_btn)
+
+    def showEvent(self, event):
+        # Only the groups changed by saves since the last visit are recomputed
+        self.refresh()
+        super().showEvent(event)
+
+    def refresh(self):
+        group_by = self.group_combo.currentText()
+        self.parent_app.io_executor.cancel(self.load_task)
+        self.status_label.setText("Loading...")
+        self.load_task = self.parent_app.io_executor.submit(
+            f"Computing {group_by} scorecards", self.parent_app.scorecard_cache(group_by).scorecards,
+            on_finished=lambda rows: self.show_scorecards(group_by, rows),
+            on_error=self.on_load_failed
+        )
+
+    def show_scorecards(self, group_by, rows):
+        self.load_task = None
+        if group_by != self.group_combo.currentText():
+            return
+        columns = [group_by] + SCORECARD_COLUMNS
+        self.table.setHorizontalHeaderLabels(columns)
+        self.table.setRowCount(len(rows))
+        for row, scorecard in enumerate(rows):
+            for column, key in enumerate(columns):
+                value = scorecard[key]
+                item = QTableWidgetItem("" if value is None else str(value))
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.status_label.setText(f"{len(rows)} groups")
+
+    def on_load_failed(self, message):
+        self.load_task = None
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", message)
+
+    def export_scorecards(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Scorecards", "", "Excel Workbook (*.xlsx);;CSV (*.csv);;JSON Lines (*.jsonl)"
+        )
+        if not path:
+            return
+        group_by = self.group_combo.currentText()
+        self.export_button.setEnabled(False)
+        self.parent_app.io_executor.submit(
+            f"Exporting {group_by} scorecards", report_export.export_scorecards,
+            self.parent_app.excel_handler, path, group_by, cache=self.parent_app.scorecard_cache(group_by),
+            on_finished=lambda count: self.on_export_done(f"Exported {count} scorecards to {path}"),
+            on_error=lambda message: self.on_export_done(f"Export failed: {message}", failed=True)
+        )
+
+    def on_export_done(self, message, failed=False):
+        self.export_button.setEnabled(True)
+        if failed:
+            QMessageBox.critical(self, "Error", message)
+        else:
+            QMessageBox.information(self, "Export", message)
\ No newline at end of file
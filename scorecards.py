@@ -0,0 +1,149 @@
+import statistics
+import time
+from payroll_engine import rating_code, to_number
+from scoring import OVERALL_RATINGS
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+GROUP_COLUMNS = ["Department", "Division"]
+NOT_RATED = "Not Rated"
+SCORECARD_COLUMNS = [
+    "headcount", "mean_percentage", "median_percentage", *OVERALL_RATINGS, NOT_RATED,
+    "avg_part_a", "avg_part_b", "salary_impact",
+]
+# Read per row: (group, percentage, rating code, part A, part B, salary impact)
+SOURCE_COLUMNS = ["Overall_Percentage", "Overall_Rating", "Part_A_Total_Score", "Part_B_Total_Score", "Salary_Adj_Impact"]
+LABELS = {rating_code(label): label for label in OVERALL_RATINGS}
+
+
+def mean(values):
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def scorecard(entries):
+    """Scorecard of one group from its row entries."""
+    percentages = [entry[1] for entry in entries if entry[1] is not None]
+    mix = dict.fromkeys(OVERALL_RATINGS + [NOT_RATED], 0)
+    for entry in entries:
+        mix[LABELS.get(entry[2], NOT_RATED)] += 1
+    return {
+        "headcount": len(entries),
+        "mean_percentage": mean(percentages),
+        "median_percentage": round(statistics.median(percentages), 2) if percentages else None,
+        **mix,
+        "avg_part_a": mean([entry[3] for entry in entries if entry[3] is not None]),
+        "avg_part_b": mean([entry[4] for entry in entries if entry[4] is not None]),
+        "salary_impact": round(sum(entry[5] for entry in entries), 2),
+    }
+
+
+def row_entry(group, percentage, rating, part_a, part_b, impact):
+    """Entry of one employee row from its raw cell values."""
+    return (
+        "" if group is None else str(group).strip(), to_number(percentage, None), rating_code(rating),
+        to_number(part_a, None), to_number(part_b, None), to_number(impact),
+    )
+
+
+def scorecard_rows(employees, group_by="Department"):
+    """Scorecards from employee records (raw values, e.g. stream_employees(as_text=False)), without a cache."""
+    groups = {}
+    for employee in employees:
+        entry = row_entry(employee.get(group_by), *(employee.get(column) for column in SOURCE_COLUMNS))
+        groups.setdefault(entry[0], []).append(entry)
+    return [{group_by: group, **scorecard(entries)} for group, entries in sorted(groups.items())]
+
+
+class ScorecardCache:
+    """Scorecards per group (Department by default), materialized from one pass over the sheet.
+
+    Once watch() is called, every save re-reads only its changed rows and
+    marks the groups they left or joined dirty; scorecards() recomputes just
+    those. A reload of the workbook, or a save the cache was not told
+    about, rebuilds everything on the next call.
+    """
+
+    def __init__(self, excel_handler, group_by="Department"):
+        self.excel_handler = excel_handler
+        self.group_by = group_by
+        self.entries = {}
+        self.members = {}
+        self.cards = {}
+        self.dirty = set()
+        self.generation = None
+        self.loaded_mtime = None
+
+    def watch(self):
+        """Follow the handler's saves incrementally; returns self."""
+        self.excel_handler.change_listeners.append(self.rows_changed)
+        return self
+
+    def read_rows(self, rows=None):
+        """(sheet row, entry) for the given rows, or every row; entry is None without an Employee ID."""
+        headers = self.excel_handler.get_headers()
+        emp_id_col = self.excel_handler.find_employee_id_column(headers)
+        index = {header: i for i, header in enumerate(headers)}
+        if self.group_by not in index:
+            raise ValueError(f"Column '{self.group_by}' not found in Excel file")
+        columns = [index[self.group_by]] + [index.get(column) for column in SOURCE_COLUMNS]
+        max_col = max(i for i in columns + [emp_id_col] if i is not None) + 1
+        ws = self.excel_handler.ws
+        spans = [(2, ws.max_row)] if rows is None else [(row, row) for row in sorted(rows)]
+        for first, last in spans:
+            for row_index, row in enumerate(
+                    ws.iter_rows(min_row=first, max_row=last, max_col=max_col, values_only=True), start=first):
+                if not row or row[emp_id_col] in (None, ""):
+                    yield row_index, None
+                    continue
+                yield row_index, row_entry(*(row[i] if i is not None and i < len(row) else None for i in columns))
+
+    def rebuild(self):
+        start = time.perf_counter()
+        self.entries = {row: entry for row, entry in self.read_rows() if entry is not None}
+        self.members = {}
+        for row, entry in self.entries.items():
+            self.members.setdefault(entry[0], set()).add(row)
+        self.cards = {}
+        self.dirty = set(self.members)
+        self.generation = self.excel_handler.generation
+        self.loaded_mtime = self.excel_handler.loaded_mtime
+        logger.info("Read %s rows in %s %s groups in %.3fs",
+                    len(self.entries), len(self.members), self.group_by, time.perf_counter() - start)
+
+    def rows_changed(self, rows):
+        """Change listener: re-read the saved rows and mark their old and new groups dirty."""
+        if self.generation is None or self.generation != self.excel_handler.generation:
+            return
+        for row, entry in self.read_rows(rows):
+            old = self.entries.pop(row, None)
+            if old is not None:
+                self.members[old[0]].discard(row)
+                self.dirty.add(old[0])
+            if entry is not None:
+                self.entries[row] = entry
+                self.members.setdefault(entry[0], set()).add(row)
+                self.dirty.add(entry[0])
+        self.loaded_mtime = self.excel_handler.loaded_mtime
+
+    def scorecards(self):
+        """[{group_by: group, **scorecard}] sorted by group, recomputing only dirty groups."""
+        try:
+            if self.generation != self.excel_handler.generation or self.loaded_mtime != self.excel_handler.loaded_mtime:
+                self.rebuild()
+            if self.dirty:
+                start = time.perf_counter()
+                for group in self.dirty:
+                    rows = self.members.get(group)
+                    if rows:
+                        self.cards[group] = scorecard([self.entries[row] for row in rows])
+                    else:
+                        self.members.pop(group, None)
+                        self.cards.pop(group, None)
+                logger.info("Recomputed %s %s scorecards in %.3f ms",
+                            len(self.dirty), self.group_by, (time.perf_counter() - start) * 1000)
+                self.dirty = set()
+            return [{self.group_by: group, **self.cards[group]} for group in sorted(self.cards)]
+        except Exception as e:
+            logger.error("Error computing %s scorecards: %s", self.group_by, e)
+            raise Exception(f"Error computing {self.group_by} scorecards: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,131 @@
+# Scoring rules shared by the form, the curved view and the CLI; keep this module free of Qt imports
+from instrumentation import instrumented
+
+KPI_RATINGS = {
+    "Serious Performance Concerns (1)": 1,
+    "Below Expectations (2)": 2,
+    "Meets Expectations (3)": 3,
+    "Exceeds Expectations (4)": 4,
+    "Outstanding (5)": 5
+}
+SOFT_SKILL_RATINGS = {
+    "Does not Demonstrate (1)": 1,
+    "Developing (2)": 2,
+    "Proficient (3)": 3,
+    "Proficient (4)": 4,
+    "Expert (5)": 5
+}
+SOFT_SKILLS = [
+    "Open_Clear_Communication",
+    "Attitude_Team_Work_Collaboration",
+    "Planning_Achievement_Focus",
+    "Creativity_Initiatives",
+    "Ownership_Self_Accountability"
+]
+OVERALL_RATINGS = [
+    "Outstanding (5)",
+    "Exceeds Expectations (4)",
+    "Meets Expectations (3)",
+    "Below Expectations (2)",
+    "Serious Performance Concerns (1)"
+]
+REQUIRED_DISTRIBUTION = {
+    "Outstanding (5)": 5,
+    "Exceeds Expectations (4)": 15,
+    "Meets Expectations (3)": 65,
+    "Below Expectations (2)": 10,
+    "Serious Performance Concerns (1)": 5
+}
+
+
+def get_rating_value(rating_text, is_soft_skill=False):
+    rating_map = SOFT_SKILL_RATINGS if is_soft_skill else KPI_RATINGS
+    return rating_map.get(rating_text, 0)
+
+
+def kpi_weighted_score(rating_value, weightage):
+    """Part A is worth 70%; each KPI contributes rating x its weightage share."""
+    return rating_value * (weightage / 100.0) * 70
+
+
+def soft_skill_weighted_score(rating_value):
+    """Part B is worth 30%; each soft skill carries a fixed 6% weight."""
+    return rating_value * (6 / 100.0) * 30
+
+
+def overall_rating_label(overall_score):
+    if overall_score >= 90:
+        return "Outstanding (5)"
+    elif overall_score >= 80:
+        return "Exceeds Expectations (4)"
+    elif overall_score >= 60:
+        return "Meets Expectations (3)"
+    elif overall_score >= 40:
+        return "Below Expectations (2)"
+    return "Serious Performance Concerns (1)"
+
+
+def parse_weightage(value, default=15):
+    text = str(value or "").replace("%", "").strip()
+    try:
+        return float(text) if text else default
+    except ValueError:
+        return default
+
+
+@instrumented()
+def score_record(record):
+    """Recompute the score fields of one employee record, formatted as the form saves them.
+
+    Only KPIs and soft skills whose rating column is present in the record are scored.
+    """
+    scores = {}
+    part_a_total = 0.0
+    for i in range(1, 7):
+        rating_key = f"KPI_{i}_Rating"
+        if rating_key not in record:
+            continue
+        rating_value = get_rating_value(record.get(rating_key, ""))
+        score = kpi_weighted_score(rating_value, parse_weightage(record.get(f"KPI_{i}_Weightage")))
+        scores[f"KPI_{i}_Weighted_Score"] = f"{score:.1f}"
+        part_a_total += score
+    scores["Part_A_Total_Score"] = f"{part_a_total:.1f}"
+
+    part_b_total = 0.0
+    for skill in SOFT_SKILLS:
+        rating_key = f"{skill}_Rating"
+        if rating_key not in record:
+            continue
+        score = soft_skill_weighted_score(get_rating_value(record.get(rating_key, ""), is_soft_skill=True))
+        scores[f"{skill}_Weighted_Score"] = f"{score:.1f}"
+        part_b_total += score
+    scores["Part_B_Total_Score"] = f"{part_b_total:.1f}"
+
+    overall_score = part_a_total + part_b_total
+    scores["Overall_Percentage"] = f"{overall_score:.1f}%"
+    scores["Overall_Rating"] = overall_rating_label(overall_score)
+    return scores
+
+
+def rating_category(rating):
+    """Map a stored Overall_Rating to one of OVERALL_RATINGS; blanks count as Meets Expectations."""
+    if rating:
+        rating_str = str(rating).strip().lower()
+        if "5" in rating_str or "outstanding" in rating_str:
+            return "Outstanding (5)"
+        elif "4" in rating_str or "exceed" in rating_str:
+            return "Exceeds Expectations (4)"
+        elif "2" in rating_str or "below" in rating_str:
+            return "Below Expectations (2)"
+        elif "1" in rating_str or "serious" in rating_str or "poor" in rating_str:
+            return "Serious Performance Concerns (1)"
+    return "Meets Expectations (3)"
+
+
+@instrumented()
+def rating_distribution(ratings):
+    """Count ratings per OVERALL_RATINGS category."""
+    counts = {rating: 0 for rating in OVERALL_RATINGS}
+    for rating in ratings:
+        counts[rating_category(rating)] += 1
+    return counts
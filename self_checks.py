@@ -0,0 +1,124 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from types import SimpleNamespace
+import xlsx_reader
+from benchmarks import open_workbook_handler
+from payroll_engine import DERIVED_SALARY_COLUMNS, SALARY_INPUT_COLUMNS
+from synthetic_data import generate_workbook
+from log_config import configure_logging, get_logger
+
+logger = get_logger("perf")
+
+CHECKS = ["hidden_salary_save", "fast_reader_parity"]
+QT_APP = None
+
+
+def qt_application():
+    global QT_APP
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    # Kept referenced, or the application is destroyed as soon as this returns
+    QT_APP = QApplication.instance() or QApplication([])
+    return QT_APP
+
+
+def check_hidden_salary_save(path):
+    """An unedited employee view save changes no cell, with the salary columns hidden or blank."""
+    qt_application()
+    from employee_view import EmployeeViewWindow
+    handler = open_workbook_handler(path)
+    salary_columns = SALARY_INPUT_COLUMNS + DERIVED_SALARY_COLUMNS
+    first, second = [emp["Employee ID"] for emp in handler.get_all_employees(columns=["Employee ID"])[:2]]
+    # The second employee has no salary recorded at all
+    handler.update_columns({column: {second: None} for column in salary_columns if column in handler.get_headers()})
+    handler.update_visible_columns([column for column in handler.visible_columns if column not in salary_columns])
+    failures = []
+    saved = []
+
+    def save_employee_record(data, on_finished=None, on_error=None):
+        # Synchronous stand-in for App.save_employee_record; never opens the view's message boxes
+        try:
+            saved.append(handler.save_employee_data(data))
+        except Exception as e:
+            saved.append(str(e))
+    parent = SimpleNamespace(go_back=lambda: None, save_employee_record=save_employee_record)
+    for emp_id, visible in ((first, False), (second, False), (second, True)):
+        if visible:
+            handler.update_visible_columns(handler.visible_columns + salary_columns)
+        view = EmployeeViewWindow(handler.get_employee_data(emp_id), parent)
+        view.save_employee_data()
+        view.deleteLater()
+        if saved[-1] != 0:
+            failures.append(f"{emp_id} (salary columns {'visible' if visible else 'hidden'}): {saved[-1]} fields changed")
+    return failures
+
+
+def check_fast_reader_parity(path, block_sizes=(64, 1000, 4096)):
+    """The streaming reader of an unloaded handler agrees with get_all_employees on the loaded workbook.
+
+    Small block sizes put block boundaries inside the prologue, rows and
+    cells; two more cut the first read inside the <sheetData> start tag.
+    """
+    with zipfile.ZipFile(path) as archive:
+        sheet = min(name for name in archive.namelist() if name.startswith("xl/worksheets/sheet"))
+        tag = archive.read(sheet).find(b"<sheetData")
+    block_sizes = tuple(block_sizes) + (tag + len(b"<sheet"), tag + len(b"<sheetData"))
+    expected = open_workbook_handler(path).get_all_employees()
+    fast = open_workbook_handler(path, load=False)
+    fast.load_column_config()
+    failures = []
+    default_size = xlsx_reader.BLOCK_SIZE
+    columns = None
+    try:
+        for block_size in (default_size,) + block_sizes:
+            xlsx_reader.BLOCK_SIZE = block_size
+            try:
+                employees, table = fast.get_all_employees(), fast.read_employee_columns()
+            except Exception as e:
+                failures.append(f"BLOCK_SIZE={block_size}: {e}")
+                continue
+            if employees != expected:
+                failures.append(f"get_all_employees differs with BLOCK_SIZE={block_size}")
+            if columns is None:
+                columns = table
+            elif table != columns:
+                failures.append(f"read_employee_columns differs with BLOCK_SIZE={block_size}")
+    finally:
+        xlsx_reader.BLOCK_SIZE = default_size
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consistency checks on a scratch copy of a generated workbook.")
+    parser.add_argument("--checks", nargs="+", choices=CHECKS, default=CHECKS)
+    parser.add_argument("--employees", type=int, default=200)
+    args = parser.parse_args(argv)
+    configure_logging(level="WARNING")
+
+    workdir = tempfile.mkdtemp(prefix="hr_self_checks_")
+    try:
+        source = os.path.join(workdir, "generated.xlsx")
+        generate_workbook(source, args.employees, seed=args.employees)
+        failed = 0
+        for name in args.checks:
+            # Every check gets its own copy (and column config) to modify
+            directory = os.path.join(workdir, name)
+            os.makedirs(directory)
+            path = os.path.join(directory, "employee_performance_data.xlsx")
+            shutil.copyfile(source, path)
+            failures = globals()[f"check_{name}"](path)
+            print(f"{name:<24} {'FAIL' if failures else 'ok'}")
+            for failure in failures:
+                print(f"    {failure}")
+            failed += bool(failures)
+        return 1 if failed else 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
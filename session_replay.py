@@ -0,0 +1,332 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from log_config import configure_logging, get_logger
+
+logger = get_logger("perf")
+
+# Used when no script is given: a typical appraisal round trip. Employees are
+# addressed by dropdown position so the script fits any workbook.
+DEFAULT_SESSION = [
+    {"action": "select_employee", "index": 10},
+    {"action": "set_field", "field": "KPI_1_Rating", "value": "Exceeds Expectations (4)"},
+    {"action": "set_field", "field": "KPI_2_Rating", "value": "Meets Expectations (3)"},
+    {"action": "save_form"},
+    {"action": "open_curved_view"},
+    {"action": "go_back"},
+    {"action": "open_employee_view", "index": 25},
+    {"action": "save_employee_view"},
+    {"action": "go_back"},
+]
+
+
+def widget_value(widget):
+    from PyQt5.QtWidgets import QComboBox, QSpinBox
+    if isinstance(widget, QComboBox):
+        return widget.currentText()
+    if isinstance(widget, QSpinBox):
+        return str(widget.value())
+    return widget.text()
+
+
+def set_widget_value(widget, value):
+    from PyQt5.QtWidgets import QComboBox, QSpinBox
+    if isinstance(widget, QComboBox):
+        widget.setCurrentText(value)
+    elif isinstance(widget, QSpinBox):
+        widget.setValue(int(value))
+    else:
+        widget.setText(value)
+
+
+def load_session(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class SessionRecorder:
+    """Appends the high-level actions taken on an App to a JSON-lines script.
+
+    install() must run before the form is built: signals connected to App
+    methods later (e.g. the Back buttons) then go through the recording
+    wrappers. Form edits are recorded at save time, as set_field actions for
+    every editable field that differs from the loaded record.
+    """
+
+    def __init__(self, app, path):
+        self.app = app
+        self.path = path
+        self.started = time.perf_counter()
+        self.loaded = {}
+        self.opening_view = False
+        self.last_selected = None
+        self.file = None
+
+    def record(self, action, **args):
+        # Called on the GUI thread only, so actions on the I/O worker are timed without the script write
+        entry = dict(action=action, at=round(time.perf_counter() - self.started, 3), **args)
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def edited_fields(self):
+        from PyQt5.QtWidgets import QLabel
+        edited = {}
+        for field, widget in self.app.form.input_widgets.items():
+            if field == "Employee ID" or isinstance(widget, QLabel) or field not in self.loaded:
+                continue
+            value = widget_value(widget)
+            if value != self.loaded[field]:
+                edited[field] = value
+        return edited
+
+    def install(self):
+        app = self.app
+        self.file = open(self.path, "a")
+        fetch_employee_data, open_employee_view = app.fetch_employee_data, app.open_employee_view
+        save_form_data, save_employee_record = app.save_form_data, app.save_employee_record
+        add_new_employee = app.add_new_employee
+
+        def fetch(emp_id, on_finished):
+            if self.opening_view:
+                return fetch_employee_data(emp_id, on_finished)
+            # The editable dropdown reports one selection twice
+            if emp_id != self.last_selected:
+                self.record("select_employee", employee_id=emp_id)
+            self.last_selected = emp_id
+
+            def remember(employee_data):
+                self.loaded = dict(employee_data or {})
+                on_finished(employee_data)
+            return fetch_employee_data(emp_id, remember)
+
+        def open_view(emp_id):
+            self.record("open_employee_view", employee_id=emp_id)
+            self.opening_view = True
+            try:
+                return open_employee_view(emp_id)
+            finally:
+                self.opening_view = False
+
+        def save_form():
+            if app.form is not None:
+                for field, value in self.edited_fields().items():
+                    self.record("set_field", field=field, value=value)
+            self.record("save_form")
+            self.last_selected = None
+            return save_form_data()
+
+        def save_record(data, on_finished=None, on_error=None):
+            self.record("save_employee_view")
+            return save_employee_record(data, on_finished=on_finished, on_error=on_error)
+
+        def add_employee(*args):
+            self.record("add_employee", args=list(args))
+            return add_new_employee(*args)
+
+        app.fetch_employee_data = fetch
+        app.open_employee_view = open_view
+        app.save_form_data = save_form
+        app.save_employee_record = save_record
+        app.add_new_employee = add_employee
+        # The admin panel records add_column itself, from its GUI-thread handler
+        app.session_recorder = self
+        for name in ("open_curved_view", "open_scorecard_view", "open_admin_panel", "open_diagnostics_panel", "go_back"):
+            setattr(app, name, self.recording(name, getattr(app, name)))
+        logger.info("Recording session to %s", self.path)
+        return self
+
+    def recording(self, action, method):
+        # Button signals pass `checked`; the wrapped App methods take no arguments
+        def wrapper(*_):
+            self.record(action)
+            return method()
+        return wrapper
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def summarize(results):
+    """Latency percentiles (ms) per action and over all actions."""
+    groups = {}
+    for result in results:
+        groups.setdefault(result["action"], []).append(result)
+    groups["all"] = [result for result in results if result["action"] != "startup"]
+    summary = {}
+    for action, entries in groups.items():
+        latencies = sorted(entry["seconds"] * 1000 for entry in entries)
+        summary[action] = {
+            "count": len(entries),
+            "errors": sum(1 for entry in entries if entry.get("error")),
+            "p50_ms": round(percentile(latencies, 0.5), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+        }
+    return summary
+
+
+class SessionReplay:
+    """Drives an App through a recorded script and times each action until the UI is idle again.
+
+    An action's latency runs from the call until every background task it
+    started has finished, its callbacks have run and no redraw is pending.
+    Message boxes are answered automatically; an error box marks the action
+    as failed.
+    """
+
+    def __init__(self, workbook_path, timeout=300):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt5.QtWidgets import QApplication
+        self.qt_app = QApplication.instance() or QApplication([])
+        self.workbook_path = workbook_path
+        self.timeout = timeout
+        self.errors = []
+        self.app = None
+
+    def answer_dialogs(self):
+        from PyQt5.QtWidgets import QMessageBox
+        QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+        QMessageBox.warning = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+        QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.Yes)
+        QMessageBox.critical = staticmethod(
+            lambda parent, title, text, *args, **kwargs: self.errors.append(text) or QMessageBox.Ok
+        )
+
+    def busy(self):
+        curved_view = self.app.curved_view
+        return self.app.io_executor.is_busy() or bool(curved_view and curved_view.redraw_timer.isActive())
+
+    def wait_idle(self):
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            self.qt_app.processEvents()
+            if not self.busy():
+                # Callbacks of the finished task may have queued more work
+                self.qt_app.processEvents()
+                if not self.busy():
+                    return
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"UI still busy after {self.timeout}s")
+            time.sleep(0.001)
+
+    def employee_id(self, step):
+        if "employee_id" in step:
+            return step["employee_id"]
+        return self.app.form.employee_combo.itemData(step.get("index", 0) + 1)
+
+    def perform(self, step, iteration):
+        app, action = self.app, step["action"]
+        if action == "select_employee":
+            combo = app.form.employee_combo
+            index = combo.findData(self.employee_id(step))
+            if index < 0:
+                raise ValueError(f"Employee {self.employee_id(step)} is not in the dropdown")
+            combo.setCurrentIndex(index)
+        elif action == "set_field":
+            widget = app.form.input_widgets.get(step["field"])
+            if widget is None:
+                raise ValueError(f"Field {step['field']} is not on the form")
+            set_widget_value(widget, step["value"])
+        elif action == "save_form":
+            app.save_form_data()
+        elif action == "open_employee_view":
+            app.open_employee_view(self.employee_id(step))
+        elif action == "save_employee_view":
+            app.employee_view.save_employee_data()
+        elif action == "add_employee":
+            # "{n}" in an argument becomes the iteration number, so repeated runs add distinct employees
+            app.add_new_employee(*[str(arg).replace("{n}", str(iteration)) for arg in step["args"]])
+        elif action == "add_column":
+            if app.admin_panel is None:
+                app.open_admin_panel()
+            app.admin_panel.new_column_name.setText(step["name"].replace("{n}", str(iteration)))
+            app.admin_panel.new_column_type.setCurrentText(step.get("type", "text"))
+            app.admin_panel.add_new_column()
+        elif action in ("open_curved_view", "open_scorecard_view", "open_admin_panel", "open_diagnostics_panel", "go_back"):
+            getattr(app, action)()
+        else:
+            raise ValueError(f"Unknown action: {action}")
+
+    def timed(self, action, fn):
+        del self.errors[:]
+        start = time.perf_counter()
+        error = None
+        try:
+            fn()
+            self.wait_idle()
+        except Exception as e:
+            error = str(e)
+        result = {"action": action, "seconds": round(time.perf_counter() - start, 4)}
+        if error or self.errors:
+            result["error"] = error or self.errors[0]
+        return result
+
+    def run(self, session, repeat=1):
+        from main import App
+        self.answer_dialogs()
+        results = []
+
+        def start():
+            self.app = App(file_path=self.workbook_path)
+            self.app.show()
+        results.append(self.timed("startup", start))
+        if "error" in results[0]:
+            raise RuntimeError(f"Startup failed: {results[0]['error']}")
+        for iteration in range(repeat):
+            for step in session:
+                results.append(self.timed(step["action"], lambda: self.perform(step, iteration)))
+        self.app.close()
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded GUI session headlessly and report action latencies.")
+    parser.add_argument("script", nargs="?", help="JSON-lines session (recorded with HR_RECORD_SESSION=path); "
+                                                  "a built-in appraisal round trip when omitted")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--workbook", help="Replay against a copy of this workbook")
+    source.add_argument("--employees", type=int, default=10000, help="Replay against a generated workbook of this size")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "hr_performance_benchmarks"),
+                        help="Where generated workbooks are cached")
+    parser.add_argument("--repeat", type=int, default=1, help="Run the script this many times in one session")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds an action may take before it fails")
+    parser.add_argument("--output", default="replay_results.json")
+    args = parser.parse_args(argv)
+    configure_logging(level="WARNING")
+
+    # The replay saves, so it always works on a scratch copy
+    from benchmarks import BenchmarkSuite
+    suite = BenchmarkSuite(args.workdir)
+    source_path = os.path.abspath(args.workbook) if args.workbook else suite.dataset(args.employees)
+    session = load_session(args.script) if args.script else DEFAULT_SESSION
+    results = SessionReplay(suite.scratch_copy(source_path), args.timeout).run(session, args.repeat)
+    summary = summarize(results)
+    with open(args.output, "w") as f:
+        json.dump({"workbook": source_path, "repeat": args.repeat, "summary": summary, "actions": results}, f, indent=2)
+    print(f"{'action':<24} {'count':>5} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, stats in summary.items():
+        print(f"{action:<24} {stats['count']:>5} {stats['errors']:>6} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['action']} failed: {result['error']}", file=sys.stderr)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return 1 if summary["all"]["errors"] or "error" in results[0] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from excel_handler import ExcelHandler
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+
+def open_snapshot(path):
+    handler = ExcelHandler(autoload=False)
+    handler.file_path = path
+    return handler
+
+
+def row_digest(record, columns):
+    """16-byte hash of a row over the given columns, in order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for column in columns:
+        digest.update(record.get(column, "").encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.digest()
+
+
+def hash_snapshot(path, emp_id_header, columns):
+    """Worker entry point: {employee id: row digest} for one file."""
+    return {
+        record[emp_id_header]: row_digest(record, columns)
+        for record in open_snapshot(path).stream_employees([emp_id_header] + columns)
+    }
+
+
+def collect_snapshot_rows(path, emp_id_header, columns, wanted_ids):
+    """Worker entry point: full rows for wanted_ids only; stops reading once all are found."""
+    rows = {}
+    for record in open_snapshot(path).stream_employees([emp_id_header] + columns):
+        if record[emp_id_header] in wanted_ids:
+            rows[record[emp_id_header]] = record
+            if len(rows) == len(wanted_ids):
+                break
+    return rows
+
+
+class SnapshotDiff:
+    """Compares two versions of the workbook by Employee ID.
+
+    Both files are streamed in read-only mode, side by side in two
+    processes, and reduced to one hash per row, so memory holds two small
+    digests per employee rather than the sheets. Only rows whose hashes
+    differ are read a second time (stopping once all are found) and compared
+    cell by cell, so the comparison work grows with the number of changes.
+    """
+
+    def __init__(self, old_path, new_path):
+        self.old = open_snapshot(old_path)
+        self.new = open_snapshot(new_path)
+
+    def run(self):
+        try:
+            start = time.perf_counter()
+            old_headers = self.old.get_headers()
+            new_headers = self.new.get_headers()
+            emp_id_header = new_headers[self.new.find_employee_id_column(new_headers)]
+            if emp_id_header not in old_headers:
+                emp_id_header = old_headers[self.old.find_employee_id_column(old_headers)]
+            # Columns present in only one version are reported once, not as a change on every row
+            columns = [h for h in new_headers if h in old_headers and h != emp_id_header]
+
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                old_hashes, new_hashes = pool.map(
+                    hash_snapshot, [self.old.file_path, self.new.file_path], [emp_id_header] * 2, [columns] * 2
+                )
+            added = [emp_id for emp_id in new_hashes if emp_id not in old_hashes]
+            removed = [emp_id for emp_id in old_hashes if emp_id not in new_hashes]
+            changed_ids = {
+                emp_id for emp_id, digest in new_hashes.items()
+                if emp_id in old_hashes and old_hashes[emp_id] != digest
+            }
+            hashed_at = time.perf_counter()
+
+            changes = []
+            if changed_ids:
+                with ProcessPoolExecutor(max_workers=2) as pool:
+                    old_rows, new_rows = pool.map(
+                        collect_snapshot_rows, [self.old.file_path, self.new.file_path],
+                        [emp_id_header] * 2, [columns] * 2, [changed_ids] * 2
+                    )
+                for emp_id in new_hashes:
+                    if emp_id not in changed_ids:
+                        continue
+                    old_row, new_row = old_rows[emp_id], new_rows[emp_id]
+                    for column in columns:
+                        if old_row.get(column, "") != new_row.get(column, ""):
+                            changes.append({
+                                "employee_id": emp_id,
+                                "field": column,
+                                "old": old_row.get(column, ""),
+                                "new": new_row.get(column, ""),
+                            })
+            report = {
+                "old": self.old.file_path,
+                "new": self.new.file_path,
+                "rows_compared": len(new_hashes),
+                "columns_added": [h for h in new_headers if h not in old_headers],
+                "columns_removed": [h for h in old_headers if h not in new_headers],
+                "rows_added": added,
+                "rows_removed": removed,
+                "rows_changed": len(changed_ids),
+                "cells_changed": len(changes),
+                "changes": changes,
+                "hash_seconds": round(hashed_at - start, 3),
+                "compare_seconds": round(time.perf_counter() - hashed_at, 3),
+            }
+            logger.info(
+                "Diffed %s -> %s: %s changed, %s added, %s removed",
+                self.old.file_path, self.new.file_path, len(changed_ids), len(added), len(removed)
+            )
+            return report
+        except Exception as e:
+            logger.error("Error comparing workbooks: %s", e)
+            raise Exception(f"Error comparing workbooks: {str(e)}")
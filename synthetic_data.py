@@ -0,0 +1,140 @@
+import os
+import random
+from datetime import date, timedelta
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from column_schema import RATING_LABELS, column_type, encode
+from excel_handler import DEFAULT_HEADERS
+from payroll_engine import DEFAULT_FUEL_PRICE, SALARY_INPUT_COLUMNS, compute_salary_columns
+from scoring import KPI_RATINGS, SOFT_SKILL_RATINGS, SOFT_SKILLS, score_record
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+STANDARD_SIZES = [1000, 10000, 50000, 100000]
+
+DIVISIONS = {
+    "Operations": ["Production", "Maintenance", "Logistics", "Quality Assurance", "HSE"],
+    "Finance": ["Accounts", "Treasury", "Tax", "Internal Audit"],
+    "Commercial": ["Sales", "Marketing", "Procurement", "Customer Service"],
+    "Corporate": ["Human Resources", "IT", "Legal", "Administration"],
+}
+DESIGNATIONS = ["Officer", "Senior Officer", "Assistant Manager", "Manager", "Senior Manager", "Engineer", "Analyst"]
+KPI_TITLES = [
+    "Budget adherence", "Process improvement", "Customer satisfaction", "Safety compliance",
+    "Project delivery", "Cost reduction", "Team development", "Reporting accuracy",
+    "Revenue target", "Audit findings closed", "System uptime", "Training hours",
+]
+FIRST_NAMES = ["Ali", "Sara", "Ahmed", "Fatima", "Usman", "Ayesha", "Bilal", "Hina", "Omar", "Zainab", "Hamza", "Maryam"]
+LAST_NAMES = ["Khan", "Ahmed", "Malik", "Hussain", "Qureshi", "Shah", "Butt", "Raza", "Siddiqui", "Iqbal"]
+# Weighted towards the required curve so generated distributions look like a real cycle
+RATING_WEIGHTS = [(5, 0.07), (4, 0.18), (3, 0.6), (2, 0.1), (1, 0.05)]
+
+
+def kpi_weightages(rng, count):
+    """count weightages, each 10-50%, multiples of 5, summing to 100."""
+    weights = [10] * count
+    remaining = 100 - 10 * count
+    while remaining > 0:
+        i = rng.randrange(count)
+        if weights[i] < 50:
+            weights[i] += 5
+            remaining -= 5
+    return weights
+
+
+def employee_record(rng, index, rated=True):
+    """One employee with the columns of create_file filled the way the app saves them."""
+    division = rng.choice(list(DIVISIONS))
+    joining = date(2005, 1, 1) + timedelta(days=rng.randrange(7000))
+    record = {
+        "Employee ID": f"EMP{index:06d}",
+        "Employee Name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "Division": division,
+        "Department": rng.choice(DIVISIONS[division]),
+        "Designation": rng.choice(DESIGNATIONS),
+        "Date of Joining": joining,
+        "Exp in PMTF": round((date(2025, 6, 30) - joining).days / 365.25, 1),
+        "Date of Evaluation": date(2025, 6, 30),
+        "Contract Expiry Date": joining + timedelta(days=365 * rng.randint(20, 25)),
+        "Line Manager": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "Entity Name": "xyz",
+        "Last_Year_Rating": rng.choice(list(KPI_RATINGS)),
+        "Last_Year_Increment": f"{rng.choice([0, 5, 8, 10, 12, 15])}%",
+    }
+    basic = float(rng.randrange(40000, 400000, 500))
+    salary = {name: 0.0 for name in SALARY_INPUT_COLUMNS}
+    salary.update({
+        "Basic_Salary": basic,
+        "House_Rent": round(basic * 0.45),
+        "Medical": round(basic * 0.1),
+        "Utilities": round(basic * 0.05),
+        "Fuel_Price": float(DEFAULT_FUEL_PRICE),
+        "Fuel_Price_Adj": float(DEFAULT_FUEL_PRICE),
+    })
+    if basic >= 150000:
+        salary["Car_Allowance"] = float(rng.choice([25000, 40000, 60000]))
+        salary["Fuel_Litre"] = float(rng.choice([100, 150, 200]))
+    if not rated:
+        record.update(salary)
+        record.update({name: values[0] for name, values in compute_salary_columns(
+            {name: [value] for name, value in salary.items()}).items()})
+        return record
+
+    level = rng.choices([code for code, _ in RATING_WEIGHTS], [weight for _, weight in RATING_WEIGHTS])[0]
+    kpi_labels = {value: label for label, value in KPI_RATINGS.items()}
+    skill_labels = {value: label for label, value in SOFT_SKILL_RATINGS.items()}
+    kpi_count = rng.randint(4, 6)
+    titles = rng.sample(KPI_TITLES, kpi_count)
+    for i, weightage in enumerate(kpi_weightages(rng, kpi_count), start=1):
+        record[f"KPI_{i}_Title"] = titles[i - 1]
+        record[f"KPI_{i}_Rating"] = kpi_labels[min(5, max(1, level + rng.choice([-1, 0, 0, 0, 1])))]
+        record[f"KPI_{i}_Weightage"] = weightage
+    for skill in SOFT_SKILLS:
+        record[f"{skill}_Rating"] = skill_labels[min(5, max(1, level + rng.choice([-1, 0, 0, 1])))]
+    record.update(score_record(record))
+    record["Promotion_Recommendation"] = "Yes" if level >= 4 and rng.random() < 0.5 else "No"
+    record["Retention_Recommendation"] = "No" if level == 1 else "Yes"
+    record["Comments"] = rng.choice(["", "Consistent performer", "Needs closer supervision", "Ready for larger role"])
+    record["Last_Updated"] = f"2025-0{rng.randint(4, 6)}-{rng.randint(10, 28)} {rng.randint(8, 18):02d}:00:00"
+    salary["Salary_Increment_2425"] = float({5: 15, 4: 12, 3: 8, 2: 4, 1: 0}[level])
+    salary["Diff_Salary"] = float(rng.choice([0, 0, 0, 2500, 5000]))
+    record.update(salary)
+    record.update({name: values[0] for name, values in compute_salary_columns(
+        {name: [value] for name, value in salary.items()}).items()})
+    record["Salary_Adj_Impact"] = f"Rs. {record['Total_Salary_Adj']:,.2f}"
+    record["Training_Recommendations"] = rng.choice(["", "Leadership", "Excel advanced", "Negotiation skills"])
+    return record
+
+
+def generate_workbook(path, employees, seed=0, rated_share=0.9):
+    """Write a workbook in the create_file layout with `employees` synthetic rows.
+
+    Rows are written through openpyxl's write-only mode, so even 100k
+    employees never sit in memory as cell objects, with every value stored
+    in its column type. The same seed always produces the same file content.
+    """
+    try:
+        rng = random.Random(seed)
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Performance_Data")
+        header_cells = []
+        for header in DEFAULT_HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+            header_cells.append(cell)
+        ws.append(header_cells)
+        columns = [(header, column_type(header), RATING_LABELS.get(header)) for header in DEFAULT_HEADERS]
+        for index in range(1, employees + 1):
+            record = employee_record(rng, index, rated=rng.random() < rated_share)
+            ws.append([encode(record.get(header), kind, labels=labels) for header, kind, labels in columns])
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        wb.save(path)
+        logger.info("Generated %s employees into %s", employees, path)
+        return path
+    except Exception as e:
+        logger.error("Error generating workbook: %s", e)
+        raise Exception(f"Error generating workbook: {str(e)}")
@@ -0,0 +1,176 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from payroll_engine import parse_date, to_number
+from scoring import KPI_RATINGS, SOFT_SKILLS, score_record
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+MIN_KPIS, MAX_KPIS = 4, 6
+MIN_KPI_WEIGHTAGE, MAX_KPI_WEIGHTAGE = 10, 50
+TOTAL_KPI_WEIGHTAGE = 100
+DATE_COLUMNS = ["Date of Joining", "Contract Expiry Date"]
+# Stored scores are rounded to one decimal by the form
+SCORE_TOLERANCE = 0.051
+
+VALIDATION_COLUMNS = (
+    ["Employee ID"] + DATE_COLUMNS +
+    [f"KPI_{i}_{field}" for i in range(1, 7) for field in ("Title", "Rating", "Weightage", "Weighted_Score")] +
+    ["Part_A_Total_Score"] +
+    [f"{skill}_{field}" for skill in SOFT_SKILLS for field in ("Rating", "Weighted_Score")] +
+    ["Part_B_Total_Score", "Overall_Percentage", "Overall_Rating"]
+)
+
+
+def is_rated(value):
+    return bool(value) and value != "Select Rating"
+
+
+def active_kpis(record):
+    """KPI numbers that have a title or a rating filled in."""
+    return [
+        i for i in range(1, 7)
+        if str(record.get(f"KPI_{i}_Title", "")).strip() or is_rated(record.get(f"KPI_{i}_Rating"))
+    ]
+
+
+def check_kpi_weights(record):
+    """4-6 KPIs, each weighted 10-50%, together 100%; only for employees that have been rated."""
+    kpis = active_kpis(record)
+    if not any(is_rated(record.get(f"KPI_{i}_Rating")) for i in kpis):
+        return []
+    violations = []
+    if not MIN_KPIS <= len(kpis) <= MAX_KPIS:
+        violations.append(("kpi_count", "KPIs", f"{len(kpis)} KPIs, expected {MIN_KPIS}-{MAX_KPIS}"))
+    total = 0.0
+    for i in kpis:
+        field = f"KPI_{i}_Weightage"
+        weightage = to_number(record.get(field), None)
+        if weightage is None:
+            violations.append(("kpi_weightage_missing", field, f"'{record.get(field, '')}' is not a number"))
+            continue
+        total += weightage
+        if not MIN_KPI_WEIGHTAGE <= weightage <= MAX_KPI_WEIGHTAGE:
+            violations.append((
+                "kpi_weightage_range", field,
+                f"{weightage:g}% outside {MIN_KPI_WEIGHTAGE}-{MAX_KPI_WEIGHTAGE}%"
+            ))
+        if not is_rated(record.get(f"KPI_{i}_Rating")) or record.get(f"KPI_{i}_Rating") not in KPI_RATINGS:
+            violations.append(("kpi_rating_invalid", f"KPI_{i}_Rating", f"'{record.get(f'KPI_{i}_Rating', '')}'"))
+    if abs(total - TOTAL_KPI_WEIGHTAGE) > 0.01:
+        violations.append(("kpi_weightage_total", "KPI_Weightage", f"weightages sum to {total:g}%, expected 100%"))
+    return violations
+
+
+def check_stored_scores(record):
+    """Stored weighted scores, totals and overall rating must match a recomputation."""
+    rating_columns = [f"KPI_{i}_Rating" for i in range(1, 7)] + [f"{skill}_Rating" for skill in SOFT_SKILLS]
+    if not any(is_rated(record.get(column)) for column in rating_columns):
+        return []
+    violations = []
+    for field, expected in score_record(record).items():
+        stored = record.get(field)
+        if stored in (None, "") or field not in record:
+            continue
+        if field == "Overall_Rating":
+            mismatch = str(stored).strip() != expected
+        else:
+            mismatch = abs(to_number(stored) - to_number(expected)) > SCORE_TOLERANCE
+        if mismatch:
+            violations.append(("score_mismatch", field, f"stored {stored}, recomputed {expected}"))
+    return violations
+
+
+def check_dates(record):
+    violations = []
+    for field in DATE_COLUMNS:
+        value = record.get(field)
+        if value in (None, ""):
+            continue
+        try:
+            parse_date(value)
+        except ValueError:
+            violations.append(("date_format", field, f"'{value}' is not DD/MM/YYYY or YYYY-MM-DD"))
+    return violations
+
+
+RULES = [check_kpi_weights, check_stored_scores, check_dates]
+
+
+def validate_record(record, rules=None):
+    """Violations of one employee record as (rule, field, message) tuples."""
+    violations = []
+    for rule in rules or RULES:
+        violations.extend(rule(record))
+    return violations
+
+
+def validate_batch(records):
+    """Worker entry point: violations for a batch of records as report dicts."""
+    return [
+        {"employee_id": record.get("Employee ID", ""), "rule": rule, "field": field, "message": message}
+        for record in records
+        for rule, field, message in validate_record(record)
+    ]
+
+
+def validate_workbook(excel_handler, workers=None, batch_size=500, limit=None):
+    """Stream the workbook and check every row against RULES.
+
+    With more than one worker, batches of rows are checked in a process pool;
+    workers=1 runs in-process, which is faster for small files. Returns a
+    report with per-rule counts and the violations (the first `limit`, if given).
+    """
+    try:
+        start = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+        headers = excel_handler.get_headers()
+        columns = [column for column in VALIDATION_COLUMNS if column in headers]
+        rows = excel_handler.stream_employees(columns)
+        rows_checked = 0
+        violations = []
+
+        def batches():
+            nonlocal rows_checked
+            batch = []
+            for record in rows:
+                rows_checked += 1
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        if workers > 1:
+            # Bounded in-flight batches keep memory flat; results are collected in row order
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for batch in batches():
+                    pending.append(pool.submit(validate_batch, batch))
+                    if len(pending) >= workers * 2:
+                        violations.extend(pending.popleft().result())
+                while pending:
+                    violations.extend(pending.popleft().result())
+        else:
+            for batch in batches():
+                violations.extend(validate_batch(batch))
+
+        by_rule = {}
+        for violation in violations:
+            by_rule[violation["rule"]] = by_rule.get(violation["rule"], 0) + 1
+        report = {
+            "rows_checked": rows_checked,
+            "rows_with_violations": len({violation["employee_id"] for violation in violations}),
+            "violations_total": len(violations),
+            "by_rule": by_rule,
+            "violations": violations[:limit] if limit else violations,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info("Validated %s rows: %s violations", rows_checked, len(violations))
+        return report
+    except Exception as e:
+        logger.error("Error validating workbook: %s", e)
+        raise Exception(f"Error validating workbook: {str(e)}")
@@ -0,0 +1,210 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from excel_handler import ExcelHandler
+from log_config import get_logger
+
+logger = get_logger("reports")
+
+TIMESTAMP_COLUMN = "Last_Updated"
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+
+def parse_timestamp(value):
+    """Last_Updated as a datetime; blank or unreadable values sort before everything else."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value or "").strip()
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return datetime.min
+
+
+def is_blank(value):
+    return value is None or str(value).strip() == ""
+
+
+def read_department_workbook(path):
+    """Worker entry point: stream one departmental workbook into {employee id: record}.
+
+    Returns (path, headers, records, seconds). Raw cell values are kept so
+    numbers and dates reach the master with their types.
+    """
+    start = time.perf_counter()
+    handler = ExcelHandler(autoload=False)
+    handler.file_path = path
+    headers = handler.get_headers()
+    emp_id_header = headers[handler.find_employee_id_column(headers)]
+    records = {}
+    for record in handler.stream_employees(as_text=False):
+        records[str(record[emp_id_header]).strip()] = record
+    return path, headers, records, time.perf_counter() - start
+
+
+class WorkbookMerger:
+    """Consolidates departmental copies of the workbook into the master file.
+
+    Every input is read in its own process. Records are reconciled by
+    Employee ID against the master: each input contributes only the fields
+    it changed, applied oldest Last_Updated first, so for each field the
+    newest non-blank change wins (the master counts as one more source).
+    Columns missing from the master are appended, and the master is saved
+    once at the end.
+    """
+
+    def __init__(self, excel_handler, input_paths, workers=None):
+        self.excel_handler = excel_handler
+        self.input_paths = [os.path.abspath(path) for path in input_paths]
+        self.workers = workers or min(len(self.input_paths), os.cpu_count() or 1) or 1
+
+    def read_inputs(self):
+        """Read every input in parallel; results come back in input order."""
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(read_department_workbook, self.input_paths))
+
+    def master_records(self):
+        headers = self.excel_handler.get_headers()
+        emp_id_col = self.excel_handler.find_employee_id_column(headers)
+        records = {}
+        for row in self.excel_handler.ws.iter_rows(min_row=2, values_only=True):
+            if row and emp_id_col < len(row) and row[emp_id_col] not in (None, ""):
+                records[str(row[emp_id_col]).strip()] = dict(zip(headers, row))
+        return records
+
+    def reconcile(self, sources):
+        """sources is a list of (name, records), the master first. Returns (merged records, conflicts).
+
+        An input only contributes the fields it changed away from the
+        master's value. A conflict is two inputs changing the same field to
+        different values; the newest value is kept.
+        """
+        master_name, master = sources[0]
+        versions = {}
+        for name, records in sources:
+            for emp_id, record in records.items():
+                versions.setdefault(emp_id, []).append((parse_timestamp(record.get(TIMESTAMP_COLUMN)), name, record))
+        merged, conflicts = {}, []
+        for emp_id, candidates in versions.items():
+            base = master.get(emp_id, {})
+            # Stable sort keeps source order for equal timestamps, so later inputs win ties
+            candidates.sort(key=lambda candidate: candidate[0])
+            result, origin, changes = {}, {}, {}
+            for _, name, record in candidates:
+                for field, value in record.items():
+                    if is_blank(value):
+                        continue
+                    if name != master_name:
+                        if field in base and str(base[field]).strip() == str(value).strip():
+                            continue
+                        changes.setdefault(field, []).append((name, value))
+                    result[field] = value
+                    origin[field] = name
+            for field, changed in changes.items():
+                if field == TIMESTAMP_COLUMN or len(changed) < 2:
+                    continue
+                kept, kept_from = result[field], origin[field]
+                for name, value in changed:
+                    if str(value).strip() != str(kept).strip():
+                        conflicts.append({
+                            "employee_id": emp_id,
+                            "field": field,
+                            "kept": str(kept),
+                            "kept_from": kept_from,
+                            "replaced": str(value),
+                            "replaced_from": name,
+                        })
+            merged[emp_id] = result
+        return merged, conflicts
+
+    def write_master(self, merged, new_headers, dry_run=False):
+        """Apply merged records to the master with one save; only changed cells are written."""
+        updated, added = 0, 0
+        with self.excel_handler.write_transaction() as transaction:
+            ws = self.excel_handler.ws
+            headers = self.excel_handler.get_headers()
+            for header in new_headers:
+                ws.cell(row=1, column=len(headers) + 1).value = header
+                headers.append(header)
+            self.excel_handler.headers = None
+            emp_id_col = self.excel_handler.find_employee_id_column(headers)
+            row_by_id = {}
+            for row_index, row in enumerate(ws.iter_rows(min_row=2, max_col=emp_id_col + 1), start=2):
+                if row[emp_id_col].value not in (None, ""):
+                    row_by_id[str(row[emp_id_col].value).strip()] = row_index
+            for emp_id, record in merged.items():
+                row_index = row_by_id.get(emp_id)
+                if row_index is None:
+                    self.excel_handler.write_new_row(
+                        transaction, [record.get(header, "") for header in headers], emp_id, headers
+                    )
+                    added += 1
+                    continue
+                changed = False
+                for col_idx, header in enumerate(headers, start=1):
+                    if header not in record:
+                        continue
+                    if ws.cell(row=row_index, column=col_idx).value != record[header]:
+                        self.excel_handler.write_cell(transaction, row_index, col_idx, record[header], emp_id, header)
+                        changed = True
+                updated += changed
+            transaction.save = not dry_run and bool(updated or added or new_headers)
+        if new_headers and not dry_run:
+            for header in new_headers:
+                if header not in self.excel_handler.visible_columns:
+                    self.excel_handler.visible_columns.append(header)
+            self.excel_handler.save_column_config()
+        if dry_run:
+            # Discard the in-memory edits
+            self.excel_handler.initialize_excel()
+        return updated, added
+
+    def run(self, dry_run=False):
+        """Merge every input into the master and return a report with conflicts and timings."""
+        try:
+            start = time.perf_counter()
+            results = self.read_inputs()
+            read_seconds = time.perf_counter() - start
+
+            merge_start = time.perf_counter()
+            master_headers = self.excel_handler.get_headers()
+            sources = [("master", self.master_records())]
+            new_headers = []
+            for path, headers, records, _ in results:
+                sources.append((os.path.basename(path), records))
+                new_headers.extend(h for h in headers if h not in master_headers and h not in new_headers)
+            merged, conflicts = self.reconcile(sources)
+            merge_seconds = time.perf_counter() - merge_start
+
+            write_start = time.perf_counter()
+            updated, added = self.write_master(merged, new_headers, dry_run=dry_run)
+            write_seconds = time.perf_counter() - write_start
+
+            report = {
+                "master": self.excel_handler.file_path,
+                "inputs": [
+                    {"file": path, "employees": len(records), "columns": len(headers), "seconds": round(seconds, 3)}
+                    for path, headers, records, seconds in results
+                ],
+                "columns_added": new_headers,
+                "employees_updated": updated,
+                "employees_added": added,
+                "conflicts": conflicts,
+                "dry_run": dry_run,
+                "read_seconds": round(read_seconds, 3),
+                "merge_seconds": round(merge_seconds, 3),
+                "write_seconds": round(write_seconds, 3),
+                "total_seconds": round(time.perf_counter() - start, 3),
+            }
+            logger.info(
+                "Merged %s workbooks: %s updated, %s added, %s conflicts", len(results), updated, added, len(conflicts)
+            )
+            return report
+        except Exception as e:
+            logger.error("Error merging workbooks: %s", e)
+            raise Exception(f"Error merging workbooks: {str(e)}")
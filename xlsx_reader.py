@@ -0,0 +1,252 @@
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import fromstring, iterparse
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.cell import get_column_letter
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+from log_config import get_logger
+
+logger = get_logger("io")
+
+SHEET_NAMES = ["Sheet1", "Performance_Data", "Data", "Employee_Data"]
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+ROW, CELL, VALUE, FORMULA, INLINE_STRING = (MAIN_NS + tag for tag in ("row", "c", "v", "f", "is"))
+TEXT, RUN = MAIN_NS + "t", MAIN_NS + "r"
+DIGITS = "0123456789"
+# Bytes of sheet XML parsed per call: small enough that a block's elements
+# stay well under the decoded rows in memory, large enough to parse in few calls
+BLOCK_SIZE = 1 << 16
+ROOT_TAG = re.compile(rb"<(?:\w+:)?worksheet\b[^>]*>")
+NAMESPACE_DECLARATION = re.compile(rb'xmlns(?::\w+)?="[^"]*"')
+# "AB" -> 28, filled in as column letters are met
+COLUMNS = {}
+
+
+def column_number(letters):
+    """1-based column of column letters such as "AB"; 0 for ""."""
+    number = COLUMNS.get(letters)
+    if number is None:
+        number = 0
+        for char in letters:
+            number = number * 26 + ord(char) - 64
+        COLUMNS[letters] = number
+    return number
+
+
+def row_blocks(source):
+    """Lists of <row> elements of a worksheet XML stream, with whether their XML holds any formula.
+
+    The stream is read in BLOCK_SIZE chunks, cut after the last complete
+    </row> and each block parsed in one call, so no Python code runs per
+    cell element and only one block of elements is held at a time.
+    Sheets with a prefixed main namespace fall back to iterparse.
+    """
+    buffer = b""
+    root = None
+    start = opened = -1
+    while opened < 0:
+        chunk = source.read(BLOCK_SIZE)
+        if not chunk:
+            break
+        # A tag may be split across reads, so each search resumes a tag's length before the new bytes
+        resume = max(0, len(buffer) - len(b"<sheetData"))
+        buffer += chunk
+        if root is None:
+            root = ROOT_TAG.search(buffer)
+            if root is None:
+                continue
+            if not root.group().startswith(b"<worksheet"):
+                break
+            resume = root.end()
+        if start < 0:
+            start = buffer.find(b"<sheetData", resume)
+        if start >= 0:
+            opened = buffer.find(b">", max(start, resume))
+    if opened < 0:
+        for _, element in iterparse(_Replay(buffer, source)):
+            if element.tag == ROW:
+                yield [element], True
+                element.clear()
+        return
+    wrapper = b"<sheetData " + b" ".join(NAMESPACE_DECLARATION.findall(root.group())) + b">"
+    opened += 1
+    if buffer[opened - 2:opened] == b"/>":
+        return
+    buffer = buffer[opened:]
+    while True:
+        end = buffer.find(b"</sheetData>")
+        if end >= 0:
+            yield list(fromstring(wrapper + buffer[:end] + b"</sheetData>")), b"<f" in buffer[:end]
+            return
+        cut = buffer.rfind(b"</row>") + len(b"</row>")
+        if cut >= len(b"</row>"):
+            yield list(fromstring(wrapper + buffer[:cut] + b"</sheetData>")), b"<f" in buffer[:cut]
+            buffer = buffer[cut:]
+        chunk = source.read(BLOCK_SIZE)
+        if not chunk:
+            raise ValueError("Worksheet XML ends inside <sheetData>")
+        buffer += chunk
+
+
+class _Replay:
+    """File-like object returning already read bytes before the rest of a stream."""
+
+    def __init__(self, head, source):
+        self.head = head
+        self.source = source
+
+    def read(self, size=-1):
+        if self.head:
+            data, self.head = self.head, b""
+            return data
+        return self.source.read(size)
+
+
+def string_content(node):
+    """Plain text of a shared or inline string: its <t> followed by the <t> of each rich text run."""
+    snippets = []
+    plain = node.find(TEXT)
+    if plain is not None and plain.text is not None:
+        snippets.append(plain.text)
+    for run in node.iter(RUN):
+        text = run.findtext(TEXT)
+        if text is not None:
+            snippets.append(text)
+    return "".join(snippets)
+
+
+class XlsxSheetReader:
+    """Cell values of the data sheet read straight from the xlsx zip with ElementTree.
+
+    The shared strings are preloaded into a list and only the requested
+    columns of each row are decoded, into the same Python values openpyxl
+    returns (numbers, dates by cell style, formulas as "=..." text), without
+    building a workbook. Row XML is discarded as soon as it is read.
+    """
+
+    def __init__(self, path, sheet_names=SHEET_NAMES):
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            workbook = fromstring(archive.read("xl/workbook.xml"))
+            targets = {}
+            if "xl/_rels/workbook.xml.rels" in archive.namelist():
+                for rel in fromstring(archive.read("xl/_rels/workbook.xml.rels")).iter(PACKAGE_RELS):
+                    target = rel.get("Target")
+                    part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+                    targets[rel.get("Id")] = (rel.get("Type", "").rsplit("/", 1)[-1], part)
+            sheets = {sheet.get("name"): targets.get(sheet.get(REL_ID), (None, None))[1]
+                      for sheet in workbook.iter(MAIN_NS + "sheet")}
+            name = next((name for name in sheet_names if name in sheets), None)
+            if name is None:
+                raise ValueError(f"No valid sheet found in {path}. Available sheets: {list(sheets)}")
+            self.sheet_part = sheets[name]
+            properties = workbook.find(MAIN_NS + "workbookPr")
+            date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+            self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+            parts = {kind: part for kind, part in targets.values()}
+            self.date_formats, self.timedelta_formats = set(), set()
+            if parts.get("styles") in archive.namelist():
+                stylesheet = Stylesheet.from_tree(fromstring(archive.read(parts["styles"])))
+                if stylesheet.cell_styles:
+                    self.date_formats, self.timedelta_formats = stylesheet.date_formats, stylesheet.timedelta_formats
+            self.shared_strings = []
+            if parts.get("sharedStrings") in archive.namelist():
+                with archive.open(parts["sharedStrings"]) as source:
+                    for _, node in iterparse(source):
+                        if node.tag == MAIN_NS + "si":
+                            self.shared_strings.append(string_content(node).replace("x005F_", ""))
+                            node.clear()
+        self.headers = []
+        for _, values in self.rows(max_row=1):
+            self.headers = [value for value in values if value is not None]
+
+    def rows(self, columns=None, min_row=1, max_row=None):
+        """(row number, [value per column]) for each row present in the sheet.
+
+        columns are distinct 0-based sheet column indexes; None reads every column
+        up to the last non-empty one of the row. Missing cells are None.
+        """
+        wanted = None if columns is None else {get_column_letter(index + 1): position
+                                               for position, index in enumerate(columns)}
+        shared_formulae = {}
+        row_number = 0
+        with zipfile.ZipFile(self.path) as archive, archive.open(self.sheet_part) as source:
+            for block, formulas in row_blocks(source):
+                for element in block:
+                    row_number = int(element.get("r") or row_number + 1)
+                    if row_number < min_row:
+                        continue
+                    if max_row is not None and row_number > max_row:
+                        return
+                    values = [None] * len(columns) if wanted is not None else []
+                    letters = ""
+                    for cell in element:
+                        reference = cell.get("r")
+                        if reference is not None:
+                            letters = reference.rstrip(DIGITS)
+                        else:
+                            letters = get_column_letter(column_number(letters) + 1)
+                            reference = letters + str(row_number)
+                        if wanted is None:
+                            position = column_number(letters) - 1
+                            if position >= len(values):
+                                values.extend([None] * (position + 1 - len(values)))
+                        else:
+                            position = wanted.get(letters)
+                            if position is None:
+                                # Masters of shared formulas may sit outside the projection
+                                if formulas and len(cell) and cell[0].tag == FORMULA and cell[0].get("t") == "shared":
+                                    self.parse_formula(cell, reference, shared_formulae)
+                                continue
+                        values[position] = self.parse_cell(cell, reference, shared_formulae)
+                    yield row_number, values
+
+    def parse_cell(self, cell, reference, shared_formulae):
+        """Value of one <c> element, as openpyxl's worksheet reader computes it."""
+        data_type = cell.get("t", "n")
+        if len(cell) and cell[0].tag == FORMULA:
+            return self.parse_formula(cell, reference, shared_formulae)
+        if data_type == "inlineStr":
+            node = cell.find(INLINE_STRING)
+            return string_content(node) if node is not None else None
+        value = cell.findtext(VALUE) or None
+        if value is None:
+            return None
+        if data_type == "n":
+            value = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            style = int(cell.get("s") or 0)
+            if style in self.date_formats:
+                try:
+                    return from_excel(value, self.epoch, timedelta=style in self.timedelta_formats)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "s":
+            return self.shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value
+
+    @staticmethod
+    def parse_formula(cell, reference, shared_formulae):
+        formula = cell[0]
+        value = "=" + (formula.text or "")
+        kind = formula.get("t")
+        if kind == "array":
+            return ArrayFormula(ref=formula.get("ref"), text=value)
+        if kind == "shared":
+            index = formula.get("si")
+            if index in shared_formulae:
+                return shared_formulae[index].translate_formula(reference)
+            if value != "=":
+                shared_formulae[index] = Translator(value, reference)
+        elif kind == "dataTable":
+            return DataTableFormula(**formula.attrib)
+        return value
\ No newline at end of file